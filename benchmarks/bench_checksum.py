@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+import argparse
+import os
+import struct
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import libbk8500 as lbk
+
+
+def old_checksum(packet_bytes):
+    return sum(byte for byte in packet_bytes) & 0xFF
+
+
+def old_serialize(packet, *command_args):
+    # The frame building this replaced: pack, checksum through a generator, then concatenate
+    struct_format = lbk.packet.PACKET_STRUCT + packet.PACKET_FORMAT
+    processed_args = (field.serialize(value) for field, value in zip(packet.FIELDS, command_args))
+    data = struct.pack(struct_format, 0xAA, 0, packet.COMMAND_ID, *processed_args)
+    return data + old_checksum(data).to_bytes(1, 'big')
+
+
+def old_verify(frame):
+    return old_checksum(frame[0:25]) == frame[25] and struct.unpack(lbk.packet.PACKET_STRUCT + '22x', frame[0:25])
+
+
+def new_verify(frame):
+    return lbk.packet.frame_checksum(frame) == frame[25] and lbk.packet.frame_struct('22x').unpack_from(frame)
+
+
+def allocations(function, count=1000):
+    # Net blocks allocated per call, measured with everything the call returns kept alive
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = [function() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'lineno'))
+    del kept
+    return (blocks - 1) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare frame building and checking before and after in place '
+                                                 'serialization')
+    parser.add_argument('--count', type=int, default=200_000)
+    args = parser.parse_args()
+
+    packet = lbk.packet.CurrentLevel(1.234)
+    frame = bytes(packet)
+    tx_buffer = bytearray(26)
+    rx_buffer = bytearray(frame)
+    assert old_serialize(packet, packet.amps) == frame
+    cases = {
+        'send old serialize': lambda: old_serialize(packet, packet.amps),
+        'send serialize': lambda: packet.serialize(packet.amps),
+        'send serialize_into': lambda: packet.serialize_into(tx_buffer, packet.amps),
+        'receive old checksum': lambda: old_verify(frame),
+        'receive in place': lambda: new_verify(rx_buffer),
+    }
+    for name, function in cases.items():
+        seconds = min(timeit.repeat(function, number=args.count, repeat=5)) / args.count
+        print(f'{name:22} {seconds * 1e9:8.1f} ns/frame  {allocations(function):5.2f} blocks kept/frame')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+import argparse
+import functools
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from libbk8500 import pool, simulator
+
+
+def bench(ports, baud, latency, duration, chunk):
+    factory = functools.partial(simulator.open_simulated, baud=baud, latency=latency)
+    names = [f'sim{index}' for index in range(ports)]
+    with pool.AcquisitionPool(names, capacity=1 << 12, chunk=chunk, device_factory=factory) as acquisition:
+        acquisition.run([], duration=duration)
+        status = acquisition.status()
+    # The rate counts from the start of the workers, so opening the devices is charged too
+    return sum(entry.rate for entry in status), sum(entry.errors for entry in status)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the acquisition throughput of the pool against simulated '
+                                                 'ports, one worker process each')
+    parser.add_argument('--ports', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--baud', type=int, default=9600,
+                        help='the simulated wire time of each exchange follows this baud rate')
+    parser.add_argument('--latency', type=float, default=0.001, help='simulated reaction time of the device in s')
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--chunk', type=int, default=16)
+    args = parser.parse_args()
+
+    base = None
+    for ports in args.ports:
+        rate, errors = bench(ports, args.baud, args.latency, args.duration, args.chunk)
+        # Every port is limited by its own wire, so the total should grow with the number of ports
+        base = base if base is not None else rate / ports
+        print(f'{ports:3} ports  {rate:9.1f} samples/s  {rate / ports:8.1f} per port  '
+              f'scaling {rate / (base * ports):6.1%}  {errors} errors')
+
+
+if __name__ == '__main__':
+    main()
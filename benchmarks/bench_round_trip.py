@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import libbk8500 as lbk
+from libbk8500 import simulator
+
+CONFIGS = {
+    'default': lbk.device.SerialConfig(),
+    'timeout': lbk.device.SerialConfig(timeout=1.0, write_timeout=1.0),
+    'low-latency': lbk.device.LOW_LATENCY,
+}
+
+
+def round_trips(device, count):
+    times = []
+    for _ in range(count):
+        start = time.perf_counter()
+        device.request(lbk.packet.Measure)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def bench(port, baud, count):
+    for name, config in CONFIGS.items():
+        device = lbk.Device(port, baud, config=config)
+        device.enable_remote(True)
+        times = round_trips(device, count)
+        device.close()
+        print(f'{name:12} median {statistics.median(times) * 1000:7.3f} ms  '
+              f'p99 {sorted(times)[int(0.99 * (len(times) - 1))] * 1000:7.3f} ms  '
+              f'{1 / statistics.mean(times):8.1f} round trips/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the Measure round trip time for each serial configuration')
+    parser.add_argument('--device', type=str, default=None,
+                        help='a real device to benchmark instead of the simulator on a pty')
+    parser.add_argument('--baud', type=int, default=9600)
+    parser.add_argument('--count', type=int, default=200)
+    args = parser.parse_args()
+
+    if args.device is not None:
+        bench(args.device, args.baud, args.count)
+    else:
+        # A pty has no latency timer, so this mainly measures the host side cost of each read strategy
+        with simulator.PtySimulator() as pty:
+            bench(pty.port, args.baud, args.count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import libbk8500 as lbk
+
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'libbk8500', '_codecs.py')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Writes libbk8500/_codecs.py from the packet schemas')
+    parser.add_argument('--check', action='store_true', help='only report whether the file is up to date')
+    args = parser.parse_args()
+    source = lbk.packet.generate_codecs(lbk.packet.SCHEMA_PACKETS)
+    current = ''
+    if os.path.exists(PATH):
+        with open(PATH) as f:
+            current = f.read()
+    if args.check:
+        print(f'{PATH} is {"up to date" if current == source else "out of date"}')
+        sys.exit(0 if current == source else 1)
+    with open(PATH, 'w') as f:
+        f.write(source)
+    print(f'Wrote {PATH}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,791 @@
+# Generated from the packet schemas by generate_codecs.py, do not edit
+
+PACKETS = ('Status', 'RemoteOperation', 'EnableLoad', 'MaximumVoltage', 'MaximumCurrent', 'MaximumPower', 'Mode', 'CurrentLevel', 'VoltageLevel', 'PowerLevel', 'ResistanceLevel', 'CurrentTransient', 'VoltageTransient', 'PowerTransient', 'ResistanceTransient', 'ListOperation', 'ListRepeat', 'ListSteps', 'StepCurrent', 'StepVoltage', 'StepPower', 'StepResistance', 'ListFilename', 'PartitionScheme', 'SaveListFile', 'LoadListFile', 'MinimumBatteryVoltage', 'LoadOnTimer', 'EnableLoadOnTimer', 'SetAddress', 'EnableLocalOverride', 'EnableRemoteSensing', 'SelectTriggerSource', 'Trigger', 'SaveSettings', 'LoadSettings', 'SelectFunction', 'Measure', 'Version', 'Barcode')
+
+
+def Status_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, status, = _Status_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 18:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(_Status_0.enum(status), address)
+    if packet.status != SUCCESS:
+        raise StatusException(packet.status)
+    return packet
+
+
+def RemoteOperation___init__(self, enable_remote, address=None):
+    self.enable_remote = bool(enable_remote)
+    self.address = address
+
+def RemoteOperation_pack_into(self, buffer):
+    _RemoteOperation_pack(buffer, 0, 0xAA, self.address or 0, 32, (1 if self.enable_remote else 0), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+
+def EnableLoad___init__(self, enable_load, address=None):
+    self.enable_load = bool(enable_load)
+    self.address = address
+
+def EnableLoad_pack_into(self, buffer):
+    _EnableLoad_pack(buffer, 0, 0xAA, self.address or 0, 33, (1 if self.enable_load else 0), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+
+def MaximumVoltage___init__(self, volts, address=None):
+    self.volts = volts
+    self.address = address
+
+def MaximumVoltage_pack_into(self, buffer):
+    _MaximumVoltage_pack(buffer, 0, 0xAA, self.address or 0, 34, int(1000 * self.volts), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def MaximumVoltage_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, volts, = _MaximumVoltage_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 35:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(volts / 1000, address)
+    return packet
+
+
+def MaximumCurrent___init__(self, amps, address=None):
+    self.amps = amps
+    self.address = address
+
+def MaximumCurrent_pack_into(self, buffer):
+    _MaximumCurrent_pack(buffer, 0, 0xAA, self.address or 0, 36, int(10000 * self.amps), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def MaximumCurrent_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, amps, = _MaximumCurrent_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 37:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(amps / 10000, address)
+    return packet
+
+
+def MaximumPower___init__(self, watts, address=None):
+    self.watts = watts
+    self.address = address
+
+def MaximumPower_pack_into(self, buffer):
+    _MaximumPower_pack(buffer, 0, 0xAA, self.address or 0, 38, int(1000 * self.watts), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def MaximumPower_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, watts, = _MaximumPower_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 39:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(watts / 1000, address)
+    return packet
+
+
+def Mode___init__(self, mode, address=None):
+    self.mode = mode
+    self.address = address
+
+def Mode_pack_into(self, buffer):
+    _Mode_pack(buffer, 0, 0xAA, self.address or 0, 40, int(self.mode), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def Mode_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, mode, = _Mode_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 41:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(_Mode_0.enum(mode), address)
+    return packet
+
+
+def CurrentLevel___init__(self, amps, address=None):
+    self.amps = amps
+    self.address = address
+
+def CurrentLevel_pack_into(self, buffer):
+    _CurrentLevel_pack(buffer, 0, 0xAA, self.address or 0, 42, int(10000 * self.amps), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def CurrentLevel_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, amps, = _CurrentLevel_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 43:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(amps / 10000, address)
+    return packet
+
+
+def VoltageLevel___init__(self, volts, address=None):
+    self.volts = volts
+    self.address = address
+
+def VoltageLevel_pack_into(self, buffer):
+    _VoltageLevel_pack(buffer, 0, 0xAA, self.address or 0, 44, int(1000 * self.volts), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def VoltageLevel_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, volts, = _VoltageLevel_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 45:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(volts / 1000, address)
+    return packet
+
+
+def PowerLevel___init__(self, watts, address=None):
+    self.watts = watts
+    self.address = address
+
+def PowerLevel_pack_into(self, buffer):
+    _PowerLevel_pack(buffer, 0, 0xAA, self.address or 0, 46, int(1000 * self.watts), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def PowerLevel_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, watts, = _PowerLevel_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 47:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(watts / 1000, address)
+    return packet
+
+
+def ResistanceLevel___init__(self, ohms, address=None):
+    self.ohms = ohms
+    self.address = address
+
+def ResistanceLevel_pack_into(self, buffer):
+    _ResistanceLevel_pack(buffer, 0, 0xAA, self.address or 0, 48, int(1000 * self.ohms), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def ResistanceLevel_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, ohms, = _ResistanceLevel_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 49:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(ohms / 1000, address)
+    return packet
+
+
+def CurrentTransient___init__(self, value_a, time_a, value_b, time_b, operation, address=None):
+    self.value_a = value_a
+    self.time_a = time_a
+    self.value_b = value_b
+    self.time_b = time_b
+    self.operation = operation
+    self.address = address
+
+def CurrentTransient_pack_into(self, buffer):
+    _CurrentTransient_pack(buffer, 0, 0xAA, self.address or 0, 50, int(10000 * self.value_a), int(10000 * self.time_a), int(10000 * self.value_b), int(10000 * self.time_b), int(self.operation), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def CurrentTransient_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, value_a, time_a, value_b, time_b, operation, = _CurrentTransient_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 51:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(value_a / 10000, time_a / 10000, value_b / 10000, time_b / 10000, _CurrentTransient_4.enum(operation), address)
+    return packet
+
+
+def VoltageTransient___init__(self, value_a, time_a, value_b, time_b, operation, address=None):
+    self.value_a = value_a
+    self.time_a = time_a
+    self.value_b = value_b
+    self.time_b = time_b
+    self.operation = operation
+    self.address = address
+
+def VoltageTransient_pack_into(self, buffer):
+    _VoltageTransient_pack(buffer, 0, 0xAA, self.address or 0, 52, int(1000 * self.value_a), int(10000 * self.time_a), int(1000 * self.value_b), int(10000 * self.time_b), int(self.operation), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def VoltageTransient_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, value_a, time_a, value_b, time_b, operation, = _VoltageTransient_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 53:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(value_a / 1000, time_a / 10000, value_b / 1000, time_b / 10000, _VoltageTransient_4.enum(operation), address)
+    return packet
+
+
+def PowerTransient___init__(self, value_a, time_a, value_b, time_b, operation, address=None):
+    self.value_a = value_a
+    self.time_a = time_a
+    self.value_b = value_b
+    self.time_b = time_b
+    self.operation = operation
+    self.address = address
+
+def PowerTransient_pack_into(self, buffer):
+    _PowerTransient_pack(buffer, 0, 0xAA, self.address or 0, 54, int(1000 * self.value_a), int(10000 * self.time_a), int(1000 * self.value_b), int(10000 * self.time_b), int(self.operation), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def PowerTransient_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, value_a, time_a, value_b, time_b, operation, = _PowerTransient_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 55:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(value_a / 1000, time_a / 10000, value_b / 1000, time_b / 10000, _PowerTransient_4.enum(operation), address)
+    return packet
+
+
+def ResistanceTransient___init__(self, value_a, time_a, value_b, time_b, operation, address=None):
+    self.value_a = value_a
+    self.time_a = time_a
+    self.value_b = value_b
+    self.time_b = time_b
+    self.operation = operation
+    self.address = address
+
+def ResistanceTransient_pack_into(self, buffer):
+    _ResistanceTransient_pack(buffer, 0, 0xAA, self.address or 0, 56, int(1000 * self.value_a), int(10000 * self.time_a), int(1000 * self.value_b), int(10000 * self.time_b), int(self.operation), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def ResistanceTransient_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, value_a, time_a, value_b, time_b, operation, = _ResistanceTransient_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 57:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(value_a / 1000, time_a / 10000, value_b / 1000, time_b / 10000, _ResistanceTransient_4.enum(operation), address)
+    return packet
+
+
+def ListOperation___init__(self, mode, address=None):
+    self.mode = mode
+    self.address = address
+
+def ListOperation_pack_into(self, buffer):
+    _ListOperation_pack(buffer, 0, 0xAA, self.address or 0, 58, int(self.mode), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def ListOperation_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, mode, = _ListOperation_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 59:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(_ListOperation_0.enum(mode), address)
+    return packet
+
+
+def ListRepeat___init__(self, enable_repeat, address=None):
+    self.enable_repeat = bool(enable_repeat)
+    self.address = address
+
+def ListRepeat_pack_into(self, buffer):
+    _ListRepeat_pack(buffer, 0, 0xAA, self.address or 0, 60, (1 if self.enable_repeat else 0), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def ListRepeat_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, enable_repeat, = _ListRepeat_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 61:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(bool(enable_repeat), address)
+    return packet
+
+
+def ListSteps___init__(self, num_steps, address=None):
+    self.num_steps = num_steps
+    self.address = address
+
+def ListSteps_pack_into(self, buffer):
+    _ListSteps_pack(buffer, 0, 0xAA, self.address or 0, 62, int(self.num_steps), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def ListSteps_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, num_steps, = _ListSteps_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 63:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(num_steps, address)
+    return packet
+
+
+def StepCurrent___init__(self, step_num, amps, seconds, address=None):
+    self.step_num = step_num
+    self.amps = amps
+    self.seconds = seconds
+    self.address = address
+
+def StepCurrent_pack_into(self, buffer):
+    _StepCurrent_pack(buffer, 0, 0xAA, self.address or 0, 64, int(self.step_num), int(10000 * self.amps), int(10000 * self.seconds), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def StepCurrent_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, step_num, amps, seconds, = _StepCurrent_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 65:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(step_num, amps / 10000, seconds / 10000, address)
+    return packet
+
+
+def StepVoltage___init__(self, step_num, volts, seconds, address=None):
+    self.step_num = step_num
+    self.volts = volts
+    self.seconds = seconds
+    self.address = address
+
+def StepVoltage_pack_into(self, buffer):
+    _StepVoltage_pack(buffer, 0, 0xAA, self.address or 0, 66, int(self.step_num), int(1000 * self.volts), int(10000 * self.seconds), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def StepVoltage_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, step_num, volts, seconds, = _StepVoltage_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 67:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(step_num, volts / 1000, seconds / 10000, address)
+    return packet
+
+
+def StepPower___init__(self, step_num, watts, seconds, address=None):
+    self.step_num = step_num
+    self.watts = watts
+    self.seconds = seconds
+    self.address = address
+
+def StepPower_pack_into(self, buffer):
+    _StepPower_pack(buffer, 0, 0xAA, self.address or 0, 68, int(self.step_num), int(1000 * self.watts), int(10000 * self.seconds), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def StepPower_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, step_num, watts, seconds, = _StepPower_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 69:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(step_num, watts / 1000, seconds / 10000, address)
+    return packet
+
+
+def StepResistance___init__(self, step_num, ohms, seconds, address=None):
+    self.step_num = step_num
+    self.ohms = ohms
+    self.seconds = seconds
+    self.address = address
+
+def StepResistance_pack_into(self, buffer):
+    _StepResistance_pack(buffer, 0, 0xAA, self.address or 0, 70, int(self.step_num), int(1000 * self.ohms), int(10000 * self.seconds), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def StepResistance_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, step_num, ohms, seconds, = _StepResistance_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 71:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(step_num, ohms / 1000, seconds / 10000, address)
+    return packet
+
+
+def ListFilename___init__(self, file_name, address=None):
+    self.file_name = file_name
+    self.address = address
+
+def ListFilename_pack_into(self, buffer):
+    _ListFilename_pack(buffer, 0, 0xAA, self.address or 0, 72, self.file_name, )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def ListFilename_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, file_name, = _ListFilename_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 73:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(file_name, address)
+    return packet
+
+
+def PartitionScheme___init__(self, scheme, address=None):
+    self.scheme = scheme
+    self.address = address
+
+def PartitionScheme_pack_into(self, buffer):
+    _PartitionScheme_pack(buffer, 0, 0xAA, self.address or 0, 74, int(self.scheme), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def PartitionScheme_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, scheme, = _PartitionScheme_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 75:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(_PartitionScheme_0.enum(scheme), address)
+    return packet
+
+
+def SaveListFile___init__(self, location, address=None):
+    self.location = location
+    self.address = address
+
+def SaveListFile_pack_into(self, buffer):
+    _SaveListFile_pack(buffer, 0, 0xAA, self.address or 0, 76, int(self.location), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+
+def LoadListFile___init__(self, location, address=None):
+    self.location = location
+    self.address = address
+
+def LoadListFile_pack_into(self, buffer):
+    _LoadListFile_pack(buffer, 0, 0xAA, self.address or 0, 77, int(self.location), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+
+def MinimumBatteryVoltage___init__(self, volts, address=None):
+    self.volts = volts
+    self.address = address
+
+def MinimumBatteryVoltage_pack_into(self, buffer):
+    _MinimumBatteryVoltage_pack(buffer, 0, 0xAA, self.address or 0, 78, int(1000 * self.volts), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def MinimumBatteryVoltage_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, volts, = _MinimumBatteryVoltage_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 79:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(volts / 1000, address)
+    return packet
+
+
+def LoadOnTimer___init__(self, seconds, address=None):
+    self.seconds = seconds
+    self.address = address
+
+def LoadOnTimer_pack_into(self, buffer):
+    _LoadOnTimer_pack(buffer, 0, 0xAA, self.address or 0, 80, int(self.seconds), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def LoadOnTimer_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, seconds, = _LoadOnTimer_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 81:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(seconds, address)
+    return packet
+
+
+def EnableLoadOnTimer___init__(self, enable_timer, address=None):
+    self.enable_timer = bool(enable_timer)
+    self.address = address
+
+def EnableLoadOnTimer_pack_into(self, buffer):
+    _EnableLoadOnTimer_pack(buffer, 0, 0xAA, self.address or 0, 82, (1 if self.enable_timer else 0), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+
+def SetAddress___init__(self, new_address, address=None):
+    self.new_address = new_address
+    self.address = address
+
+def SetAddress_pack_into(self, buffer):
+    _SetAddress_pack(buffer, 0, 0xAA, self.address or 0, 84, int(self.new_address), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+
+def EnableLocalOverride___init__(self, enable_override, address=None):
+    self.enable_override = bool(enable_override)
+    self.address = address
+
+def EnableLocalOverride_pack_into(self, buffer):
+    _EnableLocalOverride_pack(buffer, 0, 0xAA, self.address or 0, 85, (1 if self.enable_override else 0), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+
+def EnableRemoteSensing___init__(self, enable_sensing, address=None):
+    self.enable_sensing = bool(enable_sensing)
+    self.address = address
+
+def EnableRemoteSensing_pack_into(self, buffer):
+    _EnableRemoteSensing_pack(buffer, 0, 0xAA, self.address or 0, 86, (1 if self.enable_sensing else 0), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+
+def SelectTriggerSource___init__(self, trigger_source, address=None):
+    self.trigger_source = trigger_source
+    self.address = address
+
+def SelectTriggerSource_pack_into(self, buffer):
+    _SelectTriggerSource_pack(buffer, 0, 0xAA, self.address or 0, 88, int(self.trigger_source), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def SelectTriggerSource_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, trigger_source, = _SelectTriggerSource_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 89:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(_SelectTriggerSource_0.enum(trigger_source), address)
+    return packet
+
+
+def Trigger___init__(self, address=None):
+    self.address = address
+
+def Trigger_pack_into(self, buffer):
+    _Trigger_pack(buffer, 0, 0xAA, self.address or 0, 90, )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+
+def SaveSettings___init__(self, register_num, address=None):
+    self.register_num = register_num
+    self.address = address
+
+def SaveSettings_pack_into(self, buffer):
+    _SaveSettings_pack(buffer, 0, 0xAA, self.address or 0, 91, int(self.register_num), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+
+def LoadSettings___init__(self, register_num, address=None):
+    self.register_num = register_num
+    self.address = address
+
+def LoadSettings_pack_into(self, buffer):
+    _LoadSettings_pack(buffer, 0, 0xAA, self.address or 0, 92, int(self.register_num), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+
+def SelectFunction___init__(self, function, address=None):
+    self.function = function
+    self.address = address
+
+def SelectFunction_pack_into(self, buffer):
+    _SelectFunction_pack(buffer, 0, 0xAA, self.address or 0, 93, int(self.function), )
+    buffer[25] = (sum(buffer) - buffer[25]) & 0xFF
+    return buffer
+
+def SelectFunction_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, function, = _SelectFunction_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 94:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(_SelectFunction_0.enum(function), address)
+    return packet
+
+
+def Measure___init__(self, volts, amps, watts, operation_bits, demand_bits, address=None):
+    self.volts = volts
+    self.amps = amps
+    self.watts = watts
+    self.operation_bits = operation_bits
+    self.demand_bits = demand_bits
+    self.address = address
+
+def Measure_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, volts, amps, watts, operation_bits, demand_bits, = _Measure_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 95:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(volts / 1000, amps / 10000, watts / 1000, int2ba(operation_bits, 8, 'little'), int2ba(demand_bits, 10, 'little'), address)
+    return packet
+
+
+def Version___init__(self, model, firmware_major, firmware_minor, serial_number, address=None):
+    self.model = model
+    self.firmware_major = firmware_major
+    self.firmware_minor = firmware_minor
+    self.serial_number = serial_number
+    self.address = address
+
+def Version_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, model, firmware_major, firmware_minor, serial_number, = _Version_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 106:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(model, firmware_major, firmware_minor, serial_number, address)
+    return packet
+
+
+def Barcode___init__(self, identity, sub, version, year, address=None):
+    self.identity = identity
+    self.sub = sub
+    self.version = version
+    self.year = year
+    self.address = address
+
+def Barcode_deserialize(cls, packet_bytes):
+    if len(packet_bytes) != 26:
+        raise FramingException("Packet Data is not 26 bytes long")
+    if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:
+        raise FramingException("Checksum is incorrect")
+    magic, address, command_id, identity, sub, version, year, = _Barcode_unpack(packet_bytes)
+    if magic != 0xAA:
+        raise FramingException("Packet Magic is incorrect")
+    if command_id != 107:
+        unexpected_response(cls, command_id, packet_bytes)
+    packet = cls(identity, sub, version, year, address)
+    return packet
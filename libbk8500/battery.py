@@ -0,0 +1,114 @@
+import time
+import libbk8500 as lbk
+
+COLUMNS = ('time (s)', 'voltage (V)', 'current (A)', 'power (W)', 'charge (Ah)', 'energy (Wh)')
+
+
+def configure(device, mode, level, cutoff_volts, timer_seconds=None):
+    mode = lbk.packet.LimitModeEnum(mode)
+    device.enable_load(False)
+    device.command(lbk.packet.Mode(mode))
+    device.set_level(mode, level)
+    device.command(lbk.packet.MinimumBatteryVoltage(cutoff_volts))
+    if timer_seconds is not None:
+        device.command(lbk.packet.LoadOnTimer(timer_seconds))
+    device.command(lbk.packet.EnableLoadOnTimer(timer_seconds is not None))
+    device.command(lbk.packet.SelectFunction(lbk.packet.SelectFunction.Function.BATTERY))
+    device.enable_load(True)
+
+
+class Integrator:
+    def __init__(self):
+        self.amp_hours = 0.0
+        self.watt_hours = 0.0
+        self.last = None
+
+    def update(self, t, amps, watts):
+        # Trapezoidal rule between consecutive samples, so uneven sample spacing is handled exactly
+        if self.last is not None:
+            last_t, last_amps, last_watts = self.last
+            hours = (t - last_t) / 3600
+            self.amp_hours += (amps + last_amps) / 2 * hours
+            self.watt_hours += (watts + last_watts) / 2 * hours
+        self.last = (t, amps, watts)
+
+
+class AdaptiveLogger:
+    # Keeps a sample whenever the voltage has moved by at least dv since the last kept one, and at least one every
+    # max_interval seconds, so the fast start and knee of a discharge are dense while the long plateau is sparse
+    def __init__(self, sink, dv=0.01, max_interval=60.0):
+        self.sink = sink
+        self.dv = dv
+        self.max_interval = max_interval
+        self.last_t = None
+        self.last_volts = None
+        self.pending = None
+        self.logged = 0
+
+    def update(self, row):
+        t, volts = row[0], row[1]
+        if self.last_t is None or abs(volts - self.last_volts) >= self.dv or t - self.last_t >= self.max_interval:
+            self._write(row)
+        else:
+            self.pending = row
+
+    def _write(self, row):
+        self.sink.writerow(row)
+        self.last_t = row[0]
+        self.last_volts = row[1]
+        self.pending = None
+        self.logged += 1
+
+    def finish(self):
+        # Always keep the final sample so the end of the run is in the log
+        if self.pending is not None:
+            self._write(self.pending)
+
+
+class DischargeResult:
+    def __init__(self, duration, amp_hours, watt_hours, final_volts, samples, logged):
+        self.duration = duration
+        self.amp_hours = amp_hours
+        self.watt_hours = watt_hours
+        self.final_volts = final_volts
+        self.samples = samples
+        self.logged = logged
+
+    def __str__(self):
+        return (f'DischargeResult({self.amp_hours:.4f} Ah, {self.watt_hours:.4f} Wh in {self.duration:.1f} s, '
+                f'final {self.final_volts} V, {self.logged} of {self.samples} samples logged)')
+
+
+def run_discharge(device, writer, interval=1.0, dv=0.01, max_interval=60.0, max_duration=None, progress=None):
+    writer.writerow(COLUMNS)
+    integrator = Integrator()
+    logger = AdaptiveLogger(writer, dv, max_interval)
+    samples = 0
+    volts = None
+    start = time.monotonic()
+    next_sample = start
+    try:
+        while True:
+            meas = device.request(lbk.packet.Measure)
+            t = time.monotonic() - start
+            samples += 1
+            volts = meas.volts
+            integrator.update(t, meas.amps, meas.watts)
+            logger.update((t, meas.volts, meas.amps, meas.watts, integrator.amp_hours, integrator.watt_hours))
+            if progress is not None:
+                progress(t, meas, integrator)
+            # The load turns itself off at the cutoff voltage or when the load on timer runs out
+            if not meas.operation_bits[lbk.packet.Measure.OperationBits.OUTPUT_STATE]:
+                break
+            if max_duration is not None and t >= max_duration:
+                break
+            next_sample += interval
+            delay = next_sample - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_sample = time.monotonic()
+    finally:
+        logger.finish()
+    return DischargeResult(time.monotonic() - start, integrator.amp_hours, integrator.watt_hours, volts, samples,
+                           logger.logged)
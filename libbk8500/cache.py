@@ -0,0 +1,74 @@
+from collections import OrderedDict
+import numpy as np
+import libbk8500 as lbk
+import libbk8500.field
+
+
+def packet_key(packet):
+    # Every packet keeps exactly its field values and address as attributes, in constructor order
+    return (type(packet),) + tuple(vars(packet).values())
+
+
+class FrameCache:
+    # Not thread safe, share one between threads only behind a lock (Device.command uses its own)
+    def __init__(self, maxsize=256):
+        assert maxsize > 0, 'Cache size must be positive'
+        self.maxsize = maxsize
+        self.frames = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, packet):
+        try:
+            key = packet_key(packet)
+            frame = self.frames.get(key)
+        except TypeError:
+            # Unhashable field values are rare (raw bitarrays), just encode those every time
+            self.misses += 1
+            return bytes(packet)
+        if frame is not None:
+            self.hits += 1
+            self.frames.move_to_end(key)
+            return frame
+        self.misses += 1
+        frame = bytes(packet)
+        self.frames[key] = frame
+        if len(self.frames) > self.maxsize:
+            self.frames.popitem(last=False)
+        return frame
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0
+
+    def clear(self):
+        self.frames.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __str__(self):
+        return f'FrameCache({len(self.frames)}/{self.maxsize} frames, {self.hits} hits, {self.misses} misses, ' \
+               f'{self.hit_rate * 100:.1f} % hit rate)'
+
+
+def encode_levels(packet_type, values, address=None):
+    # Builds the frames for a whole list of single value packets (levels, maximums, cutoffs) in one vectorized pass
+    assert packet_type.COMMAND_ID is not None, 'Packet cannot be serialized'
+    assert packet_type.PACKET_FORMAT == 'I18x' and isinstance(packet_type.FIELDS[0], lbk.field.ScaledField), \
+        f'{packet_type.__name__} is not a single scaled value packet'
+    values = np.asarray(values, dtype=float)
+    # Same float product and truncation toward zero as ScaledField.serialize
+    raw = (packet_type.FIELDS[0].scalar * values).astype(np.int64)
+    if np.any((raw < 0) | (raw > 0xFFFF_FFFF)):
+        raise ValueError(f'{packet_type.__name__} value out of range')
+    frames = np.zeros((len(values), 26), dtype=np.uint8)
+    frames[:, 0] = 0xAA
+    frames[:, 1] = address if address is not None else 0
+    frames[:, 2] = packet_type.COMMAND_ID
+    frames[:, 3:7] = raw.astype('<u4').view(np.uint8).reshape(-1, 4)
+    frames[:, 25] = frames[:, :25].sum(axis=1, dtype=np.uint32) & 0xFF
+    return [row.tobytes() for row in frames]
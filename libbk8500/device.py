@@ -1,25 +1,310 @@
+import os
+import threading
+import time
 import serial
 import libbk8500 as lbk
 
+
+class TimeoutException(Exception):
+    def __init__(self, expected, received):
+        self.expected = expected
+        self.received = received
+        super().__init__(f'Timed out after {received} of {expected} bytes')
+
+
+def set_low_latency(ser):
+    # Asks the driver to push received bytes to the host immediately (ASYNC_LOW_LATENCY), which on FTDI adapters
+    # replaces the default 16 ms latency timer. Not every platform or driver supports it, so report whether it took
+    applied = False
+    try:
+        ser.set_low_latency_mode(True)
+        applied = True
+    except (AttributeError, NotImplementedError, ValueError, OSError):
+        pass
+    if ser.port is not None:
+        # Older kernels ignore the flag for ftdi_sio, set the latency timer directly where it is writable
+        timer = f'/sys/bus/usb-serial/devices/{os.path.basename(ser.port)}/latency_timer'
+        try:
+            with open(timer, 'w') as f:
+                f.write('1')
+            applied = True
+        except OSError:
+            pass
+    return applied
+
+
+class SerialConfig:
+    def __init__(self, timeout=None, write_timeout=None, inter_byte_timeout=None, rx_buffer_size=None,
+                 tx_buffer_size=None, low_latency=False):
+        self.timeout = timeout
+        self.write_timeout = write_timeout
+        self.inter_byte_timeout = inter_byte_timeout
+        self.rx_buffer_size = rx_buffer_size
+        self.tx_buffer_size = tx_buffer_size
+        self.low_latency = low_latency
+
+    def open(self, port, baud):
+        ser = serial.Serial(port=port, baudrate=baud, timeout=self.timeout, write_timeout=self.write_timeout,
+                            inter_byte_timeout=self.inter_byte_timeout)
+        if self.rx_buffer_size is not None or self.tx_buffer_size is not None:
+            # Only the Windows backend can resize the driver buffers
+            if hasattr(ser, 'set_buffer_size'):
+                ser.set_buffer_size(rx_size=self.rx_buffer_size or 4096, tx_size=self.tx_buffer_size)
+        if self.low_latency:
+            set_low_latency(ser)
+        return ser
+
+    def __str__(self):
+        return (f'SerialConfig(timeout={self.timeout}, write_timeout={self.write_timeout}, '
+                f'inter_byte_timeout={self.inter_byte_timeout}, rx_buffer_size={self.rx_buffer_size}, '
+                f'tx_buffer_size={self.tx_buffer_size}, low_latency={self.low_latency})')
+
+
+LOW_LATENCY = SerialConfig(timeout=1.0, write_timeout=1.0, low_latency=True)
+
+LEVEL_PACKETS = {
+    lbk.packet.LimitModeEnum.CC: lbk.packet.CurrentLevel,
+    lbk.packet.LimitModeEnum.CV: lbk.packet.VoltageLevel,
+    lbk.packet.LimitModeEnum.CW: lbk.packet.PowerLevel,
+    lbk.packet.LimitModeEnum.CR: lbk.packet.ResistanceLevel,
+}
+
+# Requests that only read state, so concurrent callers can share one round trip
+COALESCED_REQUESTS = frozenset((lbk.packet.Measure, lbk.packet.Version, lbk.packet.Barcode, lbk.packet.MaximumVoltage,
+                                lbk.packet.MaximumCurrent, lbk.packet.MaximumPower))
+
+
+class InFlightRequest:
+    def __init__(self):
+        self.done = threading.Event()
+        self.response_data = None
+        self.error = None
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.response_data
+
+
 class Device:
-    def __init__(self, port, baud=9600):
-        self.ser = serial.Serial(port=port, baudrate=baud)
+    def __init__(self, port, baud=9600, transport=None, config=None, frame_cache=None):
+        if transport is None:
+            config = config if config is not None else SerialConfig()
+            transport = config.open(port, baud)
+        self.ser = transport
+        self.frame_cache = frame_cache
+        self.limits = None
+        # Serializes whole write/read exchanges so frames from different threads never interleave on the wire
+        self.lock = threading.RLock()
+        self.in_flight = {}
+        self.in_flight_lock = threading.Lock()
+        self.round_trips = 0
+        self.coalesced = 0
+        # Reused for every command and its status reply, only touched while holding the lock
+        self.tx_buffer = bytearray(lbk.packet.FRAME_SIZE)
+        self.rx_buffer = bytearray(lbk.packet.FRAME_SIZE)
+        self.pipeline_buffer = bytearray(2 * lbk.packet.FRAME_SIZE)
+        # A lbk.profiling.PhaseTimer to charge write, wait and decode time to, per packet class
+        self.profiler = None
+        # time.monotonic() just before the last exchange was written and just after its reply arrived. The clock is
+        # shared by every process on the host, so samples from different devices can be put on one timebase
+        self.sent = None
+        self.received = None
+        # Ident of the thread between writing a request and reading its reply, so a signal handler on that thread can
+        # tell it would interrupt an exchange
+        self.exchanging = None
 
-    def command(self, packet):
-        data = bytes(packet)
+    def close(self):
+        self.ser.close()
+
+    def read_frame(self):
+        # With a read timeout configured a short read means the device did not answer in time. Drop whatever partial
+        # frame arrived so the next exchange starts aligned
+        data = self.ser.read(26)
+        if len(data) != 26:
+            if hasattr(self.ser, 'reset_input_buffer'):
+                self.ser.reset_input_buffer()
+            raise TimeoutException(26, len(data))
+        return data
+
+    def read_frame_into(self, buffer):
+        # Same as read_frame but fills a caller owned buffer, straight from the driver where the transport can
+        readinto = getattr(self.ser, 'readinto', None)
+        if readinto is not None:
+            received = readinto(buffer) or 0
+        else:
+            data = self.ser.read(26)
+            received = len(data)
+            buffer[:received] = data
+        if received != 26:
+            if hasattr(self.ser, 'reset_input_buffer'):
+                self.ser.reset_input_buffer()
+            raise TimeoutException(26, received)
+        return buffer
+
+    def exchange(self, data):
         assert len(data) == 26, "Packet serialized to wrong length"
-        self.ser.write(data)
-        status_data = self.ser.read(26)
-        lbk.packet.Status.deserialize(status_data)
+        with self.lock:
+            self.exchanging = threading.get_ident()
+            try:
+                if self.profiler is not None:
+                    return self._profiled_exchange(data, self.read_frame)
+                self.sent = time.monotonic()
+                self.ser.write(data)
+                self.round_trips += 1
+                response_data = self.read_frame()
+                self.received = time.monotonic()
+                return response_data
+            finally:
+                self.exchanging = None
 
-    def request(self, response_type):
-        data = response_type.request()
+    def exchange_into(self, data, buffer):
         assert len(data) == 26, "Packet serialized to wrong length"
+        with self.lock:
+            self.exchanging = threading.get_ident()
+            try:
+                if self.profiler is not None:
+                    return self._profiled_exchange(data, lambda: self.read_frame_into(buffer))
+                self.sent = time.monotonic()
+                self.ser.write(data)
+                self.round_trips += 1
+                self.read_frame_into(buffer)
+                self.received = time.monotonic()
+                return buffer
+            finally:
+                self.exchanging = None
+
+    def _profiled_exchange(self, data, read):
+        # The write returns once the bytes are queued, the read covers the wire time and the device's reaction
+        name = lbk.profiling.packet_name(data)
+        self.sent = time.monotonic()
+        start = time.perf_counter()
         self.ser.write(data)
-        response_data = self.ser.read(26)
+        self.round_trips += 1
+        written = time.perf_counter()
+        try:
+            response_data = read()
+            self.received = time.monotonic()
+            return response_data
+        finally:
+            self.profiler.add(lbk.profiling.SERIAL_WRITE, written - start, name)
+            self.profiler.add(lbk.profiling.DEVICE_WAIT, time.perf_counter() - written, name)
+
+    def command(self, packet):
+        if self.limits is not None:
+            self.limits.validate(packet)
+        with self.lock:
+            # The cache is not thread safe on its own, it is only touched while holding the device lock
+            if self.frame_cache is not None:
+                self.command_frame(self.frame_cache.encode(packet))
+            else:
+                self.command_frame(packet.pack_into(self.tx_buffer))
+
+    def command_frame(self, data):
+        with self.lock:
+            status_data = self.exchange_into(data, self.rx_buffer)
+            if self.profiler is not None:
+                with self.profiler.phase(lbk.profiling.DECODE, 'Status'):
+                    lbk.packet.Status.deserialize(status_data)
+            else:
+                lbk.packet.Status.deserialize(status_data)
+
+    def command_request(self, packet, response_type):
+        # Sends a command and a request back to back in one write, the device answers both in order. That saves one
+        # host to device turnaround per cycle for control loops that set a level and read back the result. Both replies
+        # are read before either is checked so the link stays aligned when the command fails
+        if self.limits is not None:
+            self.limits.validate(packet)
+        with self.lock:
+            frames = memoryview(self.pipeline_buffer)
+            packet.pack_into(frames[:26])
+            frames[26:] = response_type.request()
+            self.exchanging = threading.get_ident()
+            try:
+                if self.profiler is not None:
+                    response_data = self._profiled_exchange(frames, self._read_pipelined)
+                else:
+                    self.sent = time.monotonic()
+                    self.ser.write(frames)
+                    self.round_trips += 1
+                    response_data = self._read_pipelined()
+                    self.received = time.monotonic()
+            finally:
+                self.exchanging = None
+            lbk.packet.Status.deserialize(self.rx_buffer)
+            return response_type.deserialize(response_data)
+
+    def _read_pipelined(self):
+        self.read_frame_into(self.rx_buffer)
+        return self.read_frame()
+
+    def request(self, response_type):
+        if response_type in COALESCED_REQUESTS:
+            response_data = self.coalesced_exchange(response_type)
+        else:
+            response_data = self.exchange(response_type.request())
+        if self.profiler is not None:
+            with self.profiler.phase(lbk.profiling.DECODE, response_type.__name__):
+                return response_type.deserialize(response_data)
         response = response_type.deserialize(response_data)
         return response
 
+    def request_timed(self, response_type):
+        # Returns (sent, received, response). Never coalesced, the times always belong to this caller's round trip
+        with self.lock:
+            response_data = self.exchange(response_type.request())
+            sent, received = self.sent, self.received
+        if self.profiler is not None:
+            with self.profiler.phase(lbk.profiling.DECODE, response_type.__name__):
+                return sent, received, response_type.deserialize(response_data)
+        return sent, received, response_type.deserialize(response_data)
+
+    def coalesced_exchange(self, response_type):
+        # The first caller performs the round trip, everyone who asks for the same thing before it finishes waits for
+        # it and gets the same response instead of queueing another round trip behind the lock
+        with self.in_flight_lock:
+            pending = self.in_flight.get(response_type)
+            leader = pending is None
+            if leader:
+                pending = self.in_flight[response_type] = InFlightRequest()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return pending.wait()
+        try:
+            pending.response_data = self.exchange(response_type.request())
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self.in_flight_lock:
+                del self.in_flight[response_type]
+            pending.done.set()
+        return pending.response_data
+
+    def request_frames(self, response_type, count, times=None):
+        # times, when given, is a (count, 2) array that receives the sent and received time of every frame
+        request = response_type.request()
+        frames = bytearray(26 * count)
+        view = memoryview(frames)
+        for i in range(count):
+            # The lock is released between frames so other threads can get in, but held until the times are copied so
+            # they cannot belong to another thread's exchange
+            with self.lock:
+                self.exchange_into(request, view[26 * i:26 * (i + 1)])
+                if times is not None:
+                    times[i] = (self.sent, self.received)
+        return frames
+
+    def identify(self):
+        # Looks up the ratings of the connected model once, so out of range values fail on the host from now on. Imported
+        # here, limits needs NumPy and importing the package alone should not pay for that
+        import libbk8500.limits
+        version = self.request(lbk.packet.Version)
+        self.limits = lbk.limits.for_version(version)
+        return version
+
     def enable_load(self, enable):
         self.command(lbk.packet.EnableLoad(enable))
 
@@ -38,11 +323,5 @@ class Device:
         self.command(lbk.packet.Trigger())
 
     def set_level(self, limit_mode, value):
-        limit_mode = lbk.packet.LimitModeEnum(limit_mode)
-        packet_type = {
-            lbk.packet.LimitModeEnum.CC: lbk.packet.CurrentLevel,
-            lbk.packet.LimitModeEnum.CV: lbk.packet.VoltageLevel,
-            lbk.packet.LimitModeEnum.CW: lbk.packet.PowerLevel,
-            lbk.packet.LimitModeEnum.CR: lbk.packet.ResistanceLevel,
-        }[limit_mode]
+        packet_type = LEVEL_PACKETS[lbk.packet.LimitModeEnum(limit_mode)]
         self.command(packet_type(value))
@@ -1,5 +1,9 @@
 from bitarray.util import int2ba, ba2int
 
+# Besides converting values one at a time, every field can write the same conversion as a Python expression, which
+# packet.py pastes into the straight-line codecs it generates. There, name refers to the field itself and int2ba and
+# ba2int are available
+
 
 class Field:
     def serialize(self, value):
@@ -8,6 +12,12 @@ class Field:
     def deserialize(self, data):
         return data
 
+    def serialize_source(self, value, name):
+        return value
+
+    def deserialize_source(self, data, name):
+        return data
+
 
 class BitField(Field):
     def __init__(self, length):
@@ -19,6 +29,12 @@ class BitField(Field):
     def deserialize(self, data):
         return int2ba(data, self.length, 'little')
 
+    def serialize_source(self, value, name):
+        return f'ba2int({value})'
+
+    def deserialize_source(self, data, name):
+        return f"int2ba({data}, {self.length}, 'little')"
+
 
 class IntField:
     def serialize(self, value):
@@ -27,6 +43,12 @@ class IntField:
     def deserialize(self, data):
         return data
 
+    def serialize_source(self, value, name):
+        return f'int({value})'
+
+    def deserialize_source(self, data, name):
+        return data
+
 
 class BoolField(Field):
     def serialize(self, value):
@@ -35,6 +57,12 @@ class BoolField(Field):
     def deserialize(self, data):
         return bool(data)
 
+    def serialize_source(self, value, name):
+        return f'(1 if {value} else 0)'
+
+    def deserialize_source(self, data, name):
+        return f'bool({data})'
+
 
 class ScaledField(Field):
     def __init__(self, scalar):
@@ -46,6 +74,12 @@ class ScaledField(Field):
     def deserialize(self, data):
         return data / self.scalar
 
+    def serialize_source(self, value, name):
+        return f'int({self.scalar!r} * {value})'
+
+    def deserialize_source(self, data, name):
+        return f'{data} / {self.scalar!r}'
+
 
 class EnumField(Field):
     def __init__(self, enum):
@@ -56,3 +90,9 @@ class EnumField(Field):
 
     def deserialize(self, data):
         return self.enum(data)
+
+    def serialize_source(self, value, name):
+        return f'int({value})'
+
+    def deserialize_source(self, data, name):
+        return f'{name}.enum({data})'
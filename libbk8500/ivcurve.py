@@ -0,0 +1,139 @@
+import concurrent.futures
+import csv
+import os
+import numpy as np
+
+VOLTS_COLUMN = 'voltage (V)'
+AMPS_COLUMN = 'current (A)'
+CURVE_DTYPE = np.dtype([('volts', '<f8'), ('amps', '<f8')])
+METRICS = ('Voc (V)', 'Isc (A)', 'Vmp (V)', 'Imp (A)', 'Pmp (W)', 'fill factor', 'Rs (Ω)', 'Rsh (Ω)')
+SUMMARY_COLUMNS = ('file', 'points') + METRICS
+FIT_POINTS = 4
+BATCH_SIZE = 256
+
+
+class CurveException(Exception):
+    pass
+
+
+def save_curve(path, volts, amps):
+    curve = np.empty(len(volts), dtype=CURVE_DTYPE)
+    curve['volts'] = volts
+    curve['amps'] = amps
+    np.save(path, curve)
+
+
+def load_curve(path):
+    # .npy files are memory mapped, either as written by save_curve or as plain (voltage, current) columns. csv files
+    # written by power_tool test or acquire are streamed and only their voltage and current columns are parsed
+    if path.endswith('.npy'):
+        data = np.load(path, mmap_mode='r')
+        if data.dtype.names is not None:
+            return np.asarray(data['volts'], dtype=float), np.asarray(data['amps'], dtype=float)
+        return np.asarray(data[:, 0], dtype=float), np.asarray(data[:, 1], dtype=float)
+    with open(path, newline='', encoding='utf-8') as f:
+        header = next(csv.reader([f.readline()]), [])
+        if VOLTS_COLUMN not in header or AMPS_COLUMN not in header:
+            raise CurveException(f'{path} has no {VOLTS_COLUMN!r} and {AMPS_COLUMN!r} columns')
+        data = np.loadtxt(f, delimiter=',', usecols=(header.index(VOLTS_COLUMN), header.index(AMPS_COLUMN)),
+                          ndmin=2)
+    return data[:, 0], data[:, 1]
+
+
+def pad_curves(curves):
+    # Stacks curves of different lengths into (curve, point) arrays, NaN past the end of each curve
+    length = max((len(volts) for volts, _ in curves), default=0)
+    volts = np.full((len(curves), length), np.nan)
+    amps = np.full((len(curves), length), np.nan)
+    for i, (curve_volts, curve_amps) in enumerate(curves):
+        volts[i, :len(curve_volts)] = curve_volts
+        amps[i, :len(curve_amps)] = curve_amps
+    return volts, amps
+
+
+def _fit(x, y, weights):
+    # Least squares line y = intercept + slope * x of every row, over the points with weight 1
+    n = weights.sum(axis=1)
+    x_mean = (weights * x).sum(axis=1) / n
+    y_mean = (weights * y).sum(axis=1) / n
+    dx = x - x_mean[:, None]
+    slope = (weights * dx * (y - y_mean[:, None])).sum(axis=1) / (weights * dx ** 2).sum(axis=1)
+    return y_mean - slope * x_mean, slope
+
+
+def curve_metrics(volts, amps, fit_points=FIT_POINTS):
+    # Metrics of many curves at once from padded (curve, point) arrays, one row of METRICS per curve. Only points where
+    # the module delivers current count. Isc and the shunt resistance come from a line through the fit_points lowest
+    # voltage points, Voc and the series resistance from a line through the fit_points highest ones, so a curve does
+    # not need to reach either axis. Curves with fewer than two points get NaN
+    volts = np.asarray(volts, dtype=float)
+    amps = np.asarray(amps, dtype=float)
+    if volts.shape[1] == 0:
+        # A batch where no file had a single point, there is nothing to take a maximum over
+        return np.full((len(volts), len(METRICS)), np.nan)
+    valid = np.isfinite(volts) & np.isfinite(amps) & (amps > 0)
+    order = np.argsort(np.where(valid, volts, np.inf), axis=1, kind='stable')
+    volts = np.take_along_axis(np.where(valid, volts, 0.0), order, axis=1)
+    amps = np.take_along_axis(np.where(valid, amps, 0.0), order, axis=1)
+    count = valid.sum(axis=1)
+    k = np.minimum(fit_points, count)[:, None]
+    head = np.arange(min(fit_points, volts.shape[1]))[None, :]
+    weights = (head < k).astype(float)
+    low = np.broadcast_to(head, weights.shape)
+    high = np.clip(count[:, None] - k + head, 0, None) * (head < k)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        isc, low_slope = _fit(np.take_along_axis(volts, low, 1), np.take_along_axis(amps, low, 1), weights)
+        intercept, high_slope = _fit(np.take_along_axis(volts, high, 1), np.take_along_axis(amps, high, 1), weights)
+        voc = -intercept / high_slope
+        power = np.where(np.arange(volts.shape[1])[None, :] < count[:, None], volts * amps, -np.inf)
+        mpp = power.argmax(axis=1)[:, None]
+        vmp = np.take_along_axis(volts, mpp, 1)[:, 0]
+        imp = np.take_along_axis(amps, mpp, 1)[:, 0]
+        pmp = vmp * imp
+        metrics = np.stack([voc, isc, vmp, imp, pmp, pmp / (voc * isc), -1 / high_slope, -1 / low_slope], axis=1)
+    metrics[count < 2] = np.nan
+    return metrics
+
+
+def analyze_batch(paths, fit_points=FIT_POINTS):
+    curves = []
+    for path in paths:
+        try:
+            curves.append(load_curve(path))
+        except (OSError, ValueError, CurveException):
+            curves.append((np.empty(0), np.empty(0)))
+    volts, amps = pad_curves(curves)
+    metrics = curve_metrics(volts, amps, fit_points)
+    return [(path, len(curve[0])) + tuple(float(value) for value in row)
+            for path, curve, row in zip(paths, curves, metrics)]
+
+
+def find_curves(paths):
+    # Directories stand for every csv and npy file directly in them
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found += sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(('.csv', '.npy')))
+        else:
+            found.append(path)
+    return found
+
+
+def analyze(paths, workers=None, batch=BATCH_SIZE, fit_points=FIT_POINTS):
+    # Rows of SUMMARY_COLUMNS in the order of paths. Large sets are split into batches that are each loaded and
+    # computed in one vectorized pass in a separate process
+    paths = list(paths)
+    if len(paths) <= batch or workers == 1:
+        return analyze_batch(paths, fit_points)
+    batches = [paths[i:i + batch] for i in range(0, len(paths), batch)]
+    rows = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        for batch_rows in executor.map(analyze_batch, batches, [fit_points] * len(batches)):
+            rows += batch_rows
+    return rows
+
+
+def write_summary(out, rows):
+    writer = csv.writer(out)
+    writer.writerow(SUMMARY_COLUMNS)
+    writer.writerows(rows)
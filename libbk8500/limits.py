@@ -0,0 +1,165 @@
+import inspect
+import struct
+import numpy as np
+import libbk8500 as lbk
+import libbk8500.field
+
+
+class ValidationException(ValueError):
+    pass
+
+
+class ModelRatings:
+    def __init__(self, model, volts, amps, watts, min_ohms=0.1, max_ohms=7500):
+        self.model = model
+        self.volts = volts
+        self.amps = amps
+        self.watts = watts
+        self.min_ohms = min_ohms
+        self.max_ohms = max_ohms
+
+
+MODELS = {ratings.model: ratings for ratings in [
+    ModelRatings('8500', 120, 30, 300),
+    ModelRatings('8502', 500, 15, 300),
+    ModelRatings('8510', 120, 120, 600),
+    ModelRatings('8512', 500, 30, 600),
+    ModelRatings('8514', 120, 240, 1500),
+    ModelRatings('8518', 60, 240, 1200),
+    ModelRatings('8520', 120, 240, 2400),
+    ModelRatings('8522', 500, 120, 2400),
+    ModelRatings('8524', 60, 240, 5000),
+    ModelRatings('8526', 500, 240, 5000),
+]}
+
+# Which rating bounds each kind of value, by the unit of the field it lands in
+VOLTS_PACKETS = (lbk.packet.MaximumVoltage, lbk.packet.VoltageLevel, lbk.packet.MinimumBatteryVoltage,
+                 lbk.packet.VoltageTransient, lbk.packet.StepVoltage)
+AMPS_PACKETS = (lbk.packet.MaximumCurrent, lbk.packet.CurrentLevel, lbk.packet.CurrentTransient,
+                lbk.packet.StepCurrent)
+WATTS_PACKETS = (lbk.packet.MaximumPower, lbk.packet.PowerLevel, lbk.packet.PowerTransient, lbk.packet.StepPower)
+OHMS_PACKETS = (lbk.packet.ResistanceLevel, lbk.packet.ResistanceTransient, lbk.packet.StepResistance)
+TIME_FIELDS = ('time_a', 'time_b', 'seconds')
+# How far from a whole number of resolution steps a value may be and still count as on the grid, in steps. Only
+# absorbs float error, e.g. 0.3 / 0.001 = 299.99999999999994
+RESOLUTION_TOLERANCE = 1e-3
+
+
+class FieldLimit:
+    def __init__(self, name, low, high, resolution):
+        self.name = name
+        self.low = low
+        self.high = high
+        self.resolution = resolution
+
+    def off_grid(self, values):
+        # True where a value is not a multiple of the resolution, which the encoding would silently truncate
+        steps = np.asarray(values, dtype=float) / self.resolution
+        return np.abs(steps - np.round(steps)) > RESOLUTION_TOLERANCE
+
+    def __str__(self):
+        return f'{self.name} in [{self.low}, {self.high}] step {self.resolution}'
+
+
+def encoding_limits(packet_type, names):
+    # The range every scaled field can be encoded in at all, from its struct code
+    codes = [code for code in _expand(packet_type.PACKET_FORMAT) if code != 'x']
+    limits = []
+    for name, code, field in zip(names, codes, packet_type.FIELDS):
+        if isinstance(field, lbk.field.ScaledField):
+            high = (256 ** struct.calcsize(code) - 1) / field.scalar
+            limits.append(FieldLimit(name, 0, high, 1 / field.scalar))
+        else:
+            limits.append(None)
+    return limits
+
+
+def _expand(packet_format):
+    # 'IHIHB9x' -> ['I', 'H', 'I', 'H', 'B', 'x'], a count before a letter other than x or s repeats it
+    codes = []
+    count = ''
+    for char in packet_format:
+        if char.isdigit():
+            count += char
+            continue
+        codes += [char] * (int(count) if count and char not in 'xs' else 1)
+        count = ''
+    return codes
+
+
+class Limits:
+    def __init__(self, ratings=None):
+        self.ratings = ratings
+        self.table = {}
+        for packet_type in vars(lbk.packet).values():
+            if isinstance(packet_type, type) and issubclass(packet_type, lbk.packet.Packet) and \
+                    packet_type.COMMAND_ID is not None and packet_type.FIELDS:
+                self.table[packet_type] = self._build(packet_type)
+
+    def _build(self, packet_type):
+        names = list(inspect.signature(packet_type).parameters)[:len(packet_type.FIELDS)]
+        limits = encoding_limits(packet_type, names)
+        if self.ratings is None:
+            return limits
+        rating = None
+        low = 0
+        if issubclass(packet_type, VOLTS_PACKETS):
+            rating = self.ratings.volts
+        elif issubclass(packet_type, AMPS_PACKETS):
+            rating = self.ratings.amps
+        elif issubclass(packet_type, WATTS_PACKETS):
+            rating = self.ratings.watts
+        elif issubclass(packet_type, OHMS_PACKETS):
+            low, rating = self.ratings.min_ohms, self.ratings.max_ohms
+        for limit in limits:
+            if limit is not None and rating is not None and limit.name not in TIME_FIELDS:
+                limit.low = max(limit.low, low)
+                limit.high = min(limit.high, rating)
+        return limits
+
+    def validate(self, packet):
+        limits = self.table.get(type(packet))
+        if limits is None:
+            return
+        for limit in limits:
+            if limit is None:
+                continue
+            value = getattr(packet, limit.name)
+            if not limit.low <= value <= limit.high:
+                raise ValidationException(f'{type(packet).__name__}.{limit.name} = {value} is outside '
+                                          f'[{limit.low}, {limit.high}]')
+            if limit.off_grid(value):
+                raise ValidationException(f'{type(packet).__name__}.{limit.name} = {value} is not a multiple of '
+                                          f'{limit.resolution}')
+
+    def validate_levels(self, packet_type, values):
+        # Checks a whole sweep at once before any of it is sent
+        limit = self.table[packet_type][0]
+        values = np.asarray(values, dtype=float)
+        bad = np.flatnonzero(~np.isfinite(values) | (values < limit.low) | (values > limit.high))
+        if len(bad) > 0:
+            raise ValidationException(f'{len(bad)} {packet_type.__name__} values are outside [{limit.low}, '
+                                      f'{limit.high}], the first is {values[bad[0]]} at index {bad[0]}')
+        bad = np.flatnonzero(limit.off_grid(values))
+        if len(bad) > 0:
+            raise ValidationException(f'{len(bad)} {packet_type.__name__} values are not a multiple of '
+                                      f'{limit.resolution}, the first is {values[bad[0]]} at index {bad[0]}')
+
+    def __str__(self):
+        return f'Limits({self.ratings.model if self.ratings is not None else "unknown model"})'
+
+
+def model_name(identity):
+    identity = identity.rstrip(b'\x00').decode('ascii', 'replace').strip()
+    for model in MODELS:
+        if identity.startswith(model):
+            return model
+    return None
+
+
+def for_version(version):
+    return Limits(MODELS.get(model_name(version.model)))
+
+
+def for_barcode(barcode):
+    return Limits(MODELS.get(model_name(barcode.identity + barcode.sub)))
@@ -0,0 +1,58 @@
+import time
+import libbk8500 as lbk
+
+BAUD_RATES = (4800, 9600, 19200, 38400)
+
+
+class ProbeResult:
+    def __init__(self, baud, trials, successes, elapsed):
+        self.baud = baud
+        self.trials = trials
+        self.successes = successes
+        self.elapsed = elapsed
+
+    @property
+    def reliable(self):
+        return self.successes == self.trials
+
+    @property
+    def round_trips_per_second(self):
+        # Every successful trial is one request frame out and one response frame back
+        return self.successes / self.elapsed if self.elapsed > 0 else 0
+
+    def __str__(self):
+        return f'{self.baud:6} baud: {self.successes}/{self.trials} ok, {self.round_trips_per_second:.1f} round trips/s'
+
+
+def probe(port, baud, trials=10, timeout=None, low_latency=False):
+    # A 26 byte frame takes 260 bit times each way, leave plenty of room for the device to answer
+    timeout = timeout if timeout is not None else 0.1 + 2 * 260 / baud
+    successes = 0
+    # low_latency also writes the FTDI latency timer in sysfs where it can, so it is left to the caller
+    with lbk.device.SerialConfig(timeout=timeout, low_latency=low_latency).open(port, baud) as ser:
+        ser.reset_input_buffer()
+        device = lbk.Device(port, baud, transport=ser)
+        start = time.perf_counter()
+        for _ in range(trials):
+            try:
+                device.request(lbk.packet.Version)
+                successes += 1
+            except (lbk.packet.FramingException, ValueError, lbk.packet.StatusException, lbk.device.TimeoutException):
+                ser.reset_input_buffer()
+                if successes == 0:
+                    # Nothing answers at this rate, do not wait out a timeout for every trial
+                    break
+        elapsed = time.perf_counter() - start
+    return ProbeResult(baud, trials, successes, elapsed)
+
+
+def autotune(port, rates=BAUD_RATES, trials=10, low_latency=False):
+    # The rate is chosen on the front panel of the device, so probe from the fastest down and stop at the first one
+    # that answers every trial
+    results = []
+    for baud in sorted(rates, reverse=True):
+        result = probe(port, baud, trials, low_latency=low_latency)
+        results.append(result)
+        if result.reliable:
+            return result, results
+    return None, results
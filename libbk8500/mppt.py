@@ -0,0 +1,173 @@
+import abc
+import time
+import numpy as np
+import libbk8500 as lbk
+
+COLUMNS = ('time (s)', 'level (V)', 'voltage (V)', 'current (A)', 'power (W)')
+# What a pipelined cycle fails with when the device dropped or garbled one of the two replies, rather than rejecting
+# the setpoint
+PIPELINE_ERRORS = (lbk.packet.FramingException, lbk.device.TimeoutException)
+
+
+class Tracker(abc.ABC):
+    # Moves a voltage setpoint by step in whichever direction the last measurement says the maximum power point is,
+    # keeping it within [low, high]
+    def __init__(self, start, step=0.1, low=0.0, high=None):
+        assert step > 0, 'Step must be positive'
+        self.level = start
+        self.step = step
+        self.low = low
+        self.high = high
+
+    def move(self, direction):
+        level = self.level + direction * self.step
+        if self.high is not None:
+            level = min(level, self.high)
+        self.level = max(level, self.low)
+        return self.level
+
+    @abc.abstractmethod
+    def update(self, volts, amps):
+        pass
+
+
+class PerturbObserve(Tracker):
+    # Keeps stepping the same way while the power rises and turns around when it falls, so it oscillates around the
+    # maximum power point by a step or two
+    def __init__(self, start, step=0.1, low=0.0, high=None):
+        super().__init__(start, step, low, high)
+        self.direction = 1
+        self.last_power = None
+
+    def update(self, volts, amps):
+        power = volts * amps
+        if self.last_power is not None and power < self.last_power:
+            self.direction = -self.direction
+        self.last_power = power
+        return self.move(self.direction)
+
+
+class IncrementalConductance(Tracker):
+    # At the maximum power point dP/dV = I + V dI/dV = 0, so compare the incremental conductance dI/dV with -I/V and
+    # hold the setpoint when they agree within tolerance (in A/V)
+    def __init__(self, start, step=0.1, low=0.0, high=None, tolerance=0.01):
+        super().__init__(start, step, low, high)
+        self.tolerance = tolerance
+        self.last = None
+
+    def update(self, volts, amps):
+        last, self.last = self.last, (volts, amps)
+        if last is None or volts <= 0:
+            return self.move(1)
+        dv = volts - last[0]
+        di = amps - last[1]
+        if dv == 0:
+            # The setpoint was held, only a change of the source moves it again
+            if di == 0:
+                return self.level
+            return self.move(1 if di > 0 else -1)
+        slope = di / dv + amps / volts
+        if abs(slope) <= self.tolerance:
+            return self.level
+        return self.move(1 if slope > 0 else -1)
+
+
+TRACKERS = {
+    'po': PerturbObserve,
+    'inc': IncrementalConductance,
+}
+
+
+class LoopStats:
+    def __init__(self, periods):
+        self.periods = np.asarray(periods, dtype=float)
+
+    @property
+    def frequency(self):
+        return 1 / self.periods.mean() if len(self.periods) > 0 else 0.0
+
+    @property
+    def jitter(self):
+        # Standard deviation of the cycle period
+        return float(self.periods.std()) if len(self.periods) > 0 else 0.0
+
+    @property
+    def worst(self):
+        return float(self.periods.max()) if len(self.periods) > 0 else 0.0
+
+    def __str__(self):
+        return (f'LoopStats({self.frequency:.1f} Hz, jitter {self.jitter * 1000:.3f} ms, '
+                f'worst {self.worst * 1000:.3f} ms over {len(self.periods)} cycles)')
+
+
+class MpptResult:
+    def __init__(self, t, levels, volts, amps, stats, pipelined=False):
+        self.t = t
+        self.levels = levels
+        self.volts = volts
+        self.amps = amps
+        self.watts = volts * amps
+        self.stats = stats
+        # Whether the loop still pipelined at the end, False after falling back
+        self.pipelined = pipelined
+
+    def rows(self):
+        return zip(self.t, self.levels, self.volts, self.amps, self.watts)
+
+    def __str__(self):
+        if len(self.t) == 0:
+            return 'MpptResult(0 cycles)'
+        return f'MpptResult({len(self.t)} cycles, final {self.watts[-1]:.3f} W, {self.stats})'
+
+
+def configure(device, start):
+    device.enable_load(False)
+    device.command(lbk.packet.Mode(lbk.packet.LimitModeEnum.CV))
+    device.set_level(lbk.packet.LimitModeEnum.CV, start)
+    device.command(lbk.packet.SelectFunction(lbk.packet.SelectFunction.Function.FIXED))
+    device.enable_load(True)
+
+
+def cycle(device, level, pipelined):
+    # Returns the measurement and whether to keep pipelining. A pipelined cycle that times out or reads a misaligned
+    # reply drops the input buffer and is repeated as a command and a request, which every later cycle then sticks to
+    if pipelined:
+        try:
+            return device.command_request(lbk.packet.VoltageLevel(level), lbk.packet.Measure), True
+        except PIPELINE_ERRORS:
+            if hasattr(device.ser, 'reset_input_buffer'):
+                device.ser.reset_input_buffer()
+    device.command(lbk.packet.VoltageLevel(level))
+    return device.request(lbk.packet.Measure), False
+
+
+def run_mppt(device, tracker, duration=None, cycles=None, interval=None, callback=None, pipelined=False):
+    # Each cycle sets the new VoltageLevel and then measures, so the loop runs at the link rate unless interval asks
+    # for a slower fixed rate. The measurement of a cycle is taken after its setpoint. pipelined sends both in one
+    # write (device.command_request) to save a turnaround per cycle, so far only checked against the simulator
+    assert duration is not None or cycles is not None, 'Need a duration or a number of cycles'
+    times, levels, volts, amps = [], [], [], []
+    level = tracker.level
+    start = time.perf_counter()
+    next_cycle = start
+    while (cycles is None or len(times) < cycles) and (duration is None or next_cycle - start < duration):
+        now = time.perf_counter()
+        meas, pipelined = cycle(device, level, pipelined)
+        times.append(now - start)
+        levels.append(level)
+        volts.append(meas.volts)
+        amps.append(meas.amps)
+        if callback is not None:
+            callback(now - start, level, meas)
+        level = tracker.update(meas.volts, meas.amps)
+        if interval is None:
+            next_cycle = time.perf_counter()
+            continue
+        next_cycle += interval
+        delay = next_cycle - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            next_cycle = time.perf_counter()
+    t = np.array(times)
+    return MpptResult(t, np.array(levels), np.array(volts), np.array(amps), LoopStats(np.diff(t)), pipelined)
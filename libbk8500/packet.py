@@ -1,12 +1,48 @@
 import enum
 import struct
+import threading
 from .field import *
 
 PACKET_STRUCT = '<BBB'
+FRAME_SIZE = 26
+
+# Compiled once per payload format, the header and payload of a frame are packed in one call
+FRAME_STRUCTS = {}
+# Request frames never change for a given address, so each one is built once
+REQUEST_FRAMES = {}
+# Per thread scratch frame for serialize, so the only allocation is the returned bytes
+_scratch = threading.local()
+
+# Names the generated code uses itself, so no field can be called that
+RESERVED_NAMES = frozenset(('self', 'cls', 'buffer', 'packet', 'packet_bytes', 'magic', 'address', 'command_id'))
+# Packets declared with a SCHEMA, waiting for their codecs to be installed at the end of this module
+_pending_codecs = []
+_codecs_ready = False
 
 
 def calc_checksum(packet_bytes):
-    return sum(byte for byte in packet_bytes) & 0xFF
+    return sum(packet_bytes) & 0xFF
+
+
+def frame_checksum(frame):
+    # Checksum of the first 25 bytes of any frame buffer, summed in C without slicing out a copy
+    return (sum(frame) - frame[25]) & 0xFF
+
+
+def frame_struct(packet_format):
+    compiled = FRAME_STRUCTS.get(packet_format)
+    if compiled is None:
+        compiled = struct.Struct(PACKET_STRUCT + packet_format)
+        assert compiled.size == 25, "Packet Format String is not 26 bytes long"
+        FRAME_STRUCTS[packet_format] = compiled
+    return compiled
+
+
+def _scratch_frame():
+    frame = getattr(_scratch, 'frame', None)
+    if frame is None:
+        frame = _scratch.frame = bytearray(FRAME_SIZE)
+    return frame
 
 class StatusException(Exception):
     def __init__(self, code, message=""):
@@ -14,50 +50,103 @@ class StatusException(Exception):
         super().__init__('Status:', code, message)
 
 
+class FramingException(ValueError):
+    # A reply that is not a valid frame of the expected packet: wrong length, checksum, start byte or ID. The link is
+    # most likely misaligned, dropping the input buffer brings it back
+    pass
+
+
 class Packet:
     COMMAND_ID = None
     RESPONSE_ID = None
     PACKET_FORMAT = None
     FIELDS = []
+    # [(attribute name, struct code, Field), ...] declares a packet, PACKET_FORMAT, FIELDS, __init__, the codecs and,
+    # given TEXT, __str__ are all derived from it
+    SCHEMA = None
+    TEXT = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        schema = cls.__dict__.get('SCHEMA')
+        if schema is None:
+            return
+        for name, _, _ in schema:
+            assert name not in RESERVED_NAMES, f'{cls.__name__}.{name} is a reserved name'
+        codes = ''.join(code for _, code, _ in schema)
+        padding = 22 - struct.calcsize('<' + codes)
+        cls.PACKET_FORMAT = codes + (f'{padding}x' if padding > 0 else '')
+        cls.FIELDS = [field for _, _, field in schema]
+        # Remembered before any codec is installed, so generating the source again gives the same result
+        cls._hand_written = frozenset(method for method in ('__init__',) if method in cls.__dict__)
+        if _codecs_ready:
+            install_codecs([cls])
+        else:
+            _pending_codecs.append(cls)
 
     @classmethod
     def request(cls, address=None):
         assert cls.RESPONSE_ID is not None, 'Packet cannot be Requested'
-        struct_format = PACKET_STRUCT + '22x'
         address = address if address is not None else 0
-        data = struct.pack(struct_format, 0xAA, address, cls.RESPONSE_ID)
-        checksum = calc_checksum(data).to_bytes(1, 'big')
-        return data + checksum
-
-    def serialize(self, *command_args):
+        key = (cls.RESPONSE_ID, address)
+        frame = REQUEST_FRAMES.get(key)
+        if frame is None:
+            data = bytearray(FRAME_SIZE)
+            struct.pack_into(PACKET_STRUCT, data, 0, 0xAA, address, cls.RESPONSE_ID)
+            data[25] = frame_checksum(data)
+            frame = REQUEST_FRAMES[key] = bytes(data)
+        return frame
+
+    # The methods below are the generic versions for packets declared by hand with PACKET_FORMAT and FIELDS, packets
+    # with a SCHEMA get specialized ones
+
+    def values(self):
+        # Every packet keeps exactly its field values and address as attributes, in constructor order
+        return tuple(vars(self).values())[:-1]
+
+    def pack_into(self, buffer):
+        return self.serialize_into(buffer, *self.values())
+
+    def serialize_into(self, buffer, *command_args):
+        # Packs the whole frame into buffer in place and fills in its checksum, nothing is allocated for the frame
         assert self.COMMAND_ID is not None, 'Packet cannot be serialized'
-        struct_format = PACKET_STRUCT + self.PACKET_FORMAT
-        assert struct.calcsize(struct_format) == 25, "Packet Format String is not 26 bytes long"
+        compiled = frame_struct(self.PACKET_FORMAT)
         assert len(command_args) == len(self.FIELDS), "Incorrect number of fields"
         processed_args = (field.serialize(value) for field, value in zip(self.FIELDS, command_args))
         address = self.address if self.address is not None else 0
-        data = struct.pack(struct_format, 0xAA, address, self.COMMAND_ID, *processed_args)
-        checksum = calc_checksum(data).to_bytes(1, 'big')
-        return data + checksum
+        compiled.pack_into(buffer, 0, 0xAA, address, self.COMMAND_ID, *processed_args)
+        buffer[25] = frame_checksum(buffer)
+        return buffer
+
+    def serialize(self, *command_args):
+        return bytes(self.serialize_into(_scratch_frame(), *command_args))
+
+    def __bytes__(self):
+        return bytes(self.pack_into(_scratch_frame()))
+
+    def __str__(self):
+        if self.TEXT is None:
+            return super().__str__()
+        return f'{type(self).__name__}({self.TEXT.format_map(vars(self))})'
 
     @classmethod
     def deserialize(cls, packet_bytes):
+        # Accepts any buffer (bytes, a reused bytearray, a memoryview into a larger block) without copying it
         assert cls.RESPONSE_ID is not None, 'Packet cannot be deserialized'
-        assert len(packet_bytes) == 26, "Packet Data is not 26 bytes long"
-        struct_format = PACKET_STRUCT + cls.PACKET_FORMAT
-        assert struct.calcsize(struct_format) == 25, "Packet Format String is not 26 bytes long"
-        expect_checksum = calc_checksum(packet_bytes[0:25])
+        if len(packet_bytes) != 26:
+            raise FramingException("Packet Data is not 26 bytes long")
+        compiled = frame_struct(cls.PACKET_FORMAT)
+        expect_checksum = frame_checksum(packet_bytes)
         actual_checksum = packet_bytes[25]
-        assert expect_checksum == actual_checksum, "Checksum is incorrect"
-        packet_data = struct.unpack(struct_format, packet_bytes[0:25])
-        assert packet_data[0] == 0xAA, "Packet Magic is incorrect"
+        if expect_checksum != actual_checksum:
+            raise FramingException("Checksum is incorrect")
+        packet_data = compiled.unpack_from(packet_bytes)
+        if packet_data[0] != 0xAA:
+            raise FramingException("Packet Magic is incorrect")
         address = packet_data[1]
         command_id = packet_data[2]
-        if command_id == Status.RESPONSE_ID and command_id != cls.RESPONSE_ID:
-            packet = Status.deserialize(packet_bytes)
-            assert packet.status != Status.Code.SUCCESS, "Unexpected Success Status"
-            raise StatusException(packet.status)
-        assert cls.RESPONSE_ID == command_id, "Command ID is unexpected"
+        if command_id != cls.RESPONSE_ID:
+            unexpected_response(cls, command_id, packet_bytes)
         data = packet_data[3:]
         assert len(data) == len(cls.FIELDS), "Incorrect number of fields"
         proccessed_args = [field.deserialize(data) for field, data in zip(cls.FIELDS, data)]
@@ -68,9 +157,19 @@ class Packet:
         return packet
 
 
+def unexpected_response(cls, command_id, packet_bytes):
+    # The device answers a request it cannot serve with a Status frame, turn that into its error code
+    if command_id == Status.RESPONSE_ID:
+        packet = Status.deserialize(packet_bytes)
+        if packet.status == Status.Code.SUCCESS:
+            raise FramingException("Unexpected Success Status")
+        raise StatusException(packet.status)
+    if cls.RESPONSE_ID != command_id:
+        raise FramingException("Command ID is unexpected")
+
+
 class Status(Packet):
     RESPONSE_ID = 0x12
-    PACKET_FORMAT = 'B21x'
 
     class Code(enum.IntEnum):
         INCORRECT_CHECKSUM = 0x90
@@ -79,97 +178,45 @@ class Status(Packet):
         INVALID_COMMAND = 0xC0
         SUCCESS = 0x80
 
-    FIELDS = [EnumField(Code)]
+    SCHEMA = [('status', 'B', EnumField(Code))]
+    TEXT = '{status}'
 
     def __init__(self, status, address=None):
         self.status = Status.Code(status)
         self.address = address
 
-    def __str__(self):
-        return f'Status({self.status})'
-
 
 class RemoteOperation(Packet):
     COMMAND_ID = 0x20
-    PACKET_FORMAT = 'B21x'
-    FIELDS = [BoolField()]
-
-    def __init__(self, enable_remote, address=None):
-        self.enable_remote = bool(enable_remote)
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.enable_remote)
-
-    def __str__(self):
-        return f'RemoteOperation(enable_remote={self.enable_remote})'
+    SCHEMA = [('enable_remote', 'B', BoolField())]
+    TEXT = 'enable_remote={enable_remote}'
 
 
 class EnableLoad(Packet):
     COMMAND_ID = 0x21
-    PACKET_FORMAT = 'B21x'
-    FIELDS = [BoolField()]
-
-    def __init__(self, enable_load, address=None):
-        self.enable_load = bool(enable_load)
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.enable_load)
-
-    def __str__(self):
-        return f'EnableLoad({self.enable_load})'
+    SCHEMA = [('enable_load', 'B', BoolField())]
+    TEXT = '{enable_load}'
 
 
 class MaximumVoltage(Packet):
     COMMAND_ID = 0x22
     RESPONSE_ID = 0x23
-    PACKET_FORMAT = 'I18x'
-    FIELDS = [ScaledField(1000)]
-
-    def __init__(self, volts, address=None):
-        self.volts = volts
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.volts)
-
-    def __str__(self):
-        return f'MaximumVoltage({self.volts} V)'
+    SCHEMA = [('volts', 'I', ScaledField(1000))]
+    TEXT = '{volts} V'
 
 
 class MaximumCurrent(Packet):
     COMMAND_ID = 0x24
     RESPONSE_ID = 0x25
-    PACKET_FORMAT = 'I18x'
-    FIELDS = [ScaledField(10_000)]
-
-    def __init__(self, amps, address=None):
-        self.amps = amps
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.amps)
-
-    def __str__(self):
-        return f'MaximumCurrent({self.amps} A)'
+    SCHEMA = [('amps', 'I', ScaledField(10_000))]
+    TEXT = '{amps} A'
 
 
 class MaximumPower(Packet):
     COMMAND_ID = 0x26
     RESPONSE_ID = 0x27
-    PACKET_FORMAT = 'I18x'
-    FIELDS = [ScaledField(1000)]
-
-    def __init__(self, watts, address=None):
-        self.watts = watts
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.watts)
-
-    def __str__(self):
-        return f'MaximumPower({self.watts} W)'
+    SCHEMA = [('watts', 'I', ScaledField(1000))]
+    TEXT = '{watts} W'
 
 
 class LimitModeEnum(enum.IntEnum):
@@ -192,86 +239,36 @@ class LimitModeEnum(enum.IntEnum):
 class Mode(Packet):
     COMMAND_ID = 0x28
     RESPONSE_ID = 0x29
-    PACKET_FORMAT = 'B21x'
-    FIELDS = [EnumField(LimitModeEnum)]
-
-    def __init__(self, mode, address=None):
-        self.mode = mode
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.mode)
-
-    def __str__(self):
-        return f'Mode({self.mode})'
+    SCHEMA = [('mode', 'B', EnumField(LimitModeEnum))]
+    TEXT = '{mode}'
 
 
 class CurrentLevel(Packet):
     COMMAND_ID = 0x2A
     RESPONSE_ID = 0x2B
-    PACKET_FORMAT = 'I18x'
-    FIELDS = [ScaledField(10_000)]
-
-    def __init__(self, amps, address=None):
-        self.amps = amps
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.amps)
-
-    def __str__(self):
-        return f'CurrentLevel({self.amps} A)'
+    SCHEMA = [('amps', 'I', ScaledField(10_000))]
+    TEXT = '{amps} A'
 
 
 class VoltageLevel(Packet):
     COMMAND_ID = 0x2C
     RESPONSE_ID = 0x2D
-    PACKET_FORMAT = 'I18x'
-    FIELDS = [ScaledField(1000)]
-
-    def __init__(self, volts, address=None):
-        self.volts = volts
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.volts)
-
-    def __str__(self):
-        return f'VoltageLevel({self.volts} V)'
+    SCHEMA = [('volts', 'I', ScaledField(1000))]
+    TEXT = '{volts} V'
 
 
 class PowerLevel(Packet):
     COMMAND_ID = 0x2E
     RESPONSE_ID = 0x2F
-    PACKET_FORMAT = 'I18x'
-    FIELDS = [ScaledField(1000)]
-
-    def __init__(self, watts, address=None):
-        self.watts = watts
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.watts)
-
-    def __str__(self):
-        return f'PowerLevel({self.watts} W)'
+    SCHEMA = [('watts', 'I', ScaledField(1000))]
+    TEXT = '{watts} W'
 
 
 class ResistanceLevel(Packet):
     COMMAND_ID = 0x30
     RESPONSE_ID = 0x31
-    PACKET_FORMAT = 'I18x'
-    FIELDS = [ScaledField(1000)]
-
-    def __init__(self, ohms, address=None):
-        self.ohms = ohms
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.ohms)
-
-    def __str__(self):
-        return f'ResistanceLevel({self.ohms} Ω)'
+    SCHEMA = [('ohms', 'I', ScaledField(1000))]
+    TEXT = '{ohms} Ω'
 
 
 class TransientOperationEnum(enum.IntEnum):
@@ -280,246 +277,103 @@ class TransientOperationEnum(enum.IntEnum):
     TOGGLED = 2
 
 
+def _transient_schema(scalar):
+    return [('value_a', 'I', ScaledField(scalar)), ('time_a', 'H', ScaledField(10_000)),
+            ('value_b', 'I', ScaledField(scalar)), ('time_b', 'H', ScaledField(10_000)),
+            ('operation', 'B', EnumField(TransientOperationEnum))]
+
+
 class CurrentTransient(Packet):
     COMMAND_ID = 0x32
     RESPONSE_ID = 0x33
-    PACKET_FORMAT = 'IHIHB9x'
-    FIELDS = [ScaledField(10_000), ScaledField(10_000), ScaledField(10_000), ScaledField(10_000),
-              EnumField(TransientOperationEnum)]
-
-    def __init__(self, value_a, time_a, value_b, time_b, operation, address=None):
-        self.value_a = value_a
-        self.time_a = time_a
-        self.value_b = value_b
-        self.time_b = time_b
-        self.operation = operation
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.value_a, self.time_a, self.value_b,
-                                 self.time_b, self.operation)
-
-    def __str__(self):
-        return f'CurrentTransient({self.value_a} A @ {self.time_a} s -> {self.value_b} A @ {self.time_b} s, operation={self.operation})'
+    SCHEMA = _transient_schema(10_000)
+    TEXT = '{value_a} A @ {time_a} s -> {value_b} A @ {time_b} s, operation={operation}'
 
 
 class VoltageTransient(Packet):
     COMMAND_ID = 0x34
     RESPONSE_ID = 0x35
-    PACKET_FORMAT = 'IHIHB9x'
-    FIELDS = [ScaledField(1000), ScaledField(10_000), ScaledField(1000), ScaledField(10_000),
-              EnumField(TransientOperationEnum)]
-
-    def __init__(self, value_a, time_a, value_b, time_b, operation, address=None):
-        self.value_a = value_a
-        self.time_a = time_a
-        self.value_b = value_b
-        self.time_b = time_b
-        self.operation = operation
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.value_a, self.time_a, self.value_b,
-                                 self.time_b, self.operation)
-
-    def __str__(self):
-        return f'VoltageTransient({self.value_a} V @ {self.time_a} s -> {self.value_b} V @ {self.time_b} s, operation={self.operation})'
+    SCHEMA = _transient_schema(1000)
+    TEXT = '{value_a} V @ {time_a} s -> {value_b} V @ {time_b} s, operation={operation}'
 
 
 class PowerTransient(Packet):
     COMMAND_ID = 0x36
     RESPONSE_ID = 0x37
-    PACKET_FORMAT = 'IHIHB9x'
-    FIELDS = [ScaledField(1000), ScaledField(10_000), ScaledField(1000), ScaledField(10_000),
-              EnumField(TransientOperationEnum)]
-
-    def __init__(self, value_a, time_a, value_b, time_b, operation, address=None):
-        self.value_a = value_a
-        self.time_a = time_a
-        self.value_b = value_b
-        self.time_b = time_b
-        self.operation = operation
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.value_a, self.time_a, self.value_b,
-                                 self.time_b, self.operation)
-
-    def __str__(self):
-        return f'PowerTransient({self.value_a} W @ {self.time_a} s -> {self.value_b} W @ {self.time_b} s, operation={self.operation})'
+    SCHEMA = _transient_schema(1000)
+    TEXT = '{value_a} W @ {time_a} s -> {value_b} W @ {time_b} s, operation={operation}'
 
 
 class ResistanceTransient(Packet):
     COMMAND_ID = 0x38
     RESPONSE_ID = 0x39
-    PACKET_FORMAT = 'IHIHB9x'
-    FIELDS = [ScaledField(1000), ScaledField(10_000), ScaledField(1000), ScaledField(10_000),
-              EnumField(TransientOperationEnum)]
-
-    def __init__(self, value_a, time_a, value_b, time_b, operation, address=None):
-        self.value_a = value_a
-        self.time_a = time_a
-        self.value_b = value_b
-        self.time_b = time_b
-        self.operation = operation
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.value_a, self.time_a, self.value_b,
-                                 self.time_b, self.operation)
-
-    def __str__(self):
-        return f'ResistanceTransient({self.value_a} Ω @ {self.time_a} s -> {self.value_b} Ω @ {self.time_b} s, operation={self.operation})'
+    SCHEMA = _transient_schema(1000)
+    TEXT = '{value_a} Ω @ {time_a} s -> {value_b} Ω @ {time_b} s, operation={operation}'
 
 
 class ListOperation(Packet):
     COMMAND_ID = 0x3A
     RESPONSE_ID = 0x3B
-    PACKET_FORMAT = 'B21x'
-    FIELDS = [EnumField(TransientOperationEnum)]
-
-    def __init__(self, mode, address=None):
-        self.mode = mode
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.mode)
-
-    def __str__(self):
-        return f'ListOperation({self.mode})'
+    SCHEMA = [('mode', 'B', EnumField(TransientOperationEnum))]
+    TEXT = '{mode}'
 
 
 class ListRepeat(Packet):
     COMMAND_ID = 0x3C
     RESPONSE_ID = 0x3D
-    PACKET_FORMAT = 'B21x'
-    FIELDS = [BoolField()]
-
-    def __init__(self, enable_repeat, address=None):
-        self.enable_repeat = enable_repeat
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.enable_repeat)
-
-    def __str__(self):
-        return f'ListRepeat({self.enable_repeat})'
+    SCHEMA = [('enable_repeat', 'B', BoolField())]
+    TEXT = '{enable_repeat}'
 
 
 class ListSteps(Packet):
     COMMAND_ID = 0x3E
     RESPONSE_ID = 0x3F
-    PACKET_FORMAT = 'H20x'
-    FIELDS = [IntField()]
+    SCHEMA = [('num_steps', 'H', IntField())]
+    TEXT = '{num_steps}'
 
-    def __init__(self, num_steps, address=None):
-        self.num_steps = num_steps
-        self.address = address
 
-    def __bytes__(self):
-        return super().serialize(self.num_steps)
-
-    def __str__(self):
-        return f'ListSteps({self.num_steps})'
+def _step_schema(name, scalar):
+    return [('step_num', 'H', IntField()), (name, 'I', ScaledField(scalar)), ('seconds', 'H', ScaledField(10_000))]
 
 
 class StepCurrent(Packet):
     COMMAND_ID = 0x40
     RESPONSE_ID = 0x41
-    PACKET_FORMAT = 'HIH14x'
-    FIELDS = [IntField(), ScaledField(10_000), ScaledField(10_000)]
-
-    def __init__(self, step_num, amps, seconds, address=None):
-        self.step_num = step_num
-        self.amps = amps
-        self.seconds = seconds
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.step_num, self.amps, self.seconds)
-
-    def __str__(self):
-        return f'StepCurrent(Step #{self.step_num}: {self.amps} A @ {self.seconds} s)'
+    SCHEMA = _step_schema('amps', 10_000)
+    TEXT = 'Step #{step_num}: {amps} A @ {seconds} s'
 
 
 class StepVoltage(Packet):
     COMMAND_ID = 0x42
     RESPONSE_ID = 0x43
-    PACKET_FORMAT = 'HIH14x'
-    FIELDS = [IntField(), ScaledField(1000), ScaledField(10_000)]
-
-    def __init__(self, step_num, volts, seconds, address=None):
-        self.step_num = step_num
-        self.volts = volts
-        self.seconds = seconds
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.step_num, self.volts, self.seconds)
-
-    def __str__(self):
-        return f'StepVoltage(Step #{self.step_num}: {self.volts} V @ {self.seconds} s)'
+    SCHEMA = _step_schema('volts', 1000)
+    TEXT = 'Step #{step_num}: {volts} V @ {seconds} s'
 
 
 class StepPower(Packet):
     COMMAND_ID = 0x44
     RESPONSE_ID = 0x45
-    PACKET_FORMAT = 'HIH14x'
-    FIELDS = [IntField(), ScaledField(1000), ScaledField(10_000)]
-
-    def __init__(self, step_num, watts, seconds, address=None):
-        self.step_num = step_num
-        self.watts = watts
-        self.seconds = seconds
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.step_num, self.watts, self.seconds)
-
-    def __str__(self):
-        return f'StepPower(Step #{self.step_num}: {self.watts} W @ {self.seconds} s)'
+    SCHEMA = _step_schema('watts', 1000)
+    TEXT = 'Step #{step_num}: {watts} W @ {seconds} s'
 
 
 class StepResistance(Packet):
     COMMAND_ID = 0x46
     RESPONSE_ID = 0x47
-    PACKET_FORMAT = 'HIH14x'
-    FIELDS = [IntField(), ScaledField(1000), ScaledField(10_000)]
-
-    def __init__(self, step_num, ohms, seconds, address=None):
-        self.step_num = step_num
-        self.ohms = ohms
-        self.seconds = seconds
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.step_num, self.ohms, self.seconds)
-
-    def __str__(self):
-        return f'StepResistance(Step #{self.step_num}: {self.ohms} Ω @ {self.seconds} s)'
+    SCHEMA = _step_schema('ohms', 1000)
+    TEXT = 'Step #{step_num}: {ohms} Ω @ {seconds} s'
 
 
 class ListFilename(Packet):
     COMMAND_ID = 0x48
     RESPONSE_ID = 0x49
-    PACKET_FORMAT = '10s12x'
-    FIELDS = [Field()]
-
-    def __init__(self, file_name, address=None):
-        self.file_name = file_name
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.file_name)
-
-    def __str__(self):
-        return f'ListFilename({self.file_name})'
+    SCHEMA = [('file_name', '10s', Field())]
+    TEXT = '{file_name}'
 
 
 class PartitionScheme(Packet):
     COMMAND_ID = 0x4A
     RESPONSE_ID = 0x4B
-    PACKET_FORMAT = 'B21x'
 
     class Scheme(enum.IntEnum):
         File1Steps1000 = 1
@@ -527,223 +381,94 @@ class PartitionScheme(Packet):
         File4Steps250 = 4
         File8Steps120 = 8
 
-    FIELDS = [EnumField(Scheme)]
-
-    def __init__(self, scheme, address=None):
-        self.scheme = scheme
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.scheme)
-
-    def __str__(self):
-        return f'PartitionScheme({self.scheme})'
+    SCHEMA = [('scheme', 'B', EnumField(Scheme))]
+    TEXT = '{scheme}'
 
 
 class SaveListFile(Packet):
     COMMAND_ID = 0x4C
-    PACKET_FORMAT = 'B21x'
-    FIELDS = [IntField()]
-
-    def __init__(self, location, address=None):
-        self.location = location
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.location)
-
-    def __str__(self):
-        return f'SaveListFile(location={self.location})'
+    SCHEMA = [('location', 'B', IntField())]
+    TEXT = 'location={location}'
 
 
 class LoadListFile(Packet):
     COMMAND_ID = 0x4D
-    PACKET_FORMAT = 'B21x'
-    FIELDS = [IntField()]
-
-    def __init__(self, location, address=None):
-        self.location = location
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.location)
-
-    def __str__(self):
-        return f'LoadListFile(location={self.location})'
+    SCHEMA = [('location', 'B', IntField())]
+    TEXT = 'location={location}'
 
 
 class MinimumBatteryVoltage(Packet):
     COMMAND_ID = 0x4E
     RESPONSE_ID = 0x4F
-    PACKET_FORMAT = 'I18x'
-    FIELDS = [ScaledField(1000)]
-
-    def __init__(self, volts, address=None):
-        self.volts = volts
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.volts)
-
-    def __str__(self):
-        return f'MinimumBatteryVoltage({self.volts} V)'
+    SCHEMA = [('volts', 'I', ScaledField(1000))]
+    TEXT = '{volts} V'
 
 
 class LoadOnTimer(Packet):
     COMMAND_ID = 0x50
     RESPONSE_ID = 0x51
-    PACKET_FORMAT = 'H20x'
-    FIELDS = [IntField]
-
-    def __init__(self, seconds, address=None):
-        self.seconds = seconds
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.seconds)
-
-    def __str__(self):
-        return f'LoadOnTimer({self.seconds} s)'
+    SCHEMA = [('seconds', 'H', IntField())]
+    TEXT = '{seconds} s'
 
 
 class EnableLoadOnTimer(Packet):
     COMMAND_ID = 0x52
-    PACKET_FORMAT = 'B21x'
-    FIELDS = [BoolField()]
-
-    def __init__(self, enable_timer, address=None):
-        self.enable_timer = enable_timer
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.enable_timer)
-
-    def __str__(self):
-        return f'EnableLoadOnTimer({self.enable_timer})'
+    SCHEMA = [('enable_timer', 'B', BoolField())]
+    TEXT = '{enable_timer}'
 
 
 class SetAddress(Packet):
     COMMAND_ID = 0x54
-    PACKET_FORMAT = 'H20x'
-    FIELDS = [IntField()]
-
-    def __init__(self, new_address, address=None):
-        self.new_address = new_address
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.new_address)
-
-    def __str__(self):
-        return f'SetAddress(0x{self.new_address:2X})'
+    SCHEMA = [('new_address', 'H', IntField())]
+    TEXT = '0x{new_address:2X}'
 
 
 class EnableLocalOverride(Packet):
     COMMAND_ID = 0x55
-    PACKET_FORMAT = 'B21x'
-    FIELDS = [BoolField()]
-
-    def __init__(self, enable_override, address=None):
-        self.enable_override = bool(enable_override)
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.enable_override)
-
-    def __str__(self):
-        return f'EnableLocalOverride({self.enable_override})'
+    SCHEMA = [('enable_override', 'B', BoolField())]
+    TEXT = '{enable_override}'
 
 
 class EnableRemoteSensing(Packet):
     COMMAND_ID = 0x56
-    PACKET_FORMAT = 'B21x'
-    FIELDS = [BoolField()]
-
-    def __init__(self, enable_sensing, address=None):
-        self.enable_sensing = bool(enable_sensing)
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.enable_sensing)
-
-    def __str__(self):
-        return f'EnableRemoteSensing({self.enable_sensing})'
+    SCHEMA = [('enable_sensing', 'B', BoolField())]
+    TEXT = '{enable_sensing}'
 
 
 class SelectTriggerSource(Packet):
     COMMAND_ID = 0x58
     RESPONSE_ID = 0x59
-    PACKET_FORMAT = 'B21x'
 
     class Source(enum.IntEnum):
         IMMEDIATE = 0
         EXTERNAL = 1
         BUS = 2
 
-    FIELDS = [EnumField(Source)]
-
-    def __init__(self, trigger_source, address=None):
-        self.trigger_source = trigger_source
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.trigger_source)
-
-    def __str__(self):
-        return f'SelectTriggerSource({self.trigger_source})'
+    SCHEMA = [('trigger_source', 'B', EnumField(Source))]
+    TEXT = '{trigger_source}'
 
 
 class Trigger(Packet):
     COMMAND_ID = 0x5A
-    PACKET_FORMAT = '22x'
-    FIELDS = []
-
-    def __init__(self, address=None):
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize()
-
-    def __str__(self):
-        return f'Trigger()'
+    SCHEMA = []
+    TEXT = ''
 
 
 class SaveSettings(Packet):
     COMMAND_ID = 0x5B
-    PACKET_FORMAT = 'B21x'
-    FIELDS = [IntField()]
-
-    def __init__(self, register_num, address=None):
-        self.register_num = register_num
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.register_num)
-
-    def __str__(self):
-        return f'SaveSettings(register_num={self.register_num})'
+    SCHEMA = [('register_num', 'B', IntField())]
+    TEXT = 'register_num={register_num}'
 
 
 class LoadSettings(Packet):
     COMMAND_ID = 0x5C
-    PACKET_FORMAT = 'B21x'
-    FIELDS = [IntField()]
-
-    def __init__(self, register_num, address=None):
-        self.register_num = register_num
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.register_num)
-
-    def __str__(self):
-        return f'LoadSettings(register_num={self.register_num})'
+    SCHEMA = [('register_num', 'B', IntField())]
+    TEXT = 'register_num={register_num}'
 
 
 class SelectFunction(Packet):
     COMMAND_ID = 0x5D
     RESPONSE_ID = 0x5E
-    PACKET_FORMAT = 'B21x'
 
     class Function(enum.IntEnum):
         FIXED = 0
@@ -752,23 +477,14 @@ class SelectFunction(Packet):
         LIST = 3
         BATTERY = 4
 
-    FIELDS = [EnumField(Function)]
-
-    def __init__(self, function, address=None):
-        self.function = function
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.function)
-
-    def __str__(self):
-        return f'SelectFunction({self.function})'
+    SCHEMA = [('function', 'B', EnumField(Function))]
+    TEXT = '{function}'
 
 
 class Measure(Packet):
     RESPONSE_ID = 0x5F
-    PACKET_FORMAT = 'IIIBH7x'
-    FIELDS = [ScaledField(1000), ScaledField(10_000), ScaledField(1000), BitField(8), BitField(10)]
+    SCHEMA = [('volts', 'I', ScaledField(1000)), ('amps', 'I', ScaledField(10_000)), ('watts', 'I', ScaledField(1000)),
+              ('operation_bits', 'B', BitField(8)), ('demand_bits', 'H', BitField(10))]
 
     class OperationBits(enum.IntEnum):
         CALCULATE_DEMARCATION_COEF = 0
@@ -791,17 +507,6 @@ class Measure(Packet):
         CONSTANT_POWER = 8
         CONSTANT_RESISTANCE = 9
 
-    def __init__(self, volts, amps, watts, operation_bits, demand_bits, address=None):
-        self.volts = volts
-        self.amps = amps
-        self.watts = watts
-        self.operation_bits = operation_bits
-        self.demand_bits = demand_bits
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.volts, self.amps, self.watts, self.operation_bits, self.demand_bits)
-
     def __str__(self):
         def format_bitset(enum, bits):
             return f"{{{'|'.join(member.name for member, enabled in zip(enum, bits) if enabled)}}}"
@@ -812,37 +517,126 @@ class Measure(Packet):
 
 class Version(Packet):
     RESPONSE_ID = 0x6A
-    PACKET_FORMAT = '5sBB10s5x'
-    FIELDS = [Field(), Field(), Field(), Field()]
-
-    def __init__(self, model, firmware_major, firmware_minor, serial_number, address=None):
-        self.model = model
-        self.firmware_major = firmware_major
-        self.firmware_minor = firmware_minor
-        self.serial_number = serial_number
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.model, self.firmware_major, self.firmware_minor, self.serial_number)
-
-    def __str__(self):
-        return f'Version(model={self.model}, firmware={self.firmware_major}.{self.firmware_minor}, serial_num={self.serial_number})'
+    SCHEMA = [('model', '5s', Field()), ('firmware_major', 'B', Field()), ('firmware_minor', 'B', Field()),
+              ('serial_number', '10s', Field())]
+    TEXT = 'model={model}, firmware={firmware_major}.{firmware_minor}, serial_num={serial_number}'
 
 
 class Barcode(Packet):
     RESPONSE_ID = 0x6B
-    PACKET_FORMAT = '3s2s2s2s13x'
-    FIELDS = [Field(), Field(), Field(), Field()]
-
-    def __init__(self, identity, sub, version, year, address=None):
-        self.identity = identity
-        self.sub = sub
-        self.version = version
-        self.year = year
-        self.address = address
-
-    def __bytes__(self):
-        return super().serialize(self.identity, self.sub, self.version, self.year)
+    SCHEMA = [('identity', '3s', Field()), ('sub', '2s', Field()), ('version', '2s', Field()), ('year', '2s', Field())]
 
     def __str__(self):
         return f'Barcode({b"".join((self.identity, self.sub, self.version, self.year))})'
+
+
+CODEC_METHODS = ('__init__', 'pack_into', 'deserialize')
+
+
+def _codec_source(packet_type):
+    # Straight-line Python for one packet: every field conversion is inlined, nothing is looked up per field at runtime.
+    # Each function is named <packet>_<method>, each field is bound to _<packet>_<index>
+    name = packet_type.__name__
+    names = [field_name for field_name, _, _ in packet_type.SCHEMA]
+    fields = [field for _, _, field in packet_type.SCHEMA]
+    refs = [f'_{name}_{index}' for index in range(len(fields))]
+    lines = []
+
+    def function(method, signature, body):
+        lines.append(f'def {name}_{method}({signature}):')
+        lines.extend(f'    {line}' for line in body)
+        lines.append('')
+
+    def arguments(values):
+        return ''.join(f'{value}, ' for value in values)
+
+    if '__init__' not in packet_type._hand_written:
+        function('__init__', f'self, {arguments(names)}address=None',
+                 [f'self.{field_name} = bool({field_name})' if isinstance(field, BoolField) else
+                  f'self.{field_name} = {field_name}' for field_name, field in zip(names, fields)] +
+                 ['self.address = address'])
+
+    if packet_type.COMMAND_ID is not None:
+        checksum = 'buffer[25] = (sum(buffer) - buffer[25]) & 0xFF'
+        encoded = [field.serialize_source(f'self.{field_name}', ref) for field_name, field, ref in zip(names, fields, refs)]
+        function('pack_into', 'self, buffer',
+                 [f'_{name}_pack(buffer, 0, 0xAA, self.address or 0, {packet_type.COMMAND_ID}, {arguments(encoded)})',
+                  checksum, 'return buffer'])
+
+    if packet_type.RESPONSE_ID is not None:
+        decoded = [field.deserialize_source(field_name, ref) for field_name, field, ref in zip(names, fields, refs)]
+        body = ['if len(packet_bytes) != 26:',
+                '    raise FramingException("Packet Data is not 26 bytes long")',
+                'if (sum(packet_bytes) - packet_bytes[25]) & 0xFF != packet_bytes[25]:',
+                '    raise FramingException("Checksum is incorrect")',
+                f'magic, address, command_id, {arguments(names)}= _{name}_unpack(packet_bytes)',
+                'if magic != 0xAA:',
+                '    raise FramingException("Packet Magic is incorrect")',
+                f'if command_id != {packet_type.RESPONSE_ID}:',
+                '    unexpected_response(cls, command_id, packet_bytes)',
+                f'packet = cls({arguments(decoded)}address)']
+        if packet_type is Status:
+            body += ['if packet.status != SUCCESS:', '    raise StatusException(packet.status)']
+        function('deserialize', 'cls, packet_bytes', body + ['return packet'])
+
+    return lines
+
+
+def _codec_namespace(packet_types):
+    namespace = {'int2ba': int2ba, 'ba2int': ba2int, 'unexpected_response': unexpected_response,
+                 'StatusException': StatusException, 'FramingException': FramingException,
+                 'SUCCESS': Status.Code.SUCCESS}
+    for packet_type in packet_types:
+        name = packet_type.__name__
+        compiled = frame_struct(packet_type.PACKET_FORMAT)
+        namespace[f'_{name}_pack'] = compiled.pack_into
+        namespace[f'_{name}_unpack'] = compiled.unpack_from
+        for index, field in enumerate(packet_type.FIELDS):
+            namespace[f'_{name}_{index}'] = field
+    return namespace
+
+
+def generate_codecs(packet_types):
+    # The source of _codecs.py, run generate_codecs.py after changing a SCHEMA, a TEXT or a Field's source methods
+    lines = ['# Generated from the packet schemas by generate_codecs.py, do not edit', '',
+             f'PACKETS = {tuple(packet_type.__name__ for packet_type in packet_types)!r}', '']
+    for packet_type in packet_types:
+        lines += [''] + _codec_source(packet_type)
+    return '\n'.join(lines).rstrip('\n') + '\n'
+
+
+def _install(packet_types, namespace):
+    # The generated methods find the structs and fields they use as globals of namespace
+    namespace.update(_codec_namespace(packet_types))
+    # The functions keep their generated names, renaming them to the method would cost as much as the rest of this
+    for packet_type in packet_types:
+        name = packet_type.__name__
+        for method in CODEC_METHODS:
+            function = namespace.get(f'{name}_{method}')
+            if function is not None:
+                setattr(packet_type, method, classmethod(function) if method == 'deserialize' else function)
+
+
+def install_codecs(packet_types):
+    # For packets declared outside the library, their codecs are compiled when the class is created
+    namespace = {}
+    source = '\n'.join(line for packet_type in packet_types for line in _codec_source(packet_type) + [''])
+    exec(compile(source, f'<codecs of {packet_types[0].__qualname__}>', 'exec'), namespace)
+    _install(packet_types, namespace)
+
+
+# Every packet declared in this module, in order, what generate_codecs.py writes the codecs of
+SCHEMA_PACKETS = tuple(_pending_codecs)
+
+# The codecs of the packets above are generated ahead of time, so importing them costs what any module costs. Should
+# _codecs.py be missing or not match the packets declared here they are compiled instead
+try:
+    from . import _codecs
+except ImportError:
+    _codecs = None
+if _codecs is not None and _codecs.PACKETS == tuple(packet_type.__name__ for packet_type in SCHEMA_PACKETS):
+    _install(SCHEMA_PACKETS, vars(_codecs))
+else:
+    install_codecs(SCHEMA_PACKETS)
+_pending_codecs.clear()
+_codecs_ready = True
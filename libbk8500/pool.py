@@ -0,0 +1,242 @@
+import csv
+import functools
+import multiprocessing
+import os
+import signal
+import time
+import traceback
+import numpy as np
+from multiprocessing import shared_memory
+import libbk8500 as lbk
+import libbk8500.stream
+
+COLUMNS = ('sent (s)', 'received (s)', 'voltage (V)', 'current (A)', 'power (W)')
+
+STARTING = 0
+RUNNING = 1
+STOPPED = 2
+FAILED = 3
+STATE_NAMES = {STARTING: 'starting', RUNNING: 'running', STOPPED: 'stopped', FAILED: 'failed'}
+
+# Header slots, written only by the worker, except that the parent marks a worker it had to terminate as failed
+WRITTEN = 0
+STATE = 1
+ERRORS = 2
+# One past the last row the writer is filling, published before the rows themselves
+WRITING = 3
+HEADER_SIZE = 8
+# Serial timeout of the worker's device, and how long to wait after a failed chunk before the next one
+DEVICE_TIMEOUT = 1.0
+ERROR_BACKOFF = 0.05
+
+
+class RingBuffer:
+    def __init__(self, capacity, name=None):
+        size = 8 * (HEADER_SIZE + capacity * len(COLUMNS))
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        self.capacity = capacity
+        self.header = np.ndarray((HEADER_SIZE,), dtype=np.int64, buffer=self.shm.buf)
+        self.data = np.ndarray((capacity, len(COLUMNS)), dtype=np.float64, buffer=self.shm.buf, offset=8 * HEADER_SIZE)
+        if name is None:
+            self.header[:] = 0
+        self.read = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, rows):
+        # Single writer: announce the slots, fill them, then publish them by advancing the write counter
+        start = int(self.header[WRITTEN])
+        self.header[WRITING] = start + len(rows)
+        index = (start + np.arange(len(rows))) % self.capacity
+        self.data[index] = rows
+        self.header[WRITTEN] = start + len(rows)
+
+    def read_new(self):
+        written = int(self.header[WRITTEN])
+        start = max(self.read, written - self.capacity)
+        rows = self.data[np.arange(start, written) % self.capacity]
+        # The writer keeps going while the rows are copied. Whatever it has started overwriting since, up to the rows it
+        # is filling right now, may be torn, so drop those too
+        valid = min(max(start, int(self.header[WRITING]) - self.capacity), written)
+        rows = rows[valid - start:]
+        dropped = valid - self.read
+        self.read = written
+        return rows, dropped
+
+    def close(self):
+        del self.header, self.data
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def open_device(port, baud=9600, timeout=DEVICE_TIMEOUT):
+    # With a read timeout a device that stops answering fails the chunk instead of blocking the worker forever
+    device = lbk.Device(port, baud, config=lbk.device.SerialConfig(timeout=timeout, write_timeout=timeout))
+    device.enable_remote(True)
+    return device
+
+
+def _worker(port, shm_name, capacity, chunk, device_factory, stop):
+    # Ctrl-C reaches every process of the group, the parent stops the workers through the stop event instead
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    ring = RingBuffer(capacity, shm_name)
+    device = None
+    try:
+        device = device_factory(port)
+        ring.header[STATE] = RUNNING
+        rows = np.empty((chunk, len(COLUMNS)))
+        while not stop.is_set():
+            try:
+                times, values = lbk.stream.acquire_timed(device, chunk)
+            except (lbk.packet.FramingException, ValueError, lbk.packet.StatusException, lbk.device.TimeoutException):
+                ring.header[ERRORS] += 1
+                if hasattr(device.ser, 'reset_input_buffer'):
+                    device.ser.reset_input_buffer()
+                stop.wait(ERROR_BACKOFF)
+                continue
+            rows[:, :2] = times
+            rows[:, 2:] = values
+            ring.write(rows)
+        ring.header[STATE] = STOPPED
+    except Exception:
+        traceback.print_exc()
+        ring.header[STATE] = FAILED
+    finally:
+        if device is not None:
+            device.close()
+        ring.close()
+
+
+class PortStatus:
+    def __init__(self, port, state, samples, dropped, errors, rate):
+        self.port = port
+        self.state = state
+        self.samples = samples
+        self.dropped = dropped
+        self.errors = errors
+        self.rate = rate
+
+    def __str__(self):
+        return (f'{self.port}: {STATE_NAMES[self.state]}, {self.samples} samples ({self.rate:.1f}/s), '
+                f'{self.dropped} dropped, {self.errors} errors')
+
+
+class CsvSink:
+    def __init__(self, directory, flush=False):
+        self.directory = directory
+        self.flush = flush
+        self.files = {}
+
+    def write(self, port, rows):
+        if port not in self.files:
+            out = open(os.path.join(self.directory, f'{os.path.basename(port)}.csv'), 'w', newline='')
+            writer = csv.writer(out)
+            writer.writerow(COLUMNS)
+            self.files[port] = (out, writer)
+        out, writer = self.files[port]
+        writer.writerows(rows.tolist())
+        if self.flush:
+            out.flush()
+
+    def close(self):
+        for out, _ in self.files.values():
+            out.close()
+        self.files = {}
+
+
+class AcquisitionPool:
+    def __init__(self, ports, baud=9600, capacity=1 << 16, chunk=16, device_factory=None):
+        self.ports = list(ports)
+        self.capacity = capacity
+        self.chunk = chunk
+        if device_factory is None:
+            device_factory = functools.partial(open_device, baud=baud)
+        self.device_factory = device_factory
+        self.context = multiprocessing.get_context()
+        self.stop_event = None
+        self.rings = {}
+        self.processes = {}
+        self.samples = {}
+        self.dropped = {}
+        self.started = None
+
+    def start(self):
+        self.stop_event = self.context.Event()
+        for port in self.ports:
+            ring = RingBuffer(self.capacity)
+            process = self.context.Process(target=_worker, name=f'lbk-{port}', daemon=True,
+                                           args=(port, ring.name, self.capacity, self.chunk, self.device_factory,
+                                                 self.stop_event))
+            process.start()
+            self.rings[port] = ring
+            self.processes[port] = process
+            self.samples[port] = 0
+            self.dropped[port] = 0
+        self.started = time.monotonic()
+
+    def poll(self):
+        result = {}
+        for port, ring in self.rings.items():
+            rows, dropped = ring.read_new()
+            self.samples[port] += len(rows)
+            self.dropped[port] += dropped
+            result[port] = rows
+        return result
+
+    def status(self):
+        elapsed = time.monotonic() - self.started if self.started is not None else 0
+        return [PortStatus(port, int(ring.header[STATE]), self.samples[port], self.dropped[port],
+                           int(ring.header[ERRORS]), self.samples[port] / elapsed if elapsed > 0 else 0)
+                for port, ring in self.rings.items()]
+
+    def drain(self, sinks):
+        for port, rows in self.poll().items():
+            if len(rows) > 0:
+                for sink in sinks:
+                    sink.write(port, rows)
+
+    def run(self, sinks, duration=None, interval=0.1, report=None):
+        end = time.monotonic() + duration if duration is not None else None
+        try:
+            while end is None or time.monotonic() < end:
+                time.sleep(interval)
+                self.drain(sinks)
+                if report is not None:
+                    report(self.status())
+                if all(process.exitcode is not None for process in self.processes.values()):
+                    break
+        finally:
+            self.stop()
+            self.drain(sinks)
+
+    def stop(self, timeout=None):
+        # A worker gets one device timeout and a bit to finish its chunk, then it is terminated
+        timeout = timeout if timeout is not None else 2 * DEVICE_TIMEOUT + 1
+        if self.stop_event is not None:
+            self.stop_event.set()
+        deadline = time.monotonic() + timeout
+        for port, process in self.processes.items():
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                process.terminate()
+                process.join()
+                self.rings[port].header[STATE] = FAILED
+
+    def close(self):
+        self.stop()
+        for ring in self.rings.values():
+            ring.close()
+            ring.unlink()
+        self.rings = {}
+        self.processes = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,6 +1,20 @@
 #!/usr/bin/env python
 import argparse
+import contextlib
+import cProfile
 import libbk8500 as lbk
+import libbk8500.battery
+import libbk8500.cache
+import libbk8500.ivcurve
+import libbk8500.link
+import libbk8500.mppt
+import libbk8500.pool
+import libbk8500.profiling
+import libbk8500.replay
+import libbk8500.server
+import libbk8500.sweep
+import libbk8500.transient
+import libbk8500.watchdog
 from serial.tools import list_ports
 import os
 import sys
@@ -29,78 +43,333 @@ def print_progress(start, stop, value, unit, length=20):
     sys.stdout.flush()
 
 
-def run_test(device_addr, type, start, stop, step, delta_t, out, flush, plot, progress, name):
-    print(f'Connecting to {device_addr}')
-    unit, label = {
-        lbk.packet.LimitModeEnum.CC: ('A', 'Current'),
-        lbk.packet.LimitModeEnum.CV: ('V', 'Voltage'),
-        lbk.packet.LimitModeEnum.CW: ('W', 'Power'),
-        lbk.packet.LimitModeEnum.CR: ('Ω', 'Resistance'),
-    }[type]
-    device = lbk.Device(device_addr)
+def parse_baud(s):
+    if s == 'auto':
+        return s
+    return int(s)
+
+
+def autobaud(device_addr, low_latency=False):
+    print(f'Probing {device_addr}')
+    best, results = lbk.link.autotune(device_addr, low_latency=low_latency)
+    for result in results:
+        print(f'\t{result}')
+    if best is None:
+        print('The device did not answer reliably at any baud rate')
+        sys.exit(1)
+    print(f'Using {best.baud} baud ({best.round_trips_per_second:.1f} round trips/s)')
+    return best.baud
+
+
+def open_device(args):
+    if args.replay is not None:
+        print(f'Replaying {args.replay}')
+        device = lbk.Device(None, transport=lbk.replay.ReplayTransport(args.replay, realtime=not args.fast_replay))
+    elif args.device.startswith('tcp://'):
+        print(f'Connecting to {args.device}')
+        device = lbk.server.connect(args.device)
+    else:
+        baud = autobaud(args.device, args.low_latency) if args.baud == 'auto' else args.baud
+        print(f'Connecting to {args.device} at {baud} baud')
+        config = lbk.device.SerialConfig(timeout=args.timeout, write_timeout=args.timeout, low_latency=args.low_latency)
+        device = lbk.Device(args.device, baud, config=config, frame_cache=lbk.cache.FrameCache())
+        if args.record is not None:
+            device.ser = lbk.replay.RecordingTransport(device.ser, args.record)
+    try:
+        model = device.identify().model.rstrip(b'\x00').decode('ascii', 'replace')
+    except BaseException:
+        device.close()
+        raise
+    print(f'Found model {model}, {device.limits}')
+    return device
+
+
+def run_test(device, type, start, stop, step, delta_t, out, flush, plot, progress, name, profiler=None,
+             watchdog=None):
+    unit, label = lbk.sweep.LEVEL_UNITS[type]
+    values = []
+    value = start
+    while (value <= stop and step > 0) or (value >= stop and step < 0):
+        values.append(value)
+        value += step
+    packet_type = lbk.device.LEVEL_PACKETS[type]
+    if device.limits is not None:
+        device.limits.validate_levels(packet_type, values)
+    # Encode every level frame up front so the loop itself only writes
+    frames = lbk.cache.encode_levels(packet_type, values)
+
     device.enable_remote(True)
     device.enable_load(False)
     device.command(lbk.packet.Mode(type))
     device.set_level(type, start)
     device.enable_load(True)
 
-    fieldnames = [f'Requested {label} ({unit})', 'voltage (V)', 'current (A)', 'power (W)']
+    # The send and receive times are time.monotonic(), so runs on several devices can be merged with lbk.timebase
+    fieldnames = [f'Requested {label} ({unit})', 'voltage (V)', 'current (A)', 'power (W)', 'sent (s)', 'received (s)']
     writer = csv.writer(out)
     writer.writerow(fieldnames)
     if flush:
         out.flush()
     data = []
+    max_power = None
 
-    value = start
-    while (value <= stop and step > 0) or (value >= stop and step < 0):
-        if progress:
-            print_progress(start, stop, value, unit)
-        device.set_level(type, value)
-        time.sleep(delta_t)
-        meas = device.request(lbk.packet.Measure)
-        row = (value, meas.volts, meas.amps, meas.watts)
-        writer.writerow(row)
-        if flush:
-            out.flush()
-        if plot:
-            data.append(row)
-        value += step
+    # Without a profiler every phase is a no-op context, so the loop is the same either way
+    phase = profiler.phase if profiler is not None else lambda name: contextlib.nullcontext()
+    device.profiler = profiler
+    # The watchdog switches the load off if the loop raises, is interrupted or the device reports a fault, and stops the
+    # loop with an exception once it did
+    guard = watchdog if watchdog is not None else contextlib.nullcontext()
+    try:
+        with guard:
+            for value, frame in zip(values, frames):
+                if watchdog is not None:
+                    watchdog.check()
+                if progress:
+                    print_progress(start, stop, value, unit)
+                device.command_frame(frame)
+                with phase(lbk.profiling.SLEEP):
+                    time.sleep(delta_t)
+                sent, received, meas = device.request_timed(lbk.packet.Measure)
+                row = (value, meas.volts, meas.amps, meas.watts, sent, received)
+                if max_power is None or meas.watts > max_power:
+                    max_power = meas.watts
+                with phase(lbk.profiling.CSV_WRITE):
+                    writer.writerow(row)
+                    if flush:
+                        out.flush()
+                if plot:
+                    data.append(row)
+    finally:
+        device.profiler = None
+        # Never leave the load on, however the sweep ended. After a trip it is already off and remote control may be
+        # gone, so a refusal then must not hide why the sweep stopped
+        try:
+            device.enable_load(False)
+        except Exception:
+            if watchdog is None or not watchdog.tripped.is_set():
+                raise
 
     if progress:
         print()
 
-    print(f'Max Power: {max(record[3] for record in data)} W')
+    if max_power is not None:
+        print(f'Max Power: {max_power} W')
+
+    if plot:
+        with phase(lbk.profiling.PLOTTING):
+            ar = np.array(data)
+            fig, axs = plt.subplots(3, sharex=True)
+            fig.suptitle('Power Measurements')
+            for ax in axs:
+                ax.grid(True)
+            axs[0].scatter(ar[:, 0], ar[:, 1])
+            axs[0].set_ylabel('Voltage (V)')
+            axs[1].scatter(ar[:, 0], ar[:, 2])
+            axs[1].set_ylabel('Current (A)')
+            axs[2].scatter(ar[:, 0], ar[:, 3])
+            axs[2].set_ylabel('Power (W)')
+            axs[2].set_xlabel(f'Requested {label} ({unit})')
+            if name is not None:
+                plt.savefig(f'{name}.png')
+            else:
+                plt.show()
+    if profiler is not None:
+        profiler.stop()
+
+
+def run_acquire(ports, baud, duration, directory, interval):
+    def report(status):
+        print(' | '.join(str(entry) for entry in status), end='\r')
+        sys.stdout.flush()
+
+    os.makedirs(directory, exist_ok=True)
+    sink = lbk.pool.CsvSink(directory)
+    with lbk.pool.AcquisitionPool(ports, baud) as acquisition:
+        try:
+            acquisition.run([sink], duration, interval, report)
+        except KeyboardInterrupt:
+            pass
+        print()
+        for entry in acquisition.status():
+            print(entry)
+    sink.close()
+
+
+def run_serve(ports, baud, host, port, interval, simulate):
+    devices = [lbk.pool.open_device(device_addr, baud) for device_addr in ports]
+    if simulate > 0:
+        from libbk8500 import simulator
+        devices += [simulator.open_simulated(None) for _ in range(simulate)]
+    if not devices:
+        print('No devices to serve, please specify devices or --simulate')
+        sys.exit()
+    with lbk.server.DeviceServer(devices, host, port, interval) as server:
+        print(f'Serving {len(devices)} devices on tcp://{host}:{server.server_address[1]}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print()
+    for device in devices:
+        device.close()
+
+
+def add_connection_arguments(parser):
+    parser.add_argument('--device', type=str, help='the address of the serial connection, or tcp://host:port/index for '
+                                                   'a device shared by power_tool serve. Defaults to the LBK_DEVICE '
+                                                   'environment variable', default=os.environ.get('LBK_DEVICE'))
+    parser.add_argument('--baud', type=parse_baud, help='the baud rate of the serial connection, or auto to use the '
+                                                        'fastest rate the device answers at (default: 9600)',
+                        default=9600, metavar='RATE')
+    parser.add_argument('--timeout', type=float, default=None, metavar='SECONDS',
+                        help='give up on the device after SECONDS without an answer (default: wait forever)')
+    parser.add_argument('--low-latency', action='store_true', help='ask the serial driver for low latency mode, '
+                                                                   'removes the 16 ms latency timer of FTDI adapters')
+    replay_group = parser.add_mutually_exclusive_group()
+    replay_group.add_argument('--record', type=str, default=None, metavar='FILE',
+                              help='record the serial traffic of the run to FILE')
+    replay_group.add_argument('--replay', type=str, default=None, metavar='FILE',
+                              help='replay a recorded run from FILE instead of connecting to a device')
+    parser.add_argument('--fast-replay', action='store_true', help='replay as fast as possible instead of with the '
+                                                                    'recorded timing')
+
+
+def check_device(args):
+    if args.device == None and args.replay is None:
+        print('No device selected, please specify a device with --device or the LBK_DEVICE environment variable')
+        sys.exit()
+
+
+def run_transient(device, type, value_a, time_a, value_b, time_b, duration, pre_trigger, band, out, plot, name):
+    unit, label = lbk.sweep.LEVEL_UNITS[type]
+    device.enable_remote(True)
+    try:
+        result, metrics = lbk.transient.run_transient(device, type, value_a, time_a, value_b, time_b, duration,
+                                                      pre_trigger, band)
+    finally:
+        device.enable_load(False)
+
+    writer = csv.writer(out)
+    writer.writerow(['time (s)', 'voltage (V)', 'current (A)', 'power (W)'])
+    writer.writerows(zip(result.t, result.volts, result.amps, result.watts))
+    out.flush()
+
+    print(f'{len(result.t)} samples at {result.sample_rate:.1f} samples/s, trigger latency '
+          f'{result.trigger_latency * 1000:.3f} ms')
+    print(f'Rise time (10-90 %): {metrics.rise_time * 1000:.3f} ms')
+    print(f'Overshoot: {metrics.overshoot:.2f} %')
+    print(f'Settling time ({band * 100:g} %): {metrics.settling_time * 1000:.3f} ms')
 
     if plot:
-        ar = np.array(data)
-        fig, axs = plt.subplots(3, sharex=True)
-        fig.suptitle('Power Measurements')
-        for ax in axs:
-            ax.grid(True)
-        axs[0].scatter(ar[:, 0], ar[:, 1])
-        axs[0].set_ylabel('Voltage (V)')
-        axs[1].scatter(ar[:, 0], ar[:, 2])
-        axs[1].set_ylabel('Current (A)')
-        axs[2].scatter(ar[:, 0], ar[:, 3])
-        axs[2].set_ylabel('Power (W)')
-        axs[2].set_xlabel(f'Requested {label} ({unit})')
+        channel = lbk.transient.RESPONSE_CHANNELS[type]
+        fig, ax = plt.subplots()
+        fig.suptitle(f'{label} Transient')
+        ax.grid(True)
+        ax.plot(result.t * 1000, result.channel(channel), marker='.')
+        ax.axvline(0, color='gray', linestyle='--')
+        ax.set_xlabel('Time since trigger (ms)')
+        ax.set_ylabel(channel)
         if name is not None:
             plt.savefig(f'{name}.png')
         else:
             plt.show()
 
 
+def run_battery(device, type, level, cutoff, timer, interval, dv, max_interval, out, progress):
+    unit, label = lbk.sweep.LEVEL_UNITS[type]
+
+    def show_progress(t, meas, integrator):
+        print(f' {t:9.0f} s {meas.volts:8.3f} V {meas.amps:8.4f} A {integrator.amp_hours:9.4f} Ah '
+              f'{integrator.watt_hours:9.4f} Wh', end='\r')
+        sys.stdout.flush()
+
+    device.enable_remote(True)
+    print(f'Discharging at {level} {unit} down to {cutoff} V')
+    lbk.battery.configure(device, type, level, cutoff, timer)
+    try:
+        result = lbk.battery.run_discharge(device, csv.writer(out), interval, dv, max_interval,
+                                           progress=show_progress if progress else None)
+    finally:
+        device.enable_load(False)
+        device.command(lbk.packet.SelectFunction(lbk.packet.SelectFunction.Function.FIXED))
+        out.flush()
+    if progress:
+        print()
+    print(f'Capacity: {result.amp_hours:.4f} Ah, {result.watt_hours:.4f} Wh in {result.duration:.0f} s')
+    print(f'Logged {result.logged} of {result.samples} samples')
+
+
+def run_mppt(device, tracker, start, step, low, high, duration, interval, out, pipelined=False):
+    device.enable_remote(True)
+    tracker = lbk.mppt.TRACKERS[tracker](start, step, low, high)
+    lbk.mppt.configure(device, start)
+    try:
+        result = lbk.mppt.run_mppt(device, tracker, duration=duration, interval=interval, pipelined=pipelined)
+    finally:
+        device.enable_load(False)
+    writer = csv.writer(out)
+    writer.writerow(lbk.mppt.COLUMNS)
+    writer.writerows(result.rows())
+    out.flush()
+    if len(result.t) > 0:
+        print(f'Final operating point: {result.volts[-1]:.3f} V, {result.amps[-1]:.4f} A, {result.watts[-1]:.3f} W')
+    print(f'{len(result.t)} cycles at {result.stats.frequency:.1f} Hz, jitter {result.stats.jitter * 1000:.3f} ms, '
+          f'worst cycle {result.stats.worst * 1000:.3f} ms')
+    if pipelined and not result.pipelined:
+        print('Pipelined cycles failed, fell back to a separate command and request per cycle')
+
+
+def run_analyze(paths, workers, fit_points, out):
+    paths = lbk.ivcurve.find_curves(paths)
+    rows = lbk.ivcurve.analyze(paths, workers, fit_points=fit_points)
+    lbk.ivcurve.write_summary(out, rows)
+    out.flush()
+    if out != sys.stdout:
+        print(f'Analyzed {len(rows)} curves')
+        power = np.array([row[lbk.ivcurve.SUMMARY_COLUMNS.index('Pmp (W)')] for row in rows])
+        if np.any(np.isfinite(power)):
+            best = int(np.nanargmax(power))
+            print(f'Highest maximum power: {power[best]:.3f} W in {rows[best][0]}')
+
+
 def power_tool():
     parser = argparse.ArgumentParser(description='Make measurments using a BK Precision 85XX DC Load')
     parser.set_defaults(which=None)
     subparsers = parser.add_subparsers(help='action to perform')
     list_device = subparsers.add_parser('list', help='list connected serial devices')
     list_device.set_defaults(which='list')
+    autobaud_device = subparsers.add_parser('autobaud', help='find the fastest baud rate the device answers at')
+    autobaud_device.add_argument('--device', type=str, help='the address of the serial connection. Defaults to the '
+                                                            'LBK_DEVICE environment variable',
+                                 default=os.environ.get('LBK_DEVICE'))
+    autobaud_device.add_argument('--low-latency', action='store_true',
+                                 help='ask the serial driver for low latency mode while probing')
+    autobaud_device.set_defaults(which='autobaud')
+    acquire = subparsers.add_parser('acquire', help='continuously measure many devices at once, one process each')
+    acquire.add_argument('--baud', type=int, help='the baud rate of the serial connections (default: 9600)',
+                         default=9600, metavar='RATE')
+    acquire.add_argument('--duration', type=float, default=None, metavar='SECONDS',
+                         help='how long to measure for (default: until interrupted)')
+    acquire.add_argument('--out', type=str, default='.', metavar='DIR',
+                         help='the directory to write one csv file per device to (default: current directory)')
+    acquire.add_argument('--interval', type=float, default=0.5, metavar='SECONDS',
+                         help='how often to collect samples from the workers and report status (default: 0.5)')
+    acquire.add_argument('devices', type=str, nargs='+', help='the addresses of the serial connections')
+    acquire.set_defaults(which='acquire')
+    serve = subparsers.add_parser('serve', help='share devices with other programs over a local socket')
+    serve.add_argument('--baud', type=int, help='the baud rate of the serial connections (default: 9600)',
+                       default=9600, metavar='RATE')
+    serve.add_argument('--host', type=str, default='127.0.0.1', help='the address to listen on (default: 127.0.0.1)')
+    serve.add_argument('--port', type=int, default=lbk.server.DEFAULT_PORT,
+                       help=f'the port to listen on (default: {lbk.server.DEFAULT_PORT})')
+    serve.add_argument('--interval', type=float, default=0.1, metavar='SECONDS',
+                       help='the polling interval, Measure requests within one interval share a device read '
+                            '(default: 0.1)')
+    serve.add_argument('--simulate', type=int, default=0, metavar='COUNT',
+                       help='also serve COUNT simulated devices after the real ones')
+    serve.add_argument('devices', type=str, nargs='*', help='the addresses of the serial connections')
+    serve.set_defaults(which='serve')
     test = subparsers.add_parser('test', help='run a test and collect data')
-    test.add_argument('--device', type=str, help='the address of the serial connection. Defaults to the LBK_DEVICE '
-                                                 'environment variable', default=os.environ.get('LBK_DEVICE'))
-    test.add_argument('--baud', type=int, help='the baud rate of the serial connection (default: 9600)', default=9600,
-                      metavar='RATE')
+    add_connection_arguments(test)
     output_group = test.add_mutually_exclusive_group()
     output_group.add_argument('--out', type=argparse.FileType('w'), default=sys.stdout,
                       help='where to write the csv data to (defaults to stdout)')
@@ -109,6 +378,15 @@ def power_tool():
     test.add_argument('--flush', '-f', action='store_true', help='flush the output after every write')
     test.add_argument('--graph', '-g', action='store_true', help='plot the result after collection')
     test.add_argument('--progress', '-p', action='store_true', help='display a progress bar to stdout')
+    test.add_argument('--profile', action='store_true',
+                      help='print where the time went (serial write, device wait, decode, csv write, plotting, sleep) '
+                           'per phase and per packet to stderr')
+    test.add_argument('--profile-output', type=str, default=None, metavar='FILE',
+                      help='also run the test under cProfile and save the stats to FILE, for pstats, snakeviz or '
+                           'flameprof')
+    test.add_argument('--watchdog', type=float, default=None, metavar='SECONDS',
+                      help='poll the protection bits every SECONDS from a separate thread and switch the load off and '
+                           'drop remote control on a fault, an error or a termination signal')
     test.add_argument('kind', type=lbk.packet.LimitModeEnum.from_string, choices=list(lbk.packet.LimitModeEnum),
                       help='the type of test to run (current, voltage, power, or resistance)')
     test.add_argument('start', type=float, help='the initial value of the limit (inclusive)')
@@ -116,17 +394,130 @@ def power_tool():
     test.add_argument('step', type=float, help='the value to step by')
     test.add_argument('delta_t', type=float, help='the time to wait between steps in seconds')
     test.set_defaults(which='test')
+    transient = subparsers.add_parser('transient', help='capture the step response of a transient')
+    add_connection_arguments(transient)
+    transient_output = transient.add_mutually_exclusive_group()
+    transient_output.add_argument('--out', type=argparse.FileType('w'), default=sys.stdout,
+                                  help='where to write the csv data to (defaults to stdout)')
+    transient_output.add_argument('--name', action='store', type=str, default=None,
+                                  help='the name of the part under test, saves the plot if plotting is enabled')
+    transient.add_argument('--graph', '-g', action='store_true', help='plot the response after collection')
+    transient.add_argument('--pre-trigger', type=float, default=0.05, metavar='SECONDS',
+                           help='how long to measure before triggering (default: 0.05)')
+    transient.add_argument('--band', type=float, default=0.02,
+                           help='the settling band as a fraction of the step (default: 0.02)')
+    transient.add_argument('kind', type=lbk.packet.LimitModeEnum.from_string, choices=list(lbk.packet.LimitModeEnum),
+                           help='the type of transient (current, voltage, power, or resistance)')
+    transient.add_argument('value_a', type=float, help='the level before and after the pulse')
+    transient.add_argument('time_a', type=float, help='the time to hold level A in seconds')
+    transient.add_argument('value_b', type=float, help='the level during the pulse')
+    transient.add_argument('time_b', type=float, help='the length of the pulse in seconds')
+    transient.add_argument('duration', type=float, help='how long to measure after the trigger in seconds')
+    transient.set_defaults(which='transient')
+
+    battery = subparsers.add_parser('battery', help='discharge a battery down to a cutoff voltage')
+    add_connection_arguments(battery)
+    battery.add_argument('--out', type=argparse.FileType('w'), default=sys.stdout,
+                         help='where to write the csv data to (defaults to stdout)')
+    battery.add_argument('--progress', '-p', action='store_true', help='display the running totals on stdout')
+    battery.add_argument('--timer', type=int, default=None, metavar='SECONDS',
+                         help='also stop the discharge after SECONDS using the load on timer')
+    battery.add_argument('--interval', type=float, default=1.0, metavar='SECONDS',
+                         help='the time between measurements (default: 1)')
+    battery.add_argument('--dv', type=float, default=0.01, metavar='VOLTS',
+                         help='log a sample whenever the voltage moved this much since the last logged one '
+                              '(default: 0.01)')
+    battery.add_argument('--max-interval', type=float, default=60.0, metavar='SECONDS',
+                         help='log at least one sample this often (default: 60)')
+    battery.add_argument('kind', type=lbk.packet.LimitModeEnum.from_string, choices=list(lbk.packet.LimitModeEnum),
+                         help='how to load the battery (current, voltage, power, or resistance)')
+    battery.add_argument('level', type=float, help='the level to discharge at')
+    battery.add_argument('cutoff', type=float, help='the voltage at which the load turns off')
+    battery.set_defaults(which='battery')
+
+    mppt = subparsers.add_parser('mppt', help='hold a solar module at its maximum power point')
+    add_connection_arguments(mppt)
+    mppt.add_argument('--out', type=argparse.FileType('w'), default=sys.stdout,
+                      help='where to write the csv data to (defaults to stdout)')
+    mppt.add_argument('--tracker', choices=list(lbk.mppt.TRACKERS), default='po',
+                      help='perturb and observe (po) or incremental conductance (inc) (default: po)')
+    mppt.add_argument('--step', type=float, default=0.1, metavar='VOLTS',
+                      help='how far to move the voltage setpoint each cycle (default: 0.1)')
+    mppt.add_argument('--low', type=float, default=0.0, metavar='VOLTS',
+                      help='the lowest voltage setpoint (default: 0)')
+    mppt.add_argument('--high', type=float, default=None, metavar='VOLTS',
+                      help='the highest voltage setpoint (default: no limit)')
+    mppt.add_argument('--interval', type=float, default=None, metavar='SECONDS',
+                      help='run the loop at a fixed period instead of as fast as the link allows')
+    mppt.add_argument('--pipelined', action='store_true',
+                      help='send the setpoint and the measure request in one write, falls back after the first '
+                           'timed out or misaligned reply')
+    mppt.add_argument('start', type=float, help='the initial voltage setpoint')
+    mppt.add_argument('duration', type=float, help='how long to track for in seconds')
+    mppt.set_defaults(which='mppt')
+
+    analyze = subparsers.add_parser('analyze', help='compute Voc, Isc, maximum power point, fill factor and '
+                                                    'resistances of recorded I-V curves')
+    analyze.add_argument('--out', type=argparse.FileType('w'), default=sys.stdout,
+                         help='where to write the csv summary to (defaults to stdout)')
+    analyze.add_argument('--workers', type=int, default=None,
+                         help='the number of processes for large sets of curves (default: one per cpu)')
+    analyze.add_argument('--fit-points', type=int, default=lbk.ivcurve.FIT_POINTS, metavar='COUNT',
+                         help=f'the number of points at each end of a curve to extrapolate Voc and Isc from '
+                              f'(default: {lbk.ivcurve.FIT_POINTS})')
+    analyze.add_argument('paths', type=str, nargs='+',
+                         help='csv files written by power_tool test, npy files, or directories of them')
+    analyze.set_defaults(which='analyze')
 
     args = parser.parse_args()
+    if getattr(args, 'fast_replay', False) and args.replay is None:
+        parser.error('--fast-replay only applies together with --replay')
 
     if args.which == 'list':
         print('Available Serial Devices:')
         for port in list_ports.comports():
             print(f'\t{port.device}: {port.manufacturer} {port.description}')
-    elif args.which == 'test':
+    elif args.which == 'autobaud':
         if args.device == None:
             print('No device selected, please specify a device with --device or the LBK_DEVICE environment variable')
             sys.exit()
+        autobaud(args.device, args.low_latency)
+    elif args.which == 'analyze':
+        run_analyze(args.paths, args.workers, args.fit_points, args.out)
+    elif args.which == 'acquire':
+        run_acquire(args.devices, args.baud, args.duration, args.out, args.interval)
+    elif args.which == 'serve':
+        run_serve(args.devices, args.baud, args.host, args.port, args.interval, args.simulate)
+    elif args.which == 'transient':
+        check_device(args)
+        if args.name is not None:
+            args.out = open(f'{args.name}.csv', 'w')
+        device = open_device(args)
+        try:
+            run_transient(device, args.kind, args.value_a, args.time_a, args.value_b, args.time_b, args.duration,
+                          args.pre_trigger, args.band, args.out, args.graph, args.name)
+        finally:
+            device.close()
+    elif args.which == 'battery':
+        check_device(args)
+        if args.out == sys.stdout:
+            args.progress = False
+        device = open_device(args)
+        try:
+            run_battery(device, args.kind, args.level, args.cutoff, args.timer, args.interval, args.dv,
+                        args.max_interval, args.out, args.progress)
+        finally:
+            device.close()
+    elif args.which == 'mppt':
+        check_device(args)
+        device = open_device(args)
+        try:
+            run_mppt(device, args.tracker, args.start, args.step, args.low, args.high, args.duration, args.interval,
+                     args.out, args.pipelined)
+        finally:
+            device.close()
+    elif args.which == 'test':
+        check_device(args)
         if args.step == 0:
             print('step cannot be zero')
             sys.exit()
@@ -134,8 +525,30 @@ def power_tool():
             args.out = open(f'{args.name}.csv', 'w')
         if args.out == sys.stdout:
             args.progress = False
-        run_test(args.device, args.kind, args.start, args.stop, args.step, args.delta_t, args.out, args.flush,
-                 args.graph, args.progress, args.name)
+        device = open_device(args)
+        try:
+            profiler = lbk.profiling.PhaseTimer() if args.profile else None
+            stats = cProfile.Profile() if args.profile_output is not None else None
+            if stats is not None:
+                stats.enable()
+            watchdog = lbk.watchdog.Watchdog(device, args.watchdog) if args.watchdog is not None else None
+            try:
+                run_test(device, args.kind, args.start, args.stop, args.step, args.delta_t, args.out, args.flush,
+                         args.graph, args.progress, args.name, profiler, watchdog)
+            except lbk.watchdog.WatchdogException as e:
+                print(f'Stopped by the watchdog: {e}', file=sys.stderr)
+                sys.exit(1)
+            finally:
+                if watchdog is not None:
+                    print(watchdog.report(), file=sys.stderr)
+            if stats is not None:
+                stats.disable()
+                stats.dump_stats(args.profile_output)
+                print(f'Saved cProfile stats to {args.profile_output}', file=sys.stderr)
+            if profiler is not None:
+                print(profiler.report(), file=sys.stderr)
+        finally:
+            device.close()
     else:
         parser.print_help()
 
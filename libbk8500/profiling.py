@@ -0,0 +1,87 @@
+import contextlib
+import time
+from collections import defaultdict
+import libbk8500 as lbk
+
+SERIAL_WRITE = 'serial write'
+DEVICE_WAIT = 'device wait'
+DECODE = 'decode'
+CSV_WRITE = 'csv write'
+PLOTTING = 'plotting'
+SLEEP = 'sleep'
+PHASES = (SERIAL_WRITE, DEVICE_WAIT, DECODE, CSV_WRITE, PLOTTING, SLEEP)
+
+
+def _packet_names():
+    # Frames on the wire carry a command ID when sending a command and the response ID when requesting a response
+    names = {}
+    for packet_type in vars(lbk.packet).values():
+        if isinstance(packet_type, type) and issubclass(packet_type, lbk.packet.Packet):
+            for packet_id in (packet_type.COMMAND_ID, packet_type.RESPONSE_ID):
+                if packet_id is not None:
+                    names.setdefault(packet_id, packet_type.__name__)
+    return names
+
+
+PACKET_NAMES = _packet_names()
+
+
+def packet_name(frame):
+    return PACKET_NAMES.get(frame[2], f'0x{frame[2]:02X}')
+
+
+class PhaseTimer:
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self.counts = defaultdict(int)
+        # (phase, packet class name) -> seconds, for the phases that belong to one packet
+        self.packets = defaultdict(float)
+        self.started = time.perf_counter()
+        self.stopped = None
+
+    def add(self, phase, seconds, packet=None):
+        self.totals[phase] += seconds
+        self.counts[phase] += 1
+        if packet is not None:
+            self.packets[(phase, packet)] += seconds
+
+    @contextlib.contextmanager
+    def phase(self, phase, packet=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start, packet)
+
+    def stop(self):
+        self.stopped = time.perf_counter()
+
+    @property
+    def wall_time(self):
+        return (self.stopped if self.stopped is not None else time.perf_counter()) - self.started
+
+    def report(self):
+        wall = self.wall_time
+        lines = [f'{"phase":24} {"total (s)":>10} {"share":>7} {"count":>7} {"mean (ms)":>10}']
+
+        def line(name, total, count):
+            mean = f'{total / count * 1000:10.3f}' if count else f'{"":10}'
+            share = total / wall * 100 if wall > 0 else 0
+            lines.append(f'{name:24} {total:10.4f} {share:6.1f}% {count:7} {mean}')
+
+        phases = list(PHASES) + [phase for phase in self.totals if phase not in PHASES]
+        for phase in phases:
+            line(phase, self.totals[phase], self.counts[phase])
+        # Whatever the phases do not cover: loop bookkeeping, progress output, packet construction
+        line('other', wall - sum(self.totals.values()), 0)
+        line('wall', wall, 0)
+        if self.packets:
+            lines.append('')
+            lines.append(f'{"phase / packet":40} {"total (s)":>10} {"share":>7}')
+            for (phase, packet), total in sorted(self.packets.items(), key=lambda item: -item[1]):
+                share = total / wall * 100 if wall > 0 else 0
+                lines.append(f'{phase + " / " + packet:40} {total:10.4f} {share:6.1f}%')
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return f'PhaseTimer({len(self.totals)} phases over {self.wall_time:.3f} s)'
@@ -0,0 +1,167 @@
+import json
+import os
+import libbk8500 as lbk
+
+# The settings a SaveSettings register holds, the load and remote state are not part of a recipe
+RECIPE_PACKETS = (lbk.packet.Mode, lbk.packet.CurrentLevel, lbk.packet.VoltageLevel, lbk.packet.PowerLevel,
+                  lbk.packet.ResistanceLevel, lbk.packet.MaximumVoltage, lbk.packet.MaximumCurrent,
+                  lbk.packet.MaximumPower, lbk.packet.CurrentTransient, lbk.packet.VoltageTransient,
+                  lbk.packet.PowerTransient, lbk.packet.ResistanceTransient, lbk.packet.MinimumBatteryVoltage,
+                  lbk.packet.LoadOnTimer, lbk.packet.EnableLoadOnTimer, lbk.packet.EnableRemoteSensing,
+                  lbk.packet.SelectTriggerSource, lbk.packet.SelectFunction)
+# The ones that can be read back, remote sensing and the load on timer enable are write only
+CAPTURED_PACKETS = tuple(packet_type for packet_type in RECIPE_PACKETS if packet_type.RESPONSE_ID is not None)
+REGISTERS = range(1, 26)
+
+
+class RecipeException(Exception):
+    pass
+
+
+class Recipe:
+    def __init__(self, name, packets):
+        for packet in packets:
+            assert isinstance(packet, RECIPE_PACKETS), f'{type(packet).__name__} is not a saved setting'
+        self.name = name
+        self.packets = list(packets)
+
+    @classmethod
+    def fixed(cls, name, mode, level, max_voltage=None, max_current=None, max_power=None, remote_sensing=False,
+              trigger_source=lbk.packet.SelectTriggerSource.Source.IMMEDIATE):
+        mode = lbk.packet.LimitModeEnum(mode)
+        packets = [lbk.packet.Mode(mode), lbk.device.LEVEL_PACKETS[mode](level)]
+        if max_voltage is not None:
+            packets.append(lbk.packet.MaximumVoltage(max_voltage))
+        if max_current is not None:
+            packets.append(lbk.packet.MaximumCurrent(max_current))
+        if max_power is not None:
+            packets.append(lbk.packet.MaximumPower(max_power))
+        packets += [lbk.packet.EnableRemoteSensing(remote_sensing), lbk.packet.SelectTriggerSource(trigger_source),
+                    lbk.packet.SelectFunction(lbk.packet.SelectFunction.Function.FIXED)]
+        return cls(name, packets)
+
+    @classmethod
+    def capture(cls, device, name='captured'):
+        # What the device is set to right now, one request per readable setting. Replies carry the device address,
+        # rebuild them so the recipe compares equal to one built by hand
+        packets = []
+        for packet_type in CAPTURED_PACKETS:
+            packets.append(packet_type(*device.request(packet_type).values()))
+        return cls(name, packets)
+
+    def settings(self):
+        # [[packet class name, field values...], ...], plain enough for json and for comparing two recipes
+        return [[type(packet).__name__] + [int(value) if isinstance(value, int) else value
+                                           for value in packet.values()] for packet in self.packets]
+
+    def to_json(self):
+        return {'name': self.name, 'settings': self.settings()}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data['name'], [getattr(lbk.packet, setting[0])(*setting[1:]) for setting in data['settings']])
+
+    def apply(self, device):
+        for packet in self.packets:
+            device.command(packet)
+
+    def __eq__(self, other):
+        return isinstance(other, Recipe) and self.settings() == other.settings()
+
+    def __str__(self):
+        return f'Recipe({self.name}, {len(self.packets)} settings)'
+
+
+class RecipeBank:
+    # Keeps recipes in the SaveSettings registers of one device and remembers which register holds which, so switching
+    # to a stored recipe is a single LoadSettings. The index can be kept in a json file, tied to the device's serial
+    # number so it is never used with a different unit
+    def __init__(self, device, path=None, registers=REGISTERS):
+        self.device = device
+        self.path = path
+        self.registers = list(registers)
+        self.index = {}
+        self.last_used = {}
+        self.clock = 0
+        self.current = None
+        self.serial_number = None
+        if path is not None:
+            self.serial_number = device.request(lbk.packet.Version).serial_number.rstrip(b'\x00').decode('ascii',
+                                                                                                         'replace')
+            if os.path.exists(path):
+                self._read_index()
+
+    def _read_index(self):
+        with open(self.path) as f:
+            data = json.load(f)
+        if data.get('serial_number') != self.serial_number:
+            return
+        for register, recipe in data['registers'].items():
+            if int(register) in self.registers:
+                self.index[int(register)] = Recipe.from_json(recipe)
+        self.last_used = {int(register): used for register, used in data.get('last_used', {}).items()
+                          if int(register) in self.registers}
+        self.clock = data.get('clock', max(self.last_used.values(), default=0))
+
+    def _write_index(self):
+        if self.path is None:
+            return
+        data = {'serial_number': self.serial_number,
+                'registers': {str(register): recipe.to_json() for register, recipe in sorted(self.index.items())},
+                'last_used': {str(register): used for register, used in sorted(self.last_used.items())},
+                'clock': self.clock}
+        with open(self.path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    def find(self, recipe):
+        for register, stored in self.index.items():
+            if stored == recipe:
+                return register
+        return None
+
+    def _touch(self, register):
+        self.clock += 1
+        self.last_used[register] = self.clock
+
+    def _free_register(self):
+        for register in self.registers:
+            if register not in self.index:
+                return register
+        # Every register is taken, reuse the one switched to least recently
+        return min(self.registers, key=lambda register: self.last_used.get(register, 0))
+
+    def store(self, recipe, register=None):
+        # Sends every setting once and saves them, the device is left running this recipe
+        if register is None:
+            register = self._free_register()
+        if register not in self.registers:
+            raise RecipeException(f'Register {register} is not managed by this bank')
+        recipe.apply(self.device)
+        self.device.command(lbk.packet.SaveSettings(register))
+        self.index[register] = recipe
+        self.current = recipe
+        self._touch(register)
+        self._write_index()
+        return register
+
+    def switch(self, recipe):
+        register = self.find(recipe)
+        if register is None:
+            return self.store(recipe)
+        self.device.command(lbk.packet.LoadSettings(register))
+        self.current = recipe
+        self._touch(register)
+        self._write_index()
+        return register
+
+    def invalidate(self, register=None):
+        # For when the registers were changed behind the bank's back, from the front panel or another program
+        if register is None:
+            self.index.clear()
+        else:
+            self.index.pop(register, None)
+        self.current = None
+        self._write_index()
+
+    def __str__(self):
+        return f'RecipeBank({len(self.index)}/{len(self.registers)} registers used)'
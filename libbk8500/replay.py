@@ -0,0 +1,113 @@
+import struct
+import time
+
+RECORDING_MAGIC = b'LBKREC1\n'
+RECORD_HEADER = struct.Struct('<dcH')
+WRITE = b'w'
+READ = b'r'
+
+
+class ReplayException(Exception):
+    pass
+
+
+class RecordingTransport:
+    def __init__(self, ser, path):
+        self.ser = ser
+        self.file = open(path, 'wb')
+        self.file.write(RECORDING_MAGIC)
+        self.start = time.perf_counter()
+
+    def _record(self, direction, data):
+        elapsed = time.perf_counter() - self.start
+        self.file.write(RECORD_HEADER.pack(elapsed, direction, len(data)))
+        self.file.write(data)
+
+    def write(self, data):
+        written = self.ser.write(data)
+        self._record(WRITE, bytes(data))
+        return written
+
+    def read(self, size=1):
+        data = self.ser.read(size)
+        self._record(READ, data)
+        return data
+
+    def close(self):
+        self.file.close()
+        self.ser.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_recording(path):
+    records = []
+    with open(path, 'rb') as f:
+        if f.read(len(RECORDING_MAGIC)) != RECORDING_MAGIC:
+            raise ReplayException(f'{path} is not a libbk8500 recording')
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if not header:
+                break
+            if len(header) != RECORD_HEADER.size:
+                raise ReplayException(f'{path} is truncated')
+            elapsed, direction, length = RECORD_HEADER.unpack(header)
+            data = f.read(length)
+            if len(data) != length:
+                raise ReplayException(f'{path} is truncated')
+            records.append((elapsed, direction, data))
+    return records
+
+
+class ReplayTransport:
+    def __init__(self, path, realtime=True, strict=True):
+        self.records = load_recording(path)
+        self.realtime = realtime
+        self.strict = strict
+        self.index = 0
+        self.anchor = None
+
+    def _next(self, direction):
+        if self.index >= len(self.records):
+            raise ReplayException('Recording exhausted')
+        record = self.records[self.index]
+        if record[1] != direction:
+            raise ReplayException(f'Expected {direction!r} at record {self.index}, recording has {record[1]!r}')
+        self.index += 1
+        return record
+
+    def write(self, data):
+        elapsed, _, expected = self._next(WRITE)
+        if self.strict and bytes(data) != expected:
+            raise ReplayException(f'Frame {self.index - 1} differs from recording: {bytes(data).hex()} != '
+                                  f'{expected.hex()}')
+        # Re-anchor on every write so a slow host does not accumulate lag, only the device latency is replayed
+        self.anchor = time.perf_counter() - elapsed
+        return len(data)
+
+    def read(self, size=1):
+        elapsed, _, data = self._next(READ)
+        if len(data) != size and self.strict:
+            raise ReplayException(f'Read of {size} bytes at record {self.index - 1}, recording has {len(data)}')
+        if self.realtime and self.anchor is not None:
+            delay = self.anchor + elapsed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return data
+
+    @property
+    def exhausted(self):
+        return self.index >= len(self.records)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
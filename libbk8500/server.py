@@ -0,0 +1,223 @@
+import socket
+import socketserver
+import struct
+import threading
+import time
+import libbk8500 as lbk
+
+DEFAULT_PORT = 8500
+
+# Every message in either direction is a kind byte, a device index byte and one 26 byte frame
+MESSAGE = struct.Struct('<BB26s')
+EXCHANGE = 0x01
+SUBSCRIBE = 0x02
+UNSUBSCRIBE = 0x03
+MEASUREMENT = 0x04
+ERROR = 0x7F
+
+
+class RemoteException(Exception):
+    pass
+
+
+def recv_exactly(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return bytes(data)
+
+
+def error_payload(message):
+    return str(message).encode('utf-8', 'replace')[:26].ljust(26, b'\x00')
+
+
+class DeviceHub:
+    def __init__(self, device, interval):
+        self.device = device
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.measure_request = lbk.packet.Measure.request()
+        self.measure_frame = None
+        self.measure_time = None
+        self.device_reads = 0
+        self.subscribers = set()
+        self.subscribers_lock = threading.Lock()
+
+    def exchange(self, frame):
+        if frame == self.measure_request:
+            return self.measure()
+        # Anything else may change what the device measures, so the next Measure has to read it again. Holding the lock
+        # keeps a Measure that was in flight from caching a reading taken before this frame
+        with self.lock:
+            self.measure_time = None
+            return self.device.exchange(frame)
+
+    def measure(self):
+        # Every Measure request inside one polling interval shares a single device read
+        with self.lock:
+            now = time.monotonic()
+            if self.measure_time is None or now - self.measure_time >= self.interval:
+                self.measure_frame = self.device.exchange(self.measure_request)
+                self.measure_time = time.monotonic()
+                self.device_reads += 1
+            return self.measure_frame
+
+    def subscribe(self, connection):
+        with self.subscribers_lock:
+            self.subscribers.add(connection)
+
+    def unsubscribe(self, connection):
+        with self.subscribers_lock:
+            self.subscribers.discard(connection)
+
+    def poll(self, index, stop):
+        while not stop.wait(self.interval):
+            with self.subscribers_lock:
+                subscribers = list(self.subscribers)
+            if not subscribers:
+                continue
+            try:
+                message = MESSAGE.pack(MEASUREMENT, index, self.measure())
+            except Exception as e:
+                message = MESSAGE.pack(ERROR, index, error_payload(e))
+            for connection in subscribers:
+                if not connection.send(message):
+                    self.unsubscribe(connection)
+
+
+class Connection(socketserver.BaseRequestHandler):
+    def setup(self):
+        self.send_lock = threading.Lock()
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def send(self, message):
+        try:
+            with self.send_lock:
+                self.request.sendall(message)
+            return True
+        except OSError:
+            return False
+
+    def handle(self):
+        hubs = self.server.hubs
+        while True:
+            message = recv_exactly(self.request, MESSAGE.size)
+            if message is None:
+                break
+            kind, index, frame = MESSAGE.unpack(message)
+            if index >= len(hubs):
+                self.send(MESSAGE.pack(ERROR, index, error_payload(f'No device {index}')))
+            elif kind == EXCHANGE:
+                try:
+                    self.send(MESSAGE.pack(EXCHANGE, index, hubs[index].exchange(frame)))
+                except Exception as e:
+                    self.send(MESSAGE.pack(ERROR, index, error_payload(e)))
+            elif kind == SUBSCRIBE:
+                hubs[index].subscribe(self)
+            elif kind == UNSUBSCRIBE:
+                hubs[index].unsubscribe(self)
+            else:
+                self.send(MESSAGE.pack(ERROR, index, error_payload(f'Unknown message {kind}')))
+
+    def finish(self):
+        for hub in self.server.hubs:
+            hub.unsubscribe(self)
+
+
+class DeviceServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, devices, host='127.0.0.1', port=DEFAULT_PORT, interval=0.1):
+        super().__init__((host, port), Connection)
+        self.hubs = [DeviceHub(device, interval) for device in devices]
+        self.stop_polling = threading.Event()
+        self.pollers = [threading.Thread(target=hub.poll, args=(index, self.stop_polling), daemon=True)
+                        for index, hub in enumerate(self.hubs)]
+        for poller in self.pollers:
+            poller.start()
+
+    def server_close(self):
+        self.stop_polling.set()
+        super().server_close()
+
+
+class RemoteTransport:
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, index=0):
+        self.index = index
+        self.sock = socket.create_connection((host, port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.pending = bytearray()
+        self.received = bytearray()
+
+    def write(self, data):
+        self.pending += data
+        while len(self.pending) >= 26:
+            self.sock.sendall(MESSAGE.pack(EXCHANGE, self.index, bytes(self.pending[:26])))
+            del self.pending[:26]
+            message = recv_exactly(self.sock, MESSAGE.size)
+            if message is None:
+                raise RemoteException('Server closed the connection')
+            kind, _, frame = MESSAGE.unpack(message)
+            if kind == ERROR:
+                raise RemoteException(frame.rstrip(b'\x00').decode('utf-8', 'replace'))
+            self.received += frame
+        return len(data)
+
+    def read(self, size=1):
+        data = bytes(self.received[:size])
+        del self.received[:size]
+        return data
+
+    def reset_input_buffer(self):
+        self.received.clear()
+
+    def close(self):
+        self.sock.close()
+
+
+class Subscription:
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, index=0):
+        self.index = index
+        self.sock = socket.create_connection((host, port))
+        self.sock.sendall(MESSAGE.pack(SUBSCRIBE, index, bytes(26)))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        message = recv_exactly(self.sock, MESSAGE.size)
+        if message is None:
+            raise StopIteration()
+        kind, _, frame = MESSAGE.unpack(message)
+        if kind == ERROR:
+            raise RemoteException(frame.rstrip(b'\x00').decode('utf-8', 'replace'))
+        return lbk.packet.Measure.deserialize(frame)
+
+    def close(self):
+        try:
+            self.sock.sendall(MESSAGE.pack(UNSUBSCRIBE, self.index, bytes(26)))
+        except OSError:
+            pass
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parse_url(url):
+    # tcp://host:port/index, port and index are optional
+    assert url.startswith('tcp://'), f'{url} is not a tcp:// address'
+    location, _, index = url[len('tcp://'):].partition('/')
+    host, _, port = location.partition(':')
+    return host or '127.0.0.1', int(port) if port else DEFAULT_PORT, int(index) if index else 0
+
+
+def connect(url):
+    return lbk.Device(None, transport=RemoteTransport(*parse_url(url)))
@@ -0,0 +1,403 @@
+import os
+import struct
+import threading
+import time
+import numpy as np
+import libbk8500 as lbk
+import libbk8500.recipe
+import libbk8500.transient
+
+STATUS_STRUCT = struct.Struct('<BBBB21x')
+
+
+def frame_checksum(data):
+    return bytes((lbk.packet.calc_checksum(data),))
+
+
+class TheveninSource:
+    def __init__(self, voltage=12.0, resistance=0.5):
+        self.open_voltage = voltage
+        self.resistance = resistance
+
+    @property
+    def short_circuit_current(self):
+        return self.open_voltage / self.resistance
+
+    def voltage(self, current):
+        return max(self.open_voltage - current * self.resistance, 0.0)
+
+
+class BatterySource:
+    # Linear open circuit voltage over the state of charge with a steep knee near empty. time_scale speeds up the
+    # discharge so long runs can be simulated quickly
+    def __init__(self, capacity_ah=1.0, full_voltage=4.2, empty_voltage=3.0, resistance=0.05, time_scale=1.0):
+        self.capacity_ah = capacity_ah
+        self.full_voltage = full_voltage
+        self.empty_voltage = empty_voltage
+        self.resistance = resistance
+        self.time_scale = time_scale
+        self.charge_ah = capacity_ah
+        self.last_time = None
+
+    @property
+    def open_voltage(self):
+        soc = max(self.charge_ah / self.capacity_ah, 0.0)
+        knee = 0.3 * (1 - min(soc / 0.1, 1.0))
+        return max(self.empty_voltage + (self.full_voltage - self.empty_voltage) * soc - knee, 0.0)
+
+    @property
+    def short_circuit_current(self):
+        return self.open_voltage / self.resistance
+
+    def voltage(self, current):
+        return max(self.open_voltage - current * self.resistance, 0.0)
+
+    def drain(self, current, now):
+        if self.last_time is not None:
+            self.charge_ah -= current * (now - self.last_time) * self.time_scale / 3600
+        self.last_time = now
+
+
+class PVSource:
+    # Single diode model of a module of series cells, I = Iph - I0 (exp((V + I Rs) / (n Ns Vt)) - 1) - (V + I Rs) / Rsh.
+    # The I-V curve is tabulated whenever the irradiance or temperature changes, so a measurement only interpolates
+    def __init__(self, short_circuit_current=5.0, open_voltage=21.6, cells=36, ideality=1.3, series_resistance=0.2,
+                 shunt_resistance=200.0, irradiance=1000.0, temperature=25.0, points=2000):
+        self.rated_current = short_circuit_current
+        self.rated_voltage = open_voltage
+        self.cells = cells
+        self.ideality = ideality
+        self.series_resistance = series_resistance
+        self.shunt_resistance = shunt_resistance
+        self.irradiance = irradiance
+        self.temperature = temperature
+        self.points = points
+        self.curve_key = None
+        self.curve_volts = None
+        self.curve_amps = None
+
+    def _thermal_voltage(self):
+        return 1.380649e-23 * (self.temperature + 273.15) / 1.602176634e-19
+
+    def curve(self):
+        key = (self.irradiance, self.temperature)
+        if key != self.curve_key:
+            a = self.ideality * self.cells * self._thermal_voltage()
+            rs, rsh = self.series_resistance, self.shunt_resistance
+            photo_current = self.rated_current * self.irradiance / 1000
+            # The saturation current is fixed by the rated open circuit voltage at full sun
+            saturation = self.rated_current / np.expm1(self.rated_voltage / a)
+            volts = np.linspace(0, self.rated_voltage * 1.1, self.points)
+            amps = np.full_like(volts, photo_current)
+            for _ in range(40):
+                e = np.exp(np.minimum((volts + amps * rs) / a, 700))
+                g = photo_current - saturation * (e - 1) - (volts + amps * rs) / rsh - amps
+                amps -= g / (-saturation * rs / a * e - rs / rsh - 1)
+            amps = np.maximum(amps, 0.0)
+            # Trim the flat tail beyond the open circuit voltage so the curve is strictly decreasing where it is used
+            end = int(np.argmax(amps <= 0)) + 1 if np.any(amps <= 0) else len(amps)
+            self.curve_volts, self.curve_amps = volts[:end], amps[:end]
+            self.curve_key = key
+        return self.curve_volts, self.curve_amps
+
+    @property
+    def open_voltage(self):
+        return float(self.curve()[0][-1])
+
+    @property
+    def short_circuit_current(self):
+        return float(self.curve()[1][0])
+
+    def voltage(self, current):
+        volts, amps = self.curve()
+        return max(float(np.interp(current, amps[::-1], volts[::-1])), 0.0)
+
+    def maximum_power_point(self):
+        volts, amps = self.curve()
+        i = int(np.argmax(volts * amps))
+        return float(volts[i]), float(amps[i]), float(volts[i] * amps[i])
+
+
+def _bisect(f, low, high, iterations=60):
+    # f is decreasing on [low, high], find its zero crossing
+    for _ in range(iterations):
+        mid = (low + high) / 2
+        if f(mid) > 0:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def operating_point(source, mode, level, enabled, max_current=None):
+    if not enabled:
+        return source.voltage(0.0), 0.0
+    i_max = source.short_circuit_current
+    if max_current is not None:
+        i_max = min(i_max, max_current)
+    if mode == lbk.packet.LimitModeEnum.CC:
+        current = min(max(level, 0.0), i_max)
+    elif mode == lbk.packet.LimitModeEnum.CV:
+        current = 0.0 if level >= source.voltage(0.0) else _bisect(lambda i: source.voltage(i) - level, 0.0, i_max)
+    elif mode == lbk.packet.LimitModeEnum.CR:
+        current = 0.0 if level <= 0 else _bisect(lambda i: source.voltage(i) - i * level, 0.0, i_max)
+    else:
+        # Constant power, stay on the high voltage side of the maximum power point
+        low, high = 0.0, i_max
+        for _ in range(60):
+            a, b = low + (high - low) / 3, high - (high - low) / 3
+            if a * source.voltage(a) < b * source.voltage(b):
+                low = a
+            else:
+                high = b
+        i_mpp = (low + high) / 2
+        if level >= i_mpp * source.voltage(i_mpp):
+            current = i_mpp
+        else:
+            current = _bisect(lambda i: level - i * source.voltage(i), 0.0, i_mpp)
+    return source.voltage(current), current
+
+
+class Simulator:
+    MODEL = b'8500\x00'
+    SERIAL_NUMBER = b'SIM0000000'
+
+    def __init__(self, source=None, address=0):
+        self.source = source if source is not None else TheveninSource()
+        self.address = address
+        self.remote = False
+        self.load_enabled = False
+        self.trigger_time = None
+        self.toggled = False
+        self.load_on_time = None
+        self.registers = {}
+        self.saved = {}
+        # Measure.DemandBits to report on top of the mode, for injecting protection faults
+        self.faults = set()
+        self.commands = {}
+        self.responses = {}
+        for packet_type in vars(lbk.packet).values():
+            if isinstance(packet_type, type) and issubclass(packet_type, lbk.packet.Packet):
+                if packet_type.COMMAND_ID is not None:
+                    self.commands[packet_type.COMMAND_ID] = packet_type
+                if packet_type.RESPONSE_ID is not None:
+                    self.responses[packet_type.RESPONSE_ID] = packet_type
+        self.set_register(lbk.packet.Mode, int(lbk.packet.LimitModeEnum.CC))
+        self.set_register(lbk.packet.MaximumVoltage, 120_000)
+        self.set_register(lbk.packet.MaximumCurrent, 300_000)
+        self.set_register(lbk.packet.MaximumPower, 300_000)
+
+    def set_register(self, packet_type, *raw):
+        self.registers[packet_type] = raw
+
+    def value(self, packet_type, index=0):
+        raw = self.registers.get(packet_type)
+        if raw is None:
+            return 0
+        return packet_type.FIELDS[index].deserialize(raw[index])
+
+    @property
+    def mode(self):
+        return lbk.packet.LimitModeEnum(self.registers[lbk.packet.Mode][0])
+
+    def transient_level(self):
+        packet_type = lbk.transient.TRANSIENT_PACKETS[self.mode]
+        raw = self.registers.get(packet_type)
+        if raw is None:
+            return None
+        value_a, time_a, value_b, time_b, operation = (self.value(packet_type, i) for i in range(5))
+        if self.trigger_time is None:
+            return value_a
+        elapsed = time.perf_counter() - self.trigger_time
+        if operation == lbk.packet.TransientOperationEnum.CONTINUOUS:
+            return value_b if elapsed % (time_a + time_b) < time_b else value_a
+        if operation == lbk.packet.TransientOperationEnum.PULSE:
+            return value_b if elapsed < time_b else value_a
+        return value_b if self.toggled else value_a
+
+    def level(self):
+        if self.value(lbk.packet.SelectFunction) == lbk.packet.SelectFunction.Function.TRANSIENT:
+            level = self.transient_level()
+            if level is not None:
+                return level
+        packet_type = lbk.device.LEVEL_PACKETS[self.mode]
+        return self.value(packet_type)
+
+    def measure(self):
+        now = time.perf_counter()
+        if self.load_enabled and self.value(lbk.packet.EnableLoadOnTimer):
+            if now - self.load_on_time >= self.value(lbk.packet.LoadOnTimer):
+                self.load_enabled = False
+        volts, amps = operating_point(self.source, self.mode, self.level(), self.load_enabled,
+                                      self.value(lbk.packet.MaximumCurrent))
+        if hasattr(self.source, 'drain'):
+            self.source.drain(amps, now)
+        battery = self.value(lbk.packet.SelectFunction) == lbk.packet.SelectFunction.Function.BATTERY
+        if battery and self.load_enabled and volts <= self.value(lbk.packet.MinimumBatteryVoltage):
+            self.load_enabled = False
+        return volts, amps
+
+    def status(self, code):
+        data = STATUS_STRUCT.pack(0xAA, self.address, lbk.packet.Status.RESPONSE_ID, code)
+        return data + frame_checksum(data)
+
+    def response(self, packet_type, *raw):
+        data = struct.pack(lbk.packet.PACKET_STRUCT + packet_type.PACKET_FORMAT, 0xAA, self.address,
+                           packet_type.RESPONSE_ID, *raw)
+        return data + frame_checksum(data)
+
+    def operation_bits(self):
+        return (self.remote << lbk.packet.Measure.OperationBits.REMOTE_CONTROL_ENABLED |
+                self.load_enabled << lbk.packet.Measure.OperationBits.OUTPUT_STATE)
+
+    def demand_bits(self):
+        bits = 1 << (lbk.packet.Measure.DemandBits.CONSTANT_CURRENT + int(self.mode))
+        for fault in self.faults:
+            bits |= 1 << fault
+        return bits
+
+    def handle(self, frame):
+        frame = bytes(frame)
+        if len(frame) != 26 or frame[0] != 0xAA:
+            return self.status(lbk.packet.Status.Code.INVALID_COMMAND)
+        if lbk.packet.calc_checksum(frame[:25]) != frame[25]:
+            return self.status(lbk.packet.Status.Code.INCORRECT_CHECKSUM)
+        command_id = frame[2]
+        if command_id == lbk.packet.Measure.RESPONSE_ID:
+            volts, amps = self.measure()
+            return self.response(lbk.packet.Measure, int(volts * 1000), int(amps * 10_000),
+                                 int(volts * amps * 1000), self.operation_bits(), self.demand_bits())
+        if command_id == lbk.packet.Version.RESPONSE_ID:
+            return self.response(lbk.packet.Version, self.MODEL, 1, 0, self.SERIAL_NUMBER)
+        if command_id == lbk.packet.Barcode.RESPONSE_ID:
+            return self.response(lbk.packet.Barcode, b'SIM', b'00', b'01', b'26')
+        if command_id in self.responses:
+            packet_type = self.responses[command_id]
+            raw = self.registers.get(packet_type)
+            if raw is None:
+                raw = struct.unpack('<' + packet_type.PACKET_FORMAT, bytes(22))
+            return self.response(packet_type, *raw)
+        if command_id not in self.commands:
+            return self.status(lbk.packet.Status.Code.UNRECOGNIZED_COMMAND)
+        packet_type = self.commands[command_id]
+        raw = struct.unpack('<' + packet_type.PACKET_FORMAT, frame[3:25])
+        if packet_type is lbk.packet.RemoteOperation:
+            self.remote = bool(raw[0])
+        elif not self.remote:
+            return self.status(lbk.packet.Status.Code.INVALID_COMMAND)
+        elif packet_type is lbk.packet.EnableLoad:
+            self.load_enabled = bool(raw[0])
+            self.load_on_time = time.perf_counter()
+        elif packet_type is lbk.packet.Trigger:
+            self.trigger_time = time.perf_counter()
+            self.toggled = not self.toggled
+        elif packet_type is lbk.packet.Mode and raw[0] >= len(lbk.packet.LimitModeEnum):
+            return self.status(lbk.packet.Status.Code.INCORRECT_PARAMETER)
+        elif packet_type in (lbk.packet.SaveSettings, lbk.packet.LoadSettings):
+            if raw[0] not in lbk.recipe.REGISTERS:
+                return self.status(lbk.packet.Status.Code.INCORRECT_PARAMETER)
+            if packet_type is lbk.packet.SaveSettings:
+                self.saved[raw[0]] = {saved_type: self.registers[saved_type]
+                                      for saved_type in lbk.recipe.RECIPE_PACKETS if saved_type in self.registers}
+            else:
+                self.registers.update(self.saved.get(raw[0], {}))
+            return self.status(lbk.packet.Status.Code.SUCCESS)
+        self.set_register(packet_type, *raw)
+        return self.status(lbk.packet.Status.Code.SUCCESS)
+
+
+class SimulatedSerial:
+    def __init__(self, simulator=None, latency=0.0, baud=None):
+        self.simulator = simulator if simulator is not None else Simulator()
+        self.latency = latency
+        self.baud = baud
+        self.pending = bytearray()
+        self.received = bytearray()
+        self.ready = 0.0
+
+    def _wire_time(self, size):
+        return 10 * size / self.baud if self.baud else 0.0
+
+    def write(self, data):
+        self.pending += data
+        while len(self.pending) >= 26:
+            frame = self.pending[:26]
+            del self.pending[:26]
+            self.received += self.simulator.handle(frame)
+            self.ready = max(self.ready, time.perf_counter()) + self.latency + self._wire_time(52)
+        return len(data)
+
+    def read(self, size=1):
+        delay = self.ready - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        data = bytes(self.received[:size])
+        del self.received[:size]
+        return data
+
+    def reset_input_buffer(self):
+        self.received.clear()
+
+    def close(self):
+        pass
+
+
+class PtySimulator:
+    def __init__(self, simulator=None, latency=0.0, baud=None):
+        self.simulator = simulator if simulator is not None else Simulator()
+        self.latency = latency
+        # With a baud rate, frames sent while the port is set to any other rate go unanswered like on a real device
+        self.baud = baud
+        import tty
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _read_frame(self):
+        frame = b''
+        while len(frame) < 26:
+            try:
+                chunk = os.read(self.master, 26 - len(frame))
+            except OSError:
+                return None
+            if not chunk:
+                return None
+            frame += chunk
+        return frame
+
+    def _serve(self):
+        while self.running:
+            frame = self._read_frame()
+            if frame is None:
+                return
+            if self.baud is not None and not self._baud_matches():
+                continue
+            response = self.simulator.handle(frame)
+            if self.latency > 0:
+                time.sleep(self.latency)
+            os.write(self.master, response)
+
+    def _baud_matches(self):
+        import termios
+        return termios.tcgetattr(self.slave)[5] == getattr(termios, f'B{self.baud}')
+
+    def close(self):
+        self.running = False
+        os.close(self.slave)
+        os.close(self.master)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_simulated(port, baud=None, latency=0.0):
+    # Picklable device factory, for code that opens devices in other processes
+    device = lbk.Device(port, transport=SimulatedSerial(latency=latency, baud=baud))
+    device.enable_remote(True)
+    return device
@@ -0,0 +1,158 @@
+import time
+import numpy as np
+import libbk8500 as lbk
+
+CHANNELS = ('volts', 'amps', 'watts')
+
+MEASURE_DTYPE = np.dtype([
+    ('magic', 'u1'),
+    ('address', 'u1'),
+    ('command_id', 'u1'),
+    ('volts', '<u4'),
+    ('amps', '<u4'),
+    ('watts', '<u4'),
+    ('operation_bits', 'u1'),
+    ('demand_bits', '<u2'),
+    ('reserved', 'V7'),
+    ('checksum', 'u1'),
+])
+MEASURE_SCALE = np.array([1 / 1000, 1 / 10_000, 1 / 1000])
+
+
+def decode_measures(frames):
+    # Decodes a buffer of back to back Measure responses at once instead of building a Measure object per frame
+    assert len(frames) % 26 == 0, "Frame buffer is not a multiple of 26 bytes long"
+    raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 26)
+    records = raw.view(MEASURE_DTYPE).reshape(-1)
+    bad = np.flatnonzero((records['command_id'] != lbk.packet.Measure.RESPONSE_ID) |
+                         (records['magic'] != 0xAA) |
+                         ((raw[:, :25].sum(axis=1) & 0xFF) != records['checksum']))
+    if len(bad) > 0:
+        # A well formed Status frame means the device refused the request, let the regular decoder raise its
+        # StatusException. Anything else refuses the whole chunk
+        frame = bytes(raw[bad[0]])
+        if frame[0] == 0xAA and frame[2] == lbk.packet.Status.RESPONSE_ID and \
+                lbk.packet.frame_checksum(frame) == frame[25]:
+            lbk.packet.Measure.deserialize(frame)
+        raise lbk.packet.FramingException(f'Frame {bad[0]} could not be decoded as a Measure response')
+    values = np.empty((len(records), 3))
+    values[:, 0] = records['volts']
+    values[:, 1] = records['amps']
+    values[:, 2] = records['watts']
+    values *= MEASURE_SCALE
+    return values
+
+
+def acquire(device, count):
+    return decode_measures(device.request_frames(lbk.packet.Measure, count))
+
+
+def acquire_timed(device, count):
+    # Also returns a (count, 2) array of the monotonic send and receive time of every sample
+    times = np.empty((count, 2))
+    return times, decode_measures(device.request_frames(lbk.packet.Measure, count, times))
+
+
+class RunningStats:
+    def __init__(self, channels=len(CHANNELS)):
+        self.count = 0
+        self.mean = np.zeros(channels)
+        self.m2 = np.zeros(channels)
+        self.min = np.full(channels, np.inf)
+        self.max = np.full(channels, -np.inf)
+
+    def update(self, chunk):
+        n = len(chunk)
+        if n == 0:
+            return
+        # Chan et al. pairwise combination of the running moments with the moments of the whole chunk
+        chunk_mean = chunk.mean(axis=0)
+        chunk_m2 = ((chunk - chunk_mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * (n / total)
+        self.m2 += chunk_m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+        np.minimum(self.min, chunk.min(axis=0), out=self.min)
+        np.maximum(self.max, chunk.max(axis=0), out=self.max)
+
+    @property
+    def variance(self):
+        if self.count < 2:
+            return np.zeros_like(self.m2)
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    def reset(self):
+        self.__init__(len(self.mean))
+
+
+class Decimator:
+    def __init__(self, factor, callback, channels=len(CHANNELS)):
+        assert factor >= 1, 'Decimation factor must be at least 1'
+        self.factor = factor
+        self.callback = callback
+        self.carry = np.empty((factor, channels))
+        self.carried = 0
+
+    def update(self, chunk):
+        if self.carried > 0:
+            take = min(self.factor - self.carried, len(chunk))
+            self.carry[self.carried:self.carried + take] = chunk[:take]
+            self.carried += take
+            chunk = chunk[take:]
+            if self.carried < self.factor:
+                return
+            self.callback(self.carry.mean(axis=0))
+            self.carried = 0
+        blocks = len(chunk) // self.factor
+        if blocks > 0:
+            means = chunk[:blocks * self.factor].reshape(blocks, self.factor, -1).mean(axis=1)
+            for mean in means:
+                self.callback(mean)
+        rest = chunk[blocks * self.factor:]
+        self.carry[:len(rest)] = rest
+        self.carried = len(rest)
+
+
+class BlockStats:
+    def __init__(self, block, callback, channels=len(CHANNELS)):
+        assert block >= 1, 'Block size must be at least 1'
+        self.block = block
+        self.callback = callback
+        self.stats = RunningStats(channels)
+
+    def update(self, chunk):
+        while len(chunk) > 0:
+            take = min(self.block - self.stats.count, len(chunk))
+            self.stats.update(chunk[:take])
+            chunk = chunk[take:]
+            if self.stats.count == self.block:
+                self.callback(self.stats)
+                self.stats = RunningStats(len(self.stats.mean))
+
+
+class Pipeline:
+    def __init__(self, stages, chunk=32):
+        assert chunk >= 1, 'Chunk size must be at least 1'
+        self.stages = list(stages)
+        self.chunk = chunk
+        self.samples = 0
+
+    def update(self, chunk):
+        self.samples += len(chunk)
+        for stage in self.stages:
+            stage.update(chunk)
+
+    def run(self, device, samples=None, duration=None):
+        assert samples is not None or duration is not None, 'Pipeline needs a sample count or a duration'
+        end = time.monotonic() + duration if duration is not None else None
+        remaining = samples
+        while (remaining is None or remaining > 0) and (end is None or time.monotonic() < end):
+            count = self.chunk if remaining is None else min(self.chunk, remaining)
+            self.update(acquire(device, count))
+            if remaining is not None:
+                remaining -= count
@@ -0,0 +1,299 @@
+import abc
+import csv
+import time
+import numpy as np
+import libbk8500 as lbk
+import libbk8500.cache
+import libbk8500.stream
+
+LEVEL_UNITS = {
+    lbk.packet.LimitModeEnum.CC: ('A', 'Current'),
+    lbk.packet.LimitModeEnum.CV: ('V', 'Voltage'),
+    lbk.packet.LimitModeEnum.CW: ('W', 'Power'),
+    lbk.packet.LimitModeEnum.CR: ('Ω', 'Resistance'),
+}
+
+
+class Axis(abc.ABC):
+    # Axes are ordered outermost first by cost, so expensive changes happen as rarely as possible
+    COST = 1
+    SERPENTINE = True
+
+    def __init__(self, name, values):
+        self.name = name
+        self.values = list(values)
+
+    @abc.abstractmethod
+    def apply(self, device, value):
+        pass
+
+
+class LevelAxis(Axis):
+    COST = 1
+
+    def __init__(self, mode, values, name=None):
+        self.mode = lbk.packet.LimitModeEnum(mode)
+        unit, label = LEVEL_UNITS[self.mode]
+        super().__init__(name if name is not None else f'Requested {label} ({unit})', values)
+        self.frames = None
+
+    def apply(self, device, value):
+        if self.frames is None:
+            packet_type = lbk.device.LEVEL_PACKETS[self.mode]
+            self.frames = dict(zip(self.values, lbk.cache.encode_levels(packet_type, self.values)))
+        device.command_frame(self.frames[value])
+
+
+class SetpointAxis(Axis):
+    COST = 2
+
+    def __init__(self, name, values, setter):
+        super().__init__(name, values)
+        self.setter = setter
+
+    def apply(self, device, value):
+        self.setter(value)
+
+
+class RepeatAxis(Axis):
+    COST = 3
+    SERPENTINE = False
+
+    def __init__(self, count, interval=0):
+        super().__init__('Repetition', range(count))
+        self.interval = interval
+        self.start = None
+
+    def apply(self, device, value):
+        if value == 0 or self.start is None:
+            self.start = time.monotonic()
+            return
+        delay = self.start + value * self.interval - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class FixedDwell:
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def duration(self, jump):
+        return self.seconds
+
+
+class SlewDwell:
+    def __init__(self, base, per_unit, maximum=None):
+        self.base = base
+        self.per_unit = per_unit
+        self.maximum = maximum
+
+    def duration(self, jump):
+        seconds = self.base + self.per_unit * abs(jump)
+        if self.maximum is not None:
+            seconds = min(seconds, self.maximum)
+        return seconds
+
+
+class Reducer(abc.ABC):
+    NAME = None
+    UNITS = {'volts': 'V', 'amps': 'A', 'watts': 'W'}
+
+    def __init__(self, attribute):
+        assert attribute in self.UNITS, f'Cannot reduce {attribute}'
+        self.attribute = attribute
+        self.name = f'{self.NAME} {attribute} ({self.UNITS[attribute]})'
+
+    @abc.abstractmethod
+    def reduce(self, values):
+        pass
+
+
+class Mean(Reducer):
+    NAME = 'mean'
+
+    def reduce(self, values):
+        return float(np.mean(values))
+
+
+class Min(Reducer):
+    NAME = 'min'
+
+    def reduce(self, values):
+        return float(np.min(values))
+
+
+class Max(Reducer):
+    NAME = 'max'
+
+    def reduce(self, values):
+        return float(np.max(values))
+
+
+class Std(Reducer):
+    NAME = 'std'
+
+    def reduce(self, values):
+        return float(np.std(values))
+
+
+class CsvSink:
+    def __init__(self, out, flush=False):
+        self.out = out
+        self.flush = flush
+        self.writer = csv.writer(out)
+
+    def start(self, columns):
+        self.writer.writerow(columns)
+
+    def write(self, row):
+        self.writer.writerow(row)
+        if self.flush:
+            self.out.flush()
+
+    def finish(self):
+        self.out.flush()
+
+
+class ListSink:
+    def __init__(self):
+        self.columns = None
+        self.rows = []
+
+    def start(self, columns):
+        self.columns = columns
+
+    def write(self, row):
+        self.rows.append(row)
+
+    def finish(self):
+        pass
+
+    def array(self):
+        return np.array(self.rows)
+
+
+class Sweep:
+    def __init__(self, axes, dwell=FixedDwell(0), samples=1, reducers=None, sample_interval=0):
+        assert len(axes) > 0, 'Sweep needs at least one axis'
+        levels = [axis for axis in axes if isinstance(axis, LevelAxis)]
+        assert len(levels) <= 1, 'Sweep can only have one LevelAxis'
+        assert samples >= 1, 'Sweep needs at least one sample per point'
+        self.axes = list(axes)
+        self.mode = levels[0].mode if levels else None
+        self.dwell = dwell
+        self.samples = samples
+        self.reducers = reducers if reducers is not None else [Mean('volts'), Mean('amps'), Mean('watts')]
+        self.sample_interval = sample_interval
+
+    @property
+    def columns(self):
+        return [axis.name for axis in self.axes] + [reducer.name for reducer in self.reducers]
+
+    def ordered_axes(self):
+        # Stable, so axes of equal cost keep the order they were given in
+        return sorted(self.axes, key=lambda axis: -axis.COST)
+
+    def points(self, reverse_level=False):
+        # Serpentine order: every axis reverses direction each time it has been fully traversed, so consecutive points
+        # only ever differ by one step of one axis instead of jumping back to the start of an inner range
+        axes = self.ordered_axes()
+        index = [self.axes.index(axis) for axis in axes]
+        reverse = [reverse_level and isinstance(axis, LevelAxis) for axis in axes]
+        values = [None] * len(self.axes)
+
+        def walk(depth):
+            if depth == len(axes):
+                yield tuple(values)
+                return
+            axis = axes[depth]
+            for value in (axis.values[::-1] if reverse[depth] else axis.values):
+                values[index[depth]] = value
+                yield from walk(depth + 1)
+            if axis.SERPENTINE:
+                reverse[depth] = not reverse[depth]
+
+        yield from walk(0)
+
+    def level_index(self):
+        for i, axis in enumerate(self.axes):
+            if isinstance(axis, LevelAxis):
+                return i
+        return None
+
+
+def measure(device, samples, interval=0):
+    if interval > 0:
+        data = np.empty((samples, 3))
+        for i in range(samples):
+            if i > 0:
+                time.sleep(interval)
+            data[i] = lbk.stream.acquire(device, 1)
+    else:
+        data = lbk.stream.acquire(device, samples)
+    return {'volts': data[:, 0], 'amps': data[:, 1], 'watts': data[:, 2]}
+
+
+def plan(sweeps, mode=None, level=None):
+    # Group sweeps by mode starting with the mode the device is already in, then start each sweep from the end of its
+    # level range closest to where the previous sweep left off
+    order = sorted(sweeps, key=lambda sweep: (sweep.mode != mode, -1 if sweep.mode is None else int(sweep.mode)))
+    for sweep in order:
+        reverse = False
+        i = sweep.level_index()
+        if i is not None and level is not None and sweep.mode == mode:
+            values = sweep.axes[i].values
+            reverse = abs(values[-1] - level) < abs(values[0] - level)
+        points = list(sweep.points(reverse))
+        yield sweep, points
+        if i is not None and points:
+            mode = sweep.mode
+            level = points[-1][i]
+
+
+def run_sweeps(device, sweeps, sinks, mode=None, level=None):
+    if isinstance(sweeps, Sweep):
+        sweeps = [sweeps]
+    columns = sweeps[0].columns
+    assert all(sweep.columns == columns for sweep in sweeps), \
+        'Sweeps must produce the same columns, give every LevelAxis the same name when mixing modes'
+    limits = getattr(device, 'limits', None)
+    if limits is not None:
+        # Reject the whole plan before anything is sent rather than partway through
+        for sweep in sweeps:
+            i = sweep.level_index()
+            if i is not None:
+                limits.validate_levels(lbk.device.LEVEL_PACKETS[sweep.mode], sweep.axes[i].values)
+    for sink in sinks:
+        sink.start(columns)
+
+    # However the sweep ends, the load is not left on
+    try:
+        for sweep, points in plan(sweeps, mode, level):
+            i = sweep.level_index()
+            if sweep.mode is not None and sweep.mode != mode:
+                device.enable_load(False)
+                device.command(lbk.packet.Mode(sweep.mode))
+                device.set_level(sweep.mode, points[0][i])
+                device.enable_load(True)
+                mode = sweep.mode
+                level = points[0][i]
+            previous = None
+            for point in points:
+                jump = 0
+                for j, axis in enumerate(sweep.axes):
+                    if previous is None or previous[j] != point[j]:
+                        axis.apply(device, point[j])
+                if i is not None:
+                    jump = point[i] - level if level is not None else 0
+                    level = point[i]
+                time.sleep(sweep.dwell.duration(jump))
+                samples = measure(device, sweep.samples, sweep.sample_interval)
+                row = point + tuple(reducer.reduce(samples[reducer.attribute]) for reducer in sweep.reducers)
+                for sink in sinks:
+                    sink.write(row)
+                previous = point
+    finally:
+        device.enable_load(False)
+
+    for sink in sinks:
+        sink.finish()
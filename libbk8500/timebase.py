@@ -0,0 +1,120 @@
+import numpy as np
+import libbk8500 as lbk
+import libbk8500.pool
+import libbk8500.stream
+
+LINEAR = 'linear'
+NEAREST = 'nearest'
+METHODS = (LINEAR, NEAREST)
+
+
+class TimedStream:
+    # The samples of one device, sent and received are time.monotonic() around each request. The device answers some
+    # time in between, so the midpoint is the best estimate of when a sample was taken
+    def __init__(self, name, sent, received, values, channels=lbk.stream.CHANNELS):
+        self.name = name
+        self.sent = np.asarray(sent, dtype=float)
+        self.received = np.asarray(received, dtype=float)
+        self.values = np.asarray(values, dtype=float).reshape(len(self.sent), -1)
+        self.channels = tuple(channels)
+        self.t = (self.sent + self.received) / 2
+        assert len(self.received) == len(self.sent) == len(self.values), 'Every sample needs a sent and received time'
+        assert self.values.shape[1] == len(self.channels), 'One name per channel'
+
+    @classmethod
+    def from_rows(cls, name, rows, channels=lbk.stream.CHANNELS):
+        # Rows laid out as lbk.pool.COLUMNS: sent, received, then the channels
+        rows = np.asarray(rows, dtype=float).reshape(-1, 2 + len(channels))
+        return cls(name, rows[:, 0], rows[:, 1], rows[:, 2:], channels)
+
+    @property
+    def uncertainty(self):
+        # Half the round trip, how far the real sample time can be from t
+        return (self.received - self.sent) / 2
+
+    def __len__(self):
+        return len(self.sent)
+
+    def __str__(self):
+        return f'TimedStream({self.name}, {len(self)} samples)'
+
+
+class StreamSink:
+    # Collects what lbk.pool.AcquisitionPool.run hands its sinks, one TimedStream per port when done
+    def __init__(self):
+        self.chunks = {}
+
+    def write(self, port, rows):
+        self.chunks.setdefault(port, []).append(np.array(rows))
+
+    def streams(self):
+        return [TimedStream.from_rows(port, np.concatenate(chunks)) for port, chunks in self.chunks.items()]
+
+
+def common_timebase(streams, period=None):
+    # Evenly spaced times over the span every stream covers, by default at the rate of the slowest stream
+    start = max(stream.t[0] for stream in streams)
+    end = min(stream.t[-1] for stream in streams)
+    if period is None:
+        period = max(np.median(np.diff(stream.t)) for stream in streams)
+    assert period > 0, 'Period must be positive'
+    if end < start:
+        return np.empty(0)
+    return start + np.arange(int((end - start) / period) + 1) * period
+
+
+def _nearest(stream, t, tolerance):
+    right = np.clip(np.searchsorted(stream.t, t), 1, len(stream) - 1)
+    left = right - 1
+    index = np.where(t - stream.t[left] <= stream.t[right] - t, left, right)
+    values = stream.values[index]
+    if tolerance is not None:
+        values[np.abs(stream.t[index] - t) > tolerance] = np.nan
+    return values
+
+
+def _linear(stream, t):
+    values = np.empty((len(t), stream.values.shape[1]))
+    for channel in range(stream.values.shape[1]):
+        values[:, channel] = np.interp(t, stream.t, stream.values[:, channel], left=np.nan, right=np.nan)
+    return values
+
+
+class Aligned:
+    def __init__(self, t, names, channels, values):
+        self.t = t
+        self.names = names
+        self.channels = channels
+        # (stream, time, channel)
+        self.values = values
+
+    def channel(self, name):
+        # (stream, time) array of one channel
+        return self.values[:, :, self.channels.index(name)]
+
+    def stream(self, name):
+        return self.values[self.names.index(name)]
+
+    def total(self, name):
+        # Sum over every stream at each time, e.g. total('watts') for the power of a whole rack
+        return self.channel(name).sum(axis=0)
+
+    def __str__(self):
+        return f'Aligned({len(self.names)} streams, {len(self.t)} times)'
+
+
+def align(streams, t=None, method=LINEAR, tolerance=None, period=None):
+    # Resamples every stream onto t (by default the common timebase of all of them). Linear interpolates between the
+    # neighbouring samples, nearest takes the closest one and, with a tolerance in seconds, leaves NaN where there is
+    # no sample that close. Times outside a stream are NaN either way for linear
+    assert method in METHODS, f'Unknown alignment method {method}'
+    assert all(len(stream) >= 2 for stream in streams), 'Every stream needs at least two samples'
+    channels = streams[0].channels
+    assert all(stream.channels == channels for stream in streams), 'Streams have different channels'
+    if t is None:
+        t = common_timebase(streams, period)
+    t = np.asarray(t, dtype=float)
+    values = np.empty((len(streams), len(t), len(channels)))
+    for i, stream in enumerate(streams):
+        values[i] = _linear(stream, t) if method == LINEAR else _nearest(stream, t, tolerance)
+    return Aligned(t, [stream.name for stream in streams], channels, values)
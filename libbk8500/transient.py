@@ -0,0 +1,138 @@
+import time
+import numpy as np
+import libbk8500 as lbk
+import libbk8500.stream
+
+TRANSIENT_PACKETS = {
+    lbk.packet.LimitModeEnum.CC: lbk.packet.CurrentTransient,
+    lbk.packet.LimitModeEnum.CV: lbk.packet.VoltageTransient,
+    lbk.packet.LimitModeEnum.CW: lbk.packet.PowerTransient,
+    lbk.packet.LimitModeEnum.CR: lbk.packet.ResistanceTransient,
+}
+
+# The measured quantity that follows the setpoint in each mode, CR is judged by the current it draws
+RESPONSE_CHANNELS = {
+    lbk.packet.LimitModeEnum.CC: 'amps',
+    lbk.packet.LimitModeEnum.CV: 'volts',
+    lbk.packet.LimitModeEnum.CW: 'watts',
+    lbk.packet.LimitModeEnum.CR: 'amps',
+}
+
+
+def configure(device, mode, value_a, time_a, value_b, time_b,
+              operation=lbk.packet.TransientOperationEnum.PULSE):
+    mode = lbk.packet.LimitModeEnum(mode)
+    device.enable_load(False)
+    device.command(lbk.packet.Mode(mode))
+    device.command(TRANSIENT_PACKETS[mode](value_a, time_a, value_b, time_b, operation))
+    device.command(lbk.packet.SelectFunction(lbk.packet.SelectFunction.Function.TRANSIENT))
+    device.command(lbk.packet.SelectTriggerSource(lbk.packet.SelectTriggerSource.Source.BUS))
+    device.enable_load(True)
+
+
+class Capture:
+    def __init__(self, t, values, trigger_latency):
+        self.t = t
+        self.volts = values[:, 0]
+        self.amps = values[:, 1]
+        self.watts = values[:, 2]
+        self.trigger_latency = trigger_latency
+
+    def channel(self, name):
+        return getattr(self, name)
+
+    @property
+    def sample_rate(self):
+        return (len(self.t) - 1) / (self.t[-1] - self.t[0]) if len(self.t) > 1 else 0
+
+
+def _poll(device, until, times, frames, request):
+    while time.perf_counter() < until:
+        sent = time.perf_counter()
+        frames += device.exchange(request)
+        # The device samples somewhere between the request and the response, the midpoint is the best estimate
+        times.append((sent + time.perf_counter()) / 2)
+
+
+def capture(device, duration, pre_trigger=0.05):
+    # Poll Measure as fast as the link allows, with raw frames collected and decoded in one pass afterwards. Sample
+    # times are relative to the moment the device acknowledged the Trigger
+    request = lbk.packet.Measure.request()
+    times = []
+    frames = bytearray()
+    start = time.perf_counter()
+    _poll(device, start + pre_trigger, times, frames, request)
+    sent = time.perf_counter()
+    device.trigger()
+    triggered = time.perf_counter()
+    _poll(device, triggered + duration, times, frames, request)
+    t = np.array(times) - triggered
+    return Capture(t, lbk.stream.decode_measures(frames), triggered - sent)
+
+
+class StepResponse:
+    def __init__(self, initial, final, rise_time, overshoot, settling_time, peak_time):
+        self.initial = initial
+        self.final = final
+        self.rise_time = rise_time
+        self.overshoot = overshoot
+        self.settling_time = settling_time
+        self.peak_time = peak_time
+
+    def __str__(self):
+        return (f'StepResponse({self.initial:.4g} -> {self.final:.4g}, rise={self.rise_time * 1000:.3f} ms, '
+                f'overshoot={self.overshoot:.2f} %, settling={self.settling_time * 1000:.3f} ms)')
+
+
+def _crossing(t, norm, level):
+    # First time the normalized response reaches level, linearly interpolated between the samples around it
+    above = np.flatnonzero(norm >= level)
+    if len(above) == 0:
+        return np.nan
+    i = above[0]
+    if i == 0:
+        return t[0]
+    return t[i - 1] + (level - norm[i - 1]) * (t[i] - t[i - 1]) / (norm[i] - norm[i - 1])
+
+
+def step_metrics(t, y, step_time=0.0, band=0.02, final_fraction=0.1):
+    t = np.asarray(t, dtype=float)
+    y = np.asarray(y, dtype=float)
+    before = t < step_time
+    after = ~before
+    assert np.any(after), 'No samples after the step'
+    t_after = t[after]
+    y_after = y[after]
+    initial = y[before].mean() if np.any(before) else y[0]
+    tail = max(int(len(y_after) * final_fraction), 1)
+    final = y_after[-tail:].mean()
+    step = final - initial
+    if step == 0:
+        return StepResponse(initial, final, 0.0, 0.0, 0.0, 0.0)
+
+    norm = (y_after - initial) / step
+    rise_time = _crossing(t_after, norm, 0.9) - _crossing(t_after, norm, 0.1)
+    peak = np.argmax(norm)
+    overshoot = max(norm[peak] - 1, 0) * 100
+    outside = np.flatnonzero(np.abs(norm - 1) > band)
+    if len(outside) == 0:
+        settling_time = t_after[0] - step_time
+    elif outside[-1] + 1 < len(t_after):
+        settling_time = t_after[outside[-1] + 1] - step_time
+    else:
+        settling_time = np.nan
+    return StepResponse(initial, final, rise_time, overshoot, settling_time, t_after[peak] - step_time)
+
+
+def run_transient(device, mode, value_a, time_a, value_b, time_b, duration, pre_trigger=0.05, band=0.02):
+    mode = lbk.packet.LimitModeEnum(mode)
+    configure(device, mode, value_a, time_a, value_b, time_b, lbk.packet.TransientOperationEnum.PULSE)
+    try:
+        result = capture(device, duration, pre_trigger)
+    finally:
+        device.command(lbk.packet.SelectFunction(lbk.packet.SelectFunction.Function.FIXED))
+    # In pulse mode the load holds B for time_b after the trigger, so only analyze that part. The trigger time is only
+    # known to within one round trip, leave that much margin before the load returns to A
+    window = result.t < time_b - result.trigger_latency
+    metrics = step_metrics(result.t[window], result.channel(RESPONSE_CHANNELS[mode])[window], 0.0, band)
+    return result, metrics
@@ -0,0 +1,223 @@
+import signal
+import threading
+import time
+import numpy as np
+import libbk8500 as lbk
+import libbk8500.stream
+
+FAULTS = (lbk.packet.Measure.DemandBits.VOLTAGE_REVERSED, lbk.packet.Measure.DemandBits.OVER_VOLTAGE,
+          lbk.packet.Measure.DemandBits.OVER_CURRENT, lbk.packet.Measure.DemandBits.OVER_POWER,
+          lbk.packet.Measure.DemandBits.OVER_TEMP)
+SIGNALS = tuple(getattr(signal, name) for name in ('SIGTERM', 'SIGHUP', 'SIGBREAK') if hasattr(signal, name))
+# Errors that leave the link misaligned rather than dead, worth one retry after dropping the input buffer
+LINK_ERRORS = (lbk.packet.FramingException, lbk.packet.StatusException, lbk.device.TimeoutException)
+
+
+class WatchdogException(Exception):
+    pass
+
+
+class Trip:
+    def __init__(self, reason, requested, load_off, remote_off, errors):
+        self.reason = reason
+        # time.monotonic() of the fault, exception or signal, and of the acknowledgements of the two commands
+        self.requested = requested
+        self.load_off = load_off
+        self.remote_off = remote_off
+        self.errors = errors
+
+    @property
+    def reaction(self):
+        return self.load_off - self.requested if self.load_off is not None else None
+
+    def __str__(self):
+        load = f'load off after {self.reaction * 1000:.3f} ms' if self.load_off is not None else 'load NOT disabled'
+        remote = f'remote off after {(self.remote_off - self.requested) * 1000:.3f} ms' \
+            if self.remote_off is not None else 'remote NOT dropped'
+        return f'Trip({self.reason}, {load}, {remote})'
+
+
+class Watchdog:
+    # Polls Measure from its own thread every interval and switches the load off and drops remote control when the
+    # device reports a protection fault, the block it guards raises, or the process gets a termination signal. Measure
+    # requests are coalesced with any other Measure in flight, so it adds little to acquisition traffic. The shutdown
+    # always runs on the watchdog thread, which waits at most for the exchange that holds the device lock, so the
+    # reaction time is bounded by one exchange (the serial timeout if the device stopped answering) plus two commands.
+    # A signal that arrives while the main thread is in the middle of an exchange is held back, the guarded code only
+    # stops for it at its next check() or when it leaves the block
+    def __init__(self, device, interval=0.05, faults=FAULTS, callback=None):
+        assert interval > 0, 'Interval must be positive'
+        self.device = device
+        self.interval = interval
+        self.faults = tuple(faults)
+        self.callback = callback
+        self.wake = threading.Event()
+        self.tripped = threading.Event()
+        self.thread = None
+        self.stopping = False
+        self.reason = None
+        self.requested = None
+        # Set by a termination signal, the exit status the guarded block leaves with
+        self.exit_code = None
+        self.trips = []
+        self.polls = 0
+        self.periods = lbk.stream.RunningStats(1)
+        self.worst_period = 0.0
+        self.late = 0
+        self.previous_handlers = {}
+
+    def start(self):
+        assert self.thread is None or not self.thread.is_alive(), 'Watchdog already running'
+        self.stopping = False
+        self.reason = None
+        self.requested = None
+        self.exit_code = None
+        self.wake.clear()
+        self.tripped.clear()
+        self.thread = threading.Thread(target=self._run, name='lbk-watchdog', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        # Stops polling without touching the load
+        self.stopping = True
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def trip(self, reason):
+        # Safe from any thread and from signal handlers, only the first reason counts
+        if self.reason is None:
+            self.requested = time.monotonic()
+            self.reason = reason
+        self.wake.set()
+
+    def wait(self, timeout=None):
+        return self.tripped.wait(timeout)
+
+    def check(self):
+        # For loops inside the guarded block, so they stop at the next step once the watchdog tripped: SystemExit after
+        # a signal, WatchdogException for anything else
+        if self.exit_code is not None:
+            raise SystemExit(self.exit_code)
+        if self.reason is not None:
+            raise WatchdogException(self.reason)
+
+    def _run(self):
+        next_poll = time.monotonic()
+        last_poll = None
+        while True:
+            self.wake.wait(max(next_poll - time.monotonic(), 0))
+            if self.reason is not None:
+                self._shutdown()
+                return
+            if self.stopping:
+                return
+            now = time.monotonic()
+            if last_poll is not None:
+                period = now - last_poll
+                self.periods.update(np.array([[period]]))
+                self.worst_period = max(self.worst_period, period)
+            last_poll = now
+            self.polls += 1
+            try:
+                meas = self.device.request(lbk.packet.Measure)
+            except Exception as e:
+                self.trip(f'{type(e).__name__} while polling: {e}')
+                continue
+            for fault in self.faults:
+                if meas.demand_bits[fault]:
+                    self.trip(fault.name)
+                    break
+            next_poll += self.interval
+            if next_poll < time.monotonic():
+                self.late += 1
+                next_poll = time.monotonic()
+
+    def _command(self, packet, errors):
+        for _ in range(2):
+            try:
+                self.device.command(packet)
+                return time.monotonic()
+            except LINK_ERRORS as e:
+                errors.append(f'{type(packet).__name__}: {type(e).__name__} {e}')
+                # A frame of an interrupted exchange may still be on its way, drop it and try once more
+                time.sleep(0.01)
+                if hasattr(self.device.ser, 'reset_input_buffer'):
+                    self.device.ser.reset_input_buffer()
+            except Exception as e:
+                errors.append(f'{type(packet).__name__}: {type(e).__name__} {e}')
+                return None
+        return None
+
+    def _shutdown(self):
+        errors = []
+        load_off = self._command(lbk.packet.EnableLoad(False), errors)
+        remote_off = self._command(lbk.packet.RemoteOperation(False), errors)
+        trip = Trip(self.reason, self.requested, load_off, remote_off, errors)
+        self.trips.append(trip)
+        self.tripped.set()
+        if self.callback is not None:
+            self.callback(trip)
+
+    def _signal(self, signum, frame):
+        self.trip(f'signal {signal.Signals(signum).name}')
+        self.exit_code = 128 + signum
+        # Unwinding in the middle of an exchange would leave half a frame on the wire or unread, which the device then
+        # takes as the start of the next one. The main thread finishes the exchange first and leaves at the next
+        # check() or at the end of the block
+        if self.device.exchanging == threading.get_ident():
+            return
+        # Unwind the main thread so it lets go of the device, __exit__ waits for the shutdown
+        raise SystemExit(self.exit_code)
+
+    def install_signal_handlers(self, signals=SIGNALS):
+        for signum in signals:
+            self.previous_handlers[signum] = signal.signal(signum, self._signal)
+
+    def restore_signal_handlers(self):
+        for signum, handler in self.previous_handlers.items():
+            signal.signal(signum, handler)
+        self.previous_handlers = {}
+
+    def __enter__(self):
+        if threading.current_thread() is threading.main_thread():
+            self.install_signal_handlers()
+        return self.start()
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            if exc_type is not None:
+                self.trip(f'{exc_type.__name__}: {exc}' if str(exc) else exc_type.__name__)
+            if self.reason is not None:
+                self.thread.join()
+            else:
+                self.stop()
+        finally:
+            self.restore_signal_handlers()
+        if exc_type is None:
+            # The block ran to the end after a trip, or a signal arrived mid-exchange and was held back until now
+            self.check()
+        return False
+
+    @property
+    def reaction_times(self):
+        return np.array([trip.reaction for trip in self.trips if trip.reaction is not None])
+
+    def report(self):
+        lines = [f'Watchdog: {self.polls} polls every {self.interval * 1000:.1f} ms']
+        if self.periods.count > 0:
+            lines.append(f'Poll period: mean {self.periods.mean[0] * 1000:.3f} ms, '
+                         f'jitter {self.periods.std[0] * 1000:.3f} ms, worst {self.worst_period * 1000:.3f} ms, '
+                         f'{self.late} late')
+        for trip in self.trips:
+            lines.append(str(trip))
+            lines += [f'  {error}' for error in trip.errors]
+        reactions = self.reaction_times
+        if len(reactions) > 0:
+            lines.append(f'Reaction time: min {reactions.min() * 1000:.3f} ms, mean {reactions.mean() * 1000:.3f} ms, '
+                         f'max {reactions.max() * 1000:.3f} ms over {len(reactions)} trips')
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return f'Watchdog({self.interval * 1000:.1f} ms, {len(self.trips)} trips)'
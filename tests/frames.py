@@ -0,0 +1,14 @@
+import struct
+from . import libbk8500 as lbk
+
+# Raw response frames built by hand, independent of the packet codecs under test
+
+
+def measure_frame(volts, amps, watts):
+    data = struct.pack('<BBBIIIBH7x', 0xAA, 0, 0x5F, int(volts * 1000), int(amps * 10_000), int(watts * 1000), 0, 0)
+    return data + bytes([lbk.packet.calc_checksum(data)])
+
+
+def status_frame(code):
+    data = struct.pack('<BBBB21x', 0xAA, 0, 0x12, int(code))
+    return data + bytes([lbk.packet.calc_checksum(data)])
@@ -0,0 +1,28 @@
+import csv
+import io
+from . import libbk8500 as lbk
+from libbk8500 import battery, simulator
+
+
+def test_integrator_trapezoid():
+    integrator = battery.Integrator()
+    for t, amps in [(0, 1.0), (1800, 1.0), (3600, 3.0)]:
+        integrator.update(t, amps, amps * 2)
+    assert abs(integrator.amp_hours - 1.5) < 1e-12 and abs(integrator.watt_hours - 3.0) < 1e-12
+
+
+def test_discharge_stops_at_cutoff():
+    scale = 3600 * 20
+    source = simulator.BatterySource(capacity_ah=1.0, time_scale=scale)
+    device = lbk.Device(None, transport=simulator.SimulatedSerial(simulator.Simulator(source)))
+    device.enable_remote(True)
+    battery.configure(device, lbk.packet.LimitModeEnum.CC, 2.0, 3.2)
+    out = io.StringIO()
+    result = battery.run_discharge(device, csv.writer(out), interval=0.001, dv=0.05, max_duration=10)
+    assert result.final_volts <= 3.2
+    # The simulated battery drains faster than real time, the host integrates over real time
+    drained = source.capacity_ah - source.charge_ah
+    assert drained > 0.7 and abs(result.amp_hours * scale - drained) < 0.05 * drained
+    assert result.logged < result.samples
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert rows[0] == list(battery.COLUMNS) and len(rows) == result.logged + 1
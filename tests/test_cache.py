@@ -0,0 +1,19 @@
+from . import libbk8500 as lbk
+from libbk8500 import cache
+
+
+def test_encode_levels_matches_serialize():
+    values = [0, 0.0001, 0.02, 1.2345, 3.3, 29.9999]
+    for packet_type in (lbk.packet.CurrentLevel, lbk.packet.VoltageLevel, lbk.packet.MaximumPower):
+        frames = cache.encode_levels(packet_type, values, address=3)
+        assert frames == [bytes(packet_type(value, address=3)) for value in values]
+
+
+def test_frame_cache_lru():
+    frames = cache.FrameCache(maxsize=2)
+    frames.encode(lbk.packet.EnableLoad(True))
+    frames.encode(lbk.packet.Mode(lbk.packet.LimitModeEnum.CC))
+    assert frames.encode(lbk.packet.EnableLoad(True)) == bytes(lbk.packet.EnableLoad(True))
+    frames.encode(lbk.packet.CurrentLevel(1))
+    frames.encode(lbk.packet.Mode(lbk.packet.LimitModeEnum.CC))
+    assert (frames.hits, frames.misses, len(frames)) == (1, 4, 2)
@@ -0,0 +1,57 @@
+import numpy as np
+from libbk8500 import ivcurve, simulator
+
+
+def thevenin_curve(voltage, resistance, points):
+    amps = np.linspace(0, voltage / resistance, points + 2)[1:-1]
+    return voltage - amps * resistance, amps
+
+
+def test_curve_metrics_of_linear_sources():
+    curves = [thevenin_curve(12, 0.5, 20), thevenin_curve(5, 2, 7), (np.array([1.0]), np.array([1.0]))]
+    metrics = ivcurve.curve_metrics(*ivcurve.pad_curves(curves))
+    voc, isc, vmp, imp, pmp, fill_factor, rs, rsh = metrics[:2].T
+    assert np.allclose(voc, [12, 5]) and np.allclose(isc, [24, 2.5])
+    assert np.allclose(rs, [0.5, 2]) and np.allclose(rsh, [0.5, 2])
+    # The best sampled point, near voc / 2 for a linear source
+    assert np.all(np.abs(vmp - voc / 2) < voc / 10) and np.allclose(pmp, vmp * imp)
+    assert np.all(fill_factor <= 0.25) and np.all(fill_factor > 0.24)
+    assert np.isnan(metrics[2]).all()
+
+
+def test_analyze_files_in_batches(tmp_path):
+    source = simulator.PVSource()
+    for i, irradiance in enumerate((1000, 700, 400)):
+        source.irradiance = irradiance
+        volts, amps = source.curve()
+        sample = np.linspace(0, len(volts) - 1, 200).astype(int)
+        ivcurve.save_curve(str(tmp_path / f'{i}.npy'), volts[sample], amps[sample])
+    volts, amps = thevenin_curve(12, 0.5, 10)
+    with open(tmp_path / 'test.csv', 'w') as f:
+        f.write('Requested Current (A),voltage (V),current (A),power (W)\n')
+        f.writelines(f'{a},{v},{a},{v * a}\n' for v, a in zip(volts, amps))
+    (tmp_path / 'bad.csv').write_text('nothing here\n')
+    paths = ivcurve.find_curves([str(tmp_path)])
+    rows = ivcurve.analyze(paths, workers=2, batch=2)
+    assert [row[0] for row in rows] == paths
+    assert np.allclose([row[1:] for row in rows], [row[1:] for row in ivcurve.analyze(paths)], equal_nan=True)
+    summary = {row[0][len(str(tmp_path)) + 1:]: dict(zip(ivcurve.SUMMARY_COLUMNS, row)) for row in rows}
+    assert np.isnan(summary['bad.csv']['Voc (V)']) and summary['test.csv']['Isc (A)'] == 24
+    source.irradiance = 1000
+    _, _, power = source.maximum_power_point()
+    assert abs(summary['0.npy']['Pmp (W)'] - power) < 0.01 * power
+    assert abs(summary['0.npy']['Voc (V)'] - source.open_voltage) < 0.05
+    assert abs(summary['0.npy']['Rsh (Ω)'] - source.shunt_resistance) < 5
+
+
+def test_analyze_without_points(tmp_path):
+    assert ivcurve.analyze([]) == []
+    (tmp_path / 'header.csv').write_text('voltage (V),current (A)\n')
+    (tmp_path / 'bad.csv').write_text('nothing here\n')
+    paths = ivcurve.find_curves([str(tmp_path)])
+    rows = ivcurve.analyze(paths, workers=2, batch=1)
+    assert [row[0] for row in rows] == paths and [row[1] for row in rows] == [0, 0]
+    assert np.isnan([row[2:] for row in rows]).all()
+    empty = tmp_path / 'empty'
+    empty.mkdir()
+    assert ivcurve.analyze(ivcurve.find_curves([str(empty)])) == []
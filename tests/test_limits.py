@@ -0,0 +1,35 @@
+from . import libbk8500 as lbk
+from libbk8500 import limits, simulator
+
+
+def expect_validation_error(function, *args):
+    try:
+        function(*args)
+    except limits.ValidationException:
+        return
+    assert False, 'Value was not rejected'
+
+
+def test_identified_device_rejects_out_of_range():
+    device = simulator.open_simulated(None)
+    device.identify()
+    assert device.limits.ratings.model == '8500'
+    round_trips = device.round_trips
+    expect_validation_error(device.set_level, lbk.packet.LimitModeEnum.CC, 31)
+    expect_validation_error(device.set_level, lbk.packet.LimitModeEnum.CV, -1)
+    expect_validation_error(device.command, lbk.packet.CurrentTransient(1, 7, 2, 1,
+                                                                        lbk.packet.TransientOperationEnum.PULSE))
+    expect_validation_error(device.set_level, lbk.packet.LimitModeEnum.CC, 1.00005)
+    expect_validation_error(device.command, lbk.packet.StepVoltage(1, 2, 0.00005))
+    assert device.round_trips == round_trips
+    device.set_level(lbk.packet.LimitModeEnum.CC, 30)
+    device.set_level(lbk.packet.LimitModeEnum.CV, 0.3)
+
+
+def test_validate_levels_unknown_model():
+    table = limits.Limits()
+    table.validate_levels(lbk.packet.CurrentLevel, [0, 1, 400_000])
+    expect_validation_error(table.validate_levels, lbk.packet.CurrentLevel, [0, 1, 500_000])
+    expect_validation_error(table.validate_levels, lbk.packet.VoltageLevel, [0, float('nan')])
+    expect_validation_error(table.validate_levels, lbk.packet.VoltageLevel, [0.1, 0.2, 0.3005])
+    table.validate_levels(lbk.packet.VoltageLevel, [0.1 * i for i in range(100)])
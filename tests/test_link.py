@@ -0,0 +1,39 @@
+import argparse
+import pytest
+from libbk8500 import link, simulator
+from libbk8500.power_tool import open_device, parse_baud
+
+
+def test_autotune_finds_device_rate():
+    with simulator.PtySimulator(baud=9600) as pty:
+        best, results = link.autotune(pty.port, trials=3)
+    assert best.baud == 9600 and best.reliable
+    assert [result.baud for result in results] == [38400, 19200, 9600]
+    assert all(result.successes == 0 for result in results[:2])
+    assert 0 < best.round_trips_per_second and '3/3 ok' in str(best)
+
+
+def test_probe_counts_round_trips():
+    with simulator.PtySimulator() as pty:
+        result = link.probe(pty.port, 19200, trials=4)
+    assert result.successes == result.trials == 4
+    assert result.round_trips_per_second == pytest.approx(4 / result.elapsed)
+
+
+def test_parse_baud():
+    assert parse_baud('auto') == 'auto' and parse_baud('19200') == 19200
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--baud', type=parse_baud)
+    with pytest.raises(SystemExit):
+        parser.parse_args(['--baud', 'fast'])
+
+
+def test_open_device_with_auto_baud():
+    with simulator.PtySimulator(baud=19200) as pty:
+        args = argparse.Namespace(replay=None, device=pty.port, baud='auto', timeout=1.0, low_latency=False,
+                                  record=None)
+        device = open_device(args)
+        try:
+            assert device.ser.baudrate == 19200 and device.limits is not None
+        finally:
+            device.close()
@@ -0,0 +1,76 @@
+import pytest
+from . import libbk8500 as lbk
+from libbk8500 import mppt, simulator
+
+
+def open_pv(source):
+    device = lbk.Device(None, transport=simulator.SimulatedSerial(simulator.Simulator(source)))
+    device.enable_remote(True)
+    return device
+
+
+class DroppingSerial(simulator.SimulatedSerial):
+    # Loses the reply to the second frame of the first pipelined write, like a device that missed it, or corrupts its
+    # checksum
+    def __init__(self, simulator, garble=False):
+        super().__init__(simulator)
+        self.garble = garble
+        self.dropped = False
+
+    def write(self, data):
+        written = super().write(data)
+        if len(data) == 52 and not self.dropped:
+            self.dropped = True
+            if self.garble:
+                self.received[-1] ^= 0xFF
+            else:
+                del self.received[-26:]
+        return written
+
+
+@pytest.mark.parametrize('pipelined', [False, True])
+@pytest.mark.parametrize('tracker_type', [mppt.PerturbObserve, mppt.IncrementalConductance])
+def test_tracks_maximum_power_point(tracker_type, pipelined):
+    source = simulator.PVSource()
+    device = open_pv(source)
+    tracker = tracker_type(12.0, step=0.1, high=22.0)
+    mppt.configure(device, tracker.level)
+    for irradiance in (1000, 400):
+        source.irradiance = irradiance
+        result = mppt.run_mppt(device, tracker, cycles=150, pipelined=pipelined)
+        assert result.pipelined == pipelined
+        volts, _, watts = source.maximum_power_point()
+        assert abs(result.levels[-1] - volts) < 0.3
+        assert result.watts[-1] > 0.99 * watts
+    assert result.stats.frequency > 0 and len(result.stats.periods) == 149
+
+
+def test_command_request_pipelined():
+    device = open_pv(simulator.PVSource())
+    device.command(lbk.packet.Mode(lbk.packet.LimitModeEnum.CV))
+    device.enable_load(True)
+    round_trips = device.round_trips
+    meas = device.command_request(lbk.packet.VoltageLevel(15.0), lbk.packet.Measure)
+    assert abs(meas.volts - 15.0) < 0.01 and meas.amps > 4
+    assert device.round_trips == round_trips + 1
+    # A rejected command still consumes the measure reply, the next exchange is aligned
+    device.enable_remote(False)
+    with pytest.raises(lbk.packet.StatusException):
+        device.command_request(lbk.packet.VoltageLevel(16.0), lbk.packet.Measure)
+    assert device.request(lbk.packet.Measure).volts > 0
+
+
+@pytest.mark.parametrize('garble', [False, True])
+def test_pipelined_falls_back_after_lost_reply(garble):
+    source = simulator.PVSource()
+    device = lbk.Device(None, transport=DroppingSerial(simulator.Simulator(source), garble))
+    device.enable_remote(True)
+    tracker = mppt.PerturbObserve(12.0, step=0.1, high=22.0)
+    mppt.configure(device, tracker.level)
+    round_trips = device.round_trips
+    result = mppt.run_mppt(device, tracker, cycles=20, pipelined=True)
+    assert not result.pipelined and len(result.t) == 20
+    assert abs(result.volts[0] - 12.0) < 0.01
+    # One failed pipelined write, then a command and a request for each of the 20 cycles
+    assert device.round_trips == round_trips + 1 + 40
+    assert device.request(lbk.packet.Measure).volts > 0
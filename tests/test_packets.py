@@ -1,3 +1,4 @@
+import pytest
 from . import libbk8500 as lbk
 
 def check_packet(packet, expected):
@@ -7,4 +8,66 @@ def test_github_example_8500pyserial():
     check_packet(lbk.packet.RemoteOperation(enable_remote=True), [0xaa, 00, 0x20, 0x01, 00, 00, 00, 00, 00, 00, 00, 00, 00, 00, 00, 00, 00, 00, 00, 00, 00, 00, 00, 00, 00, 0xcb])
     check_packet(lbk.packet.Mode(lbk.packet.LimitModeEnum.CC), [0xaa,00,0x28,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,0xd2])
     check_packet(lbk.packet.Enable(False), [0xaa,00,0x21,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,0xcb])
-    check_packet(lbk.packet.CurrentLevel(0.02), [0xaa,00,0x2a,0xc8,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,0x9c])
\ No newline at end of file
+    check_packet(lbk.packet.CurrentLevel(0.02), [0xaa,00,0x2a,0xc8,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,00,0x9c])
+
+def test_serialize_into_reused_buffer():
+    frame = bytearray(26)
+    for packet in (lbk.packet.CurrentLevel(0.02), lbk.packet.RemoteOperation(True),
+                   lbk.packet.CurrentTransient(1, 0.5, 2, 0.25, lbk.packet.TransientOperationEnum.PULSE)):
+        packet.serialize_into(frame, *packet.values())
+        assert frame == bytes(packet)
+    assert lbk.packet.Measure.request() is lbk.packet.Measure.request()
+    assert lbk.packet.Measure.request(1)[25] == lbk.packet.calc_checksum(lbk.packet.Measure.request(1)[:25])
+
+def test_deserialize_from_memoryview():
+    # A response frame in the middle of a larger receive block decodes in place
+    frame = bytearray(bytes(lbk.packet.CurrentLevel(1.5)))
+    frame[2] = lbk.packet.CurrentLevel.RESPONSE_ID
+    frame[25] = lbk.packet.calc_checksum(frame[:25])
+    block = bytearray(3) + frame + bytearray(26)
+    assert lbk.packet.CurrentLevel.deserialize(memoryview(block)[3:29]).amps == 1.5
+
+def test_deserialize_rejects_bad_frames():
+    # Raised whether or not asserts are enabled, so callers can recover from a misaligned link under python -O
+    frame = bytearray(bytes(lbk.packet.CurrentLevel(1.5)))
+    frame[2] = lbk.packet.CurrentLevel.RESPONSE_ID
+    frame[25] = lbk.packet.calc_checksum(frame[:25])
+    for index, value in ((0, 0xAB), (2, lbk.packet.VoltageLevel.RESPONSE_ID), (25, None)):
+        bad = bytearray(frame)
+        if value is None:
+            bad[index] = lbk.packet.calc_checksum(bad[:25]) ^ 0xFF
+        else:
+            bad[index] = value
+            bad[25] = lbk.packet.calc_checksum(bad[:25])
+        with pytest.raises(lbk.packet.FramingException):
+            lbk.packet.CurrentLevel.deserialize(bad)
+    with pytest.raises(lbk.packet.FramingException):
+        lbk.packet.CurrentLevel.deserialize(frame[:25])
+    success = bytearray(26)
+    success[:4] = (0xAA, 0, lbk.packet.Status.RESPONSE_ID, lbk.packet.Status.Code.SUCCESS)
+    success[25] = lbk.packet.calc_checksum(success[:25])
+    with pytest.raises(lbk.packet.FramingException):
+        lbk.packet.CurrentLevel.deserialize(success)
+
+def test_schema_packet():
+    # A packet declared outside the library gets the same generated codecs as the built-in ones
+    class Duty(lbk.packet.Packet):
+        COMMAND_ID = 0xF0
+        RESPONSE_ID = 0xF1
+        SCHEMA = [('percent', 'H', lbk.field.ScaledField(100)), ('enable', 'B', lbk.field.BoolField())]
+        TEXT = '{percent} % enable={enable}'
+
+    assert Duty.PACKET_FORMAT == 'HB19x'
+    packet = Duty(12.5, 1)
+    assert packet.values() == (12.5, True)
+    assert str(packet) == 'Duty(12.5 % enable=True)'
+    frame = bytearray(bytes(packet))
+    frame[2] = Duty.RESPONSE_ID
+    frame[25] = lbk.packet.calc_checksum(frame[:25])
+    assert Duty.deserialize(frame).values() == (12.5, True)
+
+def test_generated_codecs_up_to_date():
+    # Run generate_codecs.py when this fails
+    with open(lbk.packet._codecs.__file__) as f:
+        assert f.read() == lbk.packet.generate_codecs(lbk.packet.SCHEMA_PACKETS)
+    assert lbk.packet.Measure.deserialize.__code__.co_filename == lbk.packet._codecs.__file__
@@ -0,0 +1,69 @@
+import functools
+import time
+import numpy as np
+from . import libbk8500 as lbk
+from libbk8500 import pool, simulator
+
+
+class ListSink:
+    def __init__(self):
+        self.rows = {}
+
+    def write(self, port, rows):
+        self.rows.setdefault(port, []).extend(rows.tolist())
+
+
+def test_pool_collects_every_port():
+    factory = functools.partial(simulator.open_simulated, latency=0.0005)
+    sink = ListSink()
+    with pool.AcquisitionPool(['a', 'b'], capacity=256, chunk=4, device_factory=factory) as acquisition:
+        acquisition.run([sink], duration=0.5, interval=0.05)
+        status = {entry.port: entry for entry in acquisition.status()}
+        written = {port: int(ring.header[pool.WRITTEN]) for port, ring in acquisition.rings.items()}
+    for port in ('a', 'b'):
+        assert status[port].state == pool.STOPPED
+        # Every row the worker wrote was either handed to the sinks or counted as dropped
+        assert status[port].samples == len(sink.rows[port]) > 0
+        assert status[port].samples + status[port].dropped == written[port]
+        times = [row[0] for row in sink.rows[port]]
+        assert times == sorted(times)
+        assert all(row[0] <= row[1] for row in sink.rows[port])
+        assert sink.rows[port][0][2] == 12
+
+
+def test_lagging_reader_drops_overrun_rows():
+    ring = pool.RingBuffer(8)
+    try:
+        def rows(start, count):
+            # Every column holds the absolute row index, so torn rows are easy to spot
+            return np.repeat(np.arange(start, start + count, dtype=float)[:, None], len(pool.COLUMNS), axis=1)
+
+        ring.write(rows(0, 5))
+        got, dropped = ring.read_new()
+        assert got[:, 0].tolist() == [0, 1, 2, 3, 4] and dropped == 0
+        # The writer laps the reader by two rows
+        ring.write(rows(5, 6))
+        ring.write(rows(11, 4))
+        got, dropped = ring.read_new()
+        assert got[:, 0].tolist() == list(range(7, 15)) and dropped == 2
+        # A chunk is being written while the reader copies, the slots it fills held rows 15 to 17
+        ring.write(rows(15, 6))
+        ring.header[pool.WRITING] = 21 + 4
+        got, dropped = ring.read_new()
+        assert got[:, 0].tolist() == [17, 18, 19, 20] and dropped == 2
+        assert (got == got[:, :1]).all()
+    finally:
+        ring.close()
+        ring.unlink()
+
+
+def hang(port):
+    time.sleep(60)
+
+
+def test_stop_terminates_stuck_workers():
+    with pool.AcquisitionPool(['stuck'], capacity=16, device_factory=hang) as acquisition:
+        start = time.monotonic()
+        acquisition.stop(timeout=0.2)
+        assert time.monotonic() - start < 5
+        assert acquisition.status()[0].state == pool.FAILED
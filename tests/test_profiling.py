@@ -0,0 +1,22 @@
+import time
+from . import libbk8500 as lbk
+from libbk8500 import profiling, simulator
+
+
+def test_phase_timer_per_packet():
+    device = simulator.open_simulated(None)
+    profiler = profiling.PhaseTimer()
+    device.profiler = profiler
+    device.set_level(lbk.packet.LimitModeEnum.CC, 1)
+    device.request(lbk.packet.Measure)
+    device.request(lbk.packet.Measure)
+    with profiler.phase(profiling.SLEEP):
+        time.sleep(0.01)
+    profiler.stop()
+    assert profiler.counts[profiling.SERIAL_WRITE] == 3
+    assert profiler.counts[profiling.DECODE] == 3
+    assert (profiling.DEVICE_WAIT, 'CurrentLevel') in profiler.packets
+    assert (profiling.DECODE, 'Measure') in profiler.packets
+    assert profiler.totals[profiling.SLEEP] >= 0.01
+    report = profiler.report()
+    assert 'device wait / Measure' in report and 'other' in report
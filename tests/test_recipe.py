@@ -0,0 +1,63 @@
+from . import libbk8500 as lbk
+from libbk8500 import recipe, simulator
+
+
+def test_switch_uses_one_load_settings(tmp_path):
+    sim = simulator.Simulator()
+    device = lbk.Device(None, transport=simulator.SimulatedSerial(sim))
+    device.enable_remote(True)
+    bank = recipe.RecipeBank(device, tmp_path / 'bank.json')
+    low = recipe.Recipe.fixed('low', lbk.packet.LimitModeEnum.CC, 1.0, max_current=5)
+    high = recipe.Recipe.fixed('high', lbk.packet.LimitModeEnum.CV, 9.5, remote_sensing=True)
+    assert bank.store(low) == 1
+    assert bank.store(high) == 2
+    assert sim.mode == lbk.packet.LimitModeEnum.CV
+
+    round_trips = device.round_trips
+    assert bank.switch(low) == 1
+    assert device.round_trips == round_trips + 1
+    assert sim.mode == lbk.packet.LimitModeEnum.CC and sim.value(lbk.packet.CurrentLevel) == 1.0
+    assert sim.value(lbk.packet.MaximumCurrent) == 5 and not sim.value(lbk.packet.EnableRemoteSensing)
+
+    # A new bank on the same device picks the index up from the file
+    bank = recipe.RecipeBank(device, tmp_path / 'bank.json')
+    assert bank.find(high) == 2
+    bank.switch(high)
+    assert sim.mode == lbk.packet.LimitModeEnum.CV and sim.value(lbk.packet.EnableRemoteSensing)
+
+
+def test_full_bank_reuses_least_recently_used():
+    device = simulator.open_simulated(None)
+    bank = recipe.RecipeBank(device, registers=range(1, 3))
+    recipes = [recipe.Recipe.fixed(f'cc{i}', lbk.packet.LimitModeEnum.CC, i) for i in range(3)]
+    bank.store(recipes[0])
+    bank.store(recipes[1])
+    bank.switch(recipes[0])
+    assert bank.switch(recipes[2]) == 2
+    assert bank.find(recipes[1]) is None and bank.find(recipes[0]) == 1
+
+
+def test_capture_reads_current_settings():
+    device = simulator.open_simulated(None)
+    cv = recipe.Recipe.fixed('cv', lbk.packet.LimitModeEnum.CV, 9.5, max_current=5)
+    cv.apply(device)
+    captured = recipe.Recipe.capture(device)
+    settings = {setting[0]: setting[1:] for setting in captured.settings()}
+    assert settings['Mode'] == [int(lbk.packet.LimitModeEnum.CV)]
+    assert settings['VoltageLevel'] == [9.5] and settings['MaximumCurrent'] == [5]
+
+    # Applying the capture to another device puts it in the same state
+    other = simulator.open_simulated(None)
+    captured.apply(other)
+    assert recipe.Recipe.capture(other) == captured
+
+
+def test_least_recently_used_survives_reload(tmp_path):
+    device = simulator.open_simulated(None)
+    recipes = [recipe.Recipe.fixed(f'cc{i}', lbk.packet.LimitModeEnum.CC, i) for i in range(3)]
+    bank = recipe.RecipeBank(device, tmp_path / 'bank.json', registers=range(1, 3))
+    bank.store(recipes[0])
+    bank.store(recipes[1])
+    bank.switch(recipes[0])
+    bank = recipe.RecipeBank(device, tmp_path / 'bank.json', registers=range(1, 3))
+    assert bank.switch(recipes[2]) == 2
@@ -0,0 +1,48 @@
+from . import libbk8500 as lbk
+from libbk8500 import replay
+
+
+class EchoSerial:
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def write(self, data):
+        return len(data)
+
+    def read(self, size=1):
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+def status_frame():
+    return bytes([0xaa, 0, 0x12, 0x80] + [0] * 21 + [0x3c])
+
+
+def test_record_then_replay(tmp_path):
+    path = tmp_path / 'session.lbk'
+    recorder = replay.RecordingTransport(EchoSerial([status_frame()]), path)
+    device = lbk.Device(None, transport=recorder)
+    device.enable_load(True)
+    device.close()
+
+    transport = replay.ReplayTransport(path, realtime=False)
+    device = lbk.Device(None, transport=transport)
+    device.enable_load(True)
+    assert transport.exhausted
+
+
+def test_replay_rejects_different_frame(tmp_path):
+    path = tmp_path / 'session.lbk'
+    recorder = replay.RecordingTransport(EchoSerial([status_frame()]), path)
+    lbk.Device(None, transport=recorder).enable_load(True)
+    recorder.close()
+
+    device = lbk.Device(None, transport=replay.ReplayTransport(path, realtime=False))
+    try:
+        device.enable_load(False)
+    except replay.ReplayException:
+        pass
+    else:
+        assert False, 'Mismatched frame was accepted'
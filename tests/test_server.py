@@ -0,0 +1,49 @@
+import threading
+from . import libbk8500 as lbk
+from libbk8500 import server, simulator
+
+
+def test_remote_device_and_coalescing():
+    device = simulator.open_simulated(None)
+    with server.DeviceServer([device], port=0, interval=10) as daemon:
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+        host, port = daemon.server_address
+        clients = [server.connect(f'tcp://{host}:{port}/0') for _ in range(3)]
+        clients[0].command(lbk.packet.Mode(lbk.packet.LimitModeEnum.CC))
+        clients[0].set_level(lbk.packet.LimitModeEnum.CC, 1)
+        clients[0].enable_load(True)
+        readings = [client.request(lbk.packet.Measure) for client in clients]
+        for client in clients:
+            client.close()
+        daemon.shutdown()
+    assert [meas.amps for meas in readings] == [1, 1, 1]
+    assert daemon.hubs[0].device_reads == 1
+
+
+def test_command_invalidates_cached_measure():
+    device = simulator.open_simulated(None)
+    with server.DeviceServer([device], port=0, interval=10) as daemon:
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+        client = server.connect('tcp://{}:{}/0'.format(*daemon.server_address))
+        client.command(lbk.packet.Mode(lbk.packet.LimitModeEnum.CC))
+        client.set_level(lbk.packet.LimitModeEnum.CC, 1)
+        client.enable_load(True)
+        before = client.request(lbk.packet.Measure)
+        client.set_level(lbk.packet.LimitModeEnum.CC, 2)
+        after = client.request(lbk.packet.Measure)
+        client.close()
+        daemon.shutdown()
+    assert (before.amps, after.amps) == (1, 2)
+    assert daemon.hubs[0].device_reads == 2
+
+
+def test_subscription():
+    with server.DeviceServer([simulator.open_simulated(None)], port=0, interval=0.01) as daemon:
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+        with server.Subscription(*daemon.server_address) as subscription:
+            readings = [next(subscription) for _ in range(3)]
+        daemon.shutdown()
+    assert all(meas.volts == 12 for meas in readings)
@@ -0,0 +1,55 @@
+import threading
+from . import libbk8500 as lbk
+from libbk8500 import simulator
+
+
+def test_simulator_over_pty():
+    with simulator.PtySimulator() as pty:
+        device = lbk.Device(pty.port, 9600, config=lbk.device.LOW_LATENCY)
+        device.enable_remote(True)
+        device.command(lbk.packet.Mode(lbk.packet.LimitModeEnum.CC))
+        device.set_level(lbk.packet.LimitModeEnum.CC, 2)
+        device.enable_load(True)
+        meas = device.request(lbk.packet.Measure)
+        device.close()
+    assert meas.amps == 2 and meas.volts == 11
+
+
+def test_simulator_requires_remote():
+    device = lbk.Device(None, transport=simulator.SimulatedSerial())
+    try:
+        device.enable_load(True)
+    except lbk.packet.StatusException as e:
+        assert e.code == lbk.packet.Status.Code.INVALID_COMMAND
+    else:
+        assert False, 'Command accepted without remote operation'
+
+
+def test_read_timeout():
+    with simulator.PtySimulator() as pty:
+        device = lbk.Device(pty.port, 9600, config=lbk.device.SerialConfig(timeout=0.05))
+        try:
+            device.read_frame()
+        except lbk.device.TimeoutException as e:
+            assert e.received == 0
+        else:
+            assert False, 'Read did not time out'
+        device.close()
+
+
+def test_concurrent_requests_share_round_trip():
+    device = lbk.Device(None, transport=simulator.SimulatedSerial(latency=0.05))
+    barrier = threading.Barrier(4)
+    readings = []
+
+    def measure():
+        barrier.wait()
+        readings.append(device.request(lbk.packet.Measure))
+
+    threads = [threading.Thread(target=measure) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(readings) == 4 and all(meas.volts == 12 for meas in readings)
+    assert device.round_trips + device.coalesced == 4 and device.coalesced > 0
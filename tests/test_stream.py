@@ -0,0 +1,62 @@
+import pytest
+import numpy as np
+from . import libbk8500 as lbk
+from libbk8500 import stream
+from .frames import measure_frame, status_frame
+
+
+class FrameSource:
+    # Answers request_frames from a fixed list of frames, in order
+    def __init__(self, frames):
+        self.frames = frames
+        self.sent = 0
+
+    def request_frames(self, response_type, count, times=None):
+        frames = b''.join(self.frames[self.sent:self.sent + count])
+        self.sent += count
+        return frames
+
+
+def test_decode_measures():
+    values = stream.decode_measures(measure_frame(12.5, 1.25, 15.625) + measure_frame(1, 2, 2))
+    assert np.allclose(values, [[12.5, 1.25, 15.625], [1, 2, 2]])
+
+
+def test_running_stats_and_decimator_match_numpy():
+    data = np.random.default_rng(0).normal(size=(1000, 3))
+    stats = stream.RunningStats()
+    means = []
+    decimator = stream.Decimator(7, means.append)
+    for chunk in np.array_split(data, 13):
+        stats.update(chunk)
+        decimator.update(chunk)
+    assert np.allclose(stats.mean, data.mean(axis=0))
+    assert np.allclose(stats.variance, data.var(axis=0, ddof=1))
+    assert np.allclose(stats.min, data.min(axis=0)) and np.allclose(stats.max, data.max(axis=0))
+    assert np.allclose(means, data[:994].reshape(-1, 7, 3).mean(axis=1))
+
+
+def test_decode_measures_rejects_bad_frames():
+    frame = bytearray(measure_frame(1, 2, 2))
+    frame[25] ^= 0xFF
+    with pytest.raises(ValueError):
+        stream.decode_measures(measure_frame(1, 2, 2) + bytes(frame))
+    # A refused request is reported as such, not as a broken frame
+    with pytest.raises(lbk.packet.StatusException):
+        stream.decode_measures(measure_frame(1, 2, 2) + status_frame(lbk.packet.Status.Code.INCORRECT_PARAMETER))
+
+
+def test_pipeline_block_stats_match_numpy():
+    rng = np.random.default_rng(1)
+    frames = [measure_frame(*row) for row in rng.uniform(0, [120, 30, 300], size=(95, 3))]
+    data = stream.decode_measures(b''.join(frames))
+    blocks = []
+    # Chunks of 7 never line up with blocks of 10, so blocks are assembled across chunks
+    pipeline = stream.Pipeline([stream.BlockStats(10, blocks.append)], chunk=7)
+    pipeline.run(FrameSource(frames), samples=95)
+    assert pipeline.samples == 95 and len(blocks) == 9
+    expected = data[:90].reshape(9, 10, 3)
+    assert np.allclose([block.mean for block in blocks], expected.mean(axis=1))
+    assert np.allclose([block.variance for block in blocks], expected.var(axis=1, ddof=1))
+    assert np.allclose([block.min for block in blocks], expected.min(axis=1))
+    assert np.allclose([block.max for block in blocks], expected.max(axis=1))
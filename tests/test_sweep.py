@@ -0,0 +1,62 @@
+import struct
+import pytest
+from . import libbk8500 as lbk
+from libbk8500 import sweep
+from .frames import measure_frame
+
+
+class FakeDevice:
+    def __init__(self):
+        self.log = []
+        self.level = 0
+
+    def command(self, packet):
+        self.log.append(str(packet))
+
+    def enable_load(self, enable):
+        self.log.append(f'load {enable}')
+
+    def set_level(self, mode, value):
+        self.level = value
+        self.log.append(f'level {mode} {value}')
+
+    def command_frame(self, frame):
+        self.level = struct.unpack_from('<I', frame, 3)[0] / (10_000 if frame[2] == 0x2A else 1000)
+        self.log.append(f'frame {frame.hex()}')
+
+    def request_frames(self, response_type, count):
+        return measure_frame(10 - self.level, self.level, (10 - self.level) * self.level) * count
+
+
+def test_serpentine_points():
+    grid = sweep.Sweep([sweep.LevelAxis(lbk.packet.LimitModeEnum.CC, [1, 2, 3]),
+                        sweep.SetpointAxis('Source (V)', [5, 10], lambda value: None)])
+    assert list(grid.points()) == [(1, 5), (2, 5), (3, 5), (3, 10), (2, 10), (1, 10)]
+
+
+def test_run_sweeps_groups_modes():
+    cc = lbk.packet.LimitModeEnum.CC
+    cv = lbk.packet.LimitModeEnum.CV
+    sweeps = [sweep.Sweep([sweep.LevelAxis(cc, [1, 2], name='Level')], samples=3),
+              sweep.Sweep([sweep.LevelAxis(cv, [4, 5], name='Level')], samples=3),
+              sweep.Sweep([sweep.LevelAxis(cc, [3, 4], name='Level')], samples=3)]
+    device = FakeDevice()
+    sink = sweep.ListSink()
+    sweep.run_sweeps(device, sweeps, [sink])
+    assert [row[0] for row in sink.rows] == [1, 2, 3, 4, 4, 5]
+    assert sum(1 for entry in device.log if entry.startswith('Mode')) == 2
+    assert sink.rows[0][1:] == (9, 1, 9)
+    assert device.log[-1] == 'load False'
+
+
+def test_run_sweeps_switches_load_off_on_error():
+    def setter(value):
+        if value == 10:
+            raise RuntimeError('source failed')
+
+    grid = sweep.Sweep([sweep.LevelAxis(lbk.packet.LimitModeEnum.CC, [1, 2]),
+                        sweep.SetpointAxis('Source (V)', [5, 10], setter)])
+    device = FakeDevice()
+    with pytest.raises(RuntimeError):
+        sweep.run_sweeps(device, grid, [sweep.ListSink()])
+    assert device.log[-1] == 'load False'
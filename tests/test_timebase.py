@@ -0,0 +1,34 @@
+import numpy as np
+from . import libbk8500 as lbk
+from libbk8500 import simulator, stream, timebase
+
+
+def ramp(name, start, period, count, slope):
+    # Samples of watts = slope * t, with a 1 ms round trip around each one
+    t = start + np.arange(count) * period
+    values = np.zeros((count, 3))
+    values[:, 2] = slope * t
+    return timebase.TimedStream(name, t - 0.0005, t + 0.0005, values)
+
+
+def test_align_linear_and_nearest():
+    streams = [ramp('a', 0.0, 0.01, 101, 2.0), ramp('b', 0.003, 0.025, 40, 3.0)]
+    aligned = timebase.align(streams)
+    assert aligned.t[0] == 0.003 and aligned.t[-1] <= 0.978 and np.allclose(np.diff(aligned.t), 0.025)
+    assert np.allclose(aligned.total('watts'), 5.0 * aligned.t)
+    t = np.array([0.0, 0.5, 0.51, 2.0])
+    nearest = timebase.align(streams, t, method=timebase.NEAREST, tolerance=0.006)
+    watts = nearest.channel('watts')
+    assert np.allclose(watts[0, :3], [0.0, 1.0, 1.02]) and np.isnan(watts[0, 3])
+    assert np.allclose(watts[1, :2], [3 * 0.003, 3 * 0.503]) and np.isnan(watts[1, 2:]).all()
+
+
+def test_samples_are_timestamped():
+    device = simulator.open_simulated(None, latency=0.001)
+    sent, received, meas = device.request_timed(lbk.packet.Measure)
+    assert received - sent >= 0.001 and meas.volts == 12
+    times, values = stream.acquire_timed(device, 5)
+    assert np.all(times[:, 1] - times[:, 0] >= 0.001) and np.all(np.diff(times[:, 0]) > 0)
+    assert times[0, 0] >= received
+    timed = timebase.TimedStream.from_rows('sim', np.hstack([times, values]))
+    assert np.allclose(timed.t, times.mean(axis=1)) and np.allclose(timed.values, values)
@@ -0,0 +1,39 @@
+import io
+import numpy as np
+import pytest
+from . import libbk8500 as lbk
+from libbk8500 import simulator, transient
+from libbk8500.power_tool import run_transient
+
+
+def test_step_metrics_second_order():
+    t = np.linspace(-0.01, 0.1, 20_000)
+    zeta, wn = 0.5, 200.0
+    wd = wn * np.sqrt(1 - zeta ** 2)
+    response = 1 - np.exp(-zeta * wn * t) * (np.cos(wd * t) + zeta / np.sqrt(1 - zeta ** 2) * np.sin(wd * t))
+    y = np.where(t < 0, 1.0, 1.0 + 2.0 * response)
+    metrics = transient.step_metrics(t, y, band=0.02, final_fraction=0.05)
+    assert abs(metrics.initial - 1) < 1e-9 and abs(metrics.final - 3) < 1e-3
+    assert abs(metrics.overshoot - 100 * np.exp(-np.pi * zeta / np.sqrt(1 - zeta ** 2))) < 0.1
+    assert abs(metrics.settling_time - 0.039) < 0.003
+    assert 0.006 < metrics.rise_time < 0.009
+
+
+def test_pulse_capture_on_simulator():
+    device = simulator.open_simulated(None, latency=0.0005)
+    result, metrics = transient.run_transient(device, lbk.packet.LimitModeEnum.CC, 1, 0.05, 3, 0.05, 0.1, 0.02)
+    assert abs(metrics.initial - 1) < 1e-6 and abs(metrics.final - 3) < 1e-6
+    assert np.all(result.amps[result.t > 0.06] == 1)
+
+
+def test_power_tool_switches_load_off_when_capture_fails(monkeypatch):
+    device = simulator.open_simulated(None)
+
+    def fail(device, *args):
+        device.enable_load(True)
+        raise RuntimeError('capture failed')
+
+    monkeypatch.setattr(transient, 'run_transient', fail)
+    with pytest.raises(RuntimeError):
+        run_transient(device, lbk.packet.LimitModeEnum.CC, 1, 0.05, 3, 0.05, 0.1, 0.02, 0.02, io.StringIO(), False, None)
+    assert not device.ser.simulator.load_enabled
@@ -0,0 +1,99 @@
+import os
+import signal
+import threading
+import time
+import pytest
+from . import libbk8500 as lbk
+from libbk8500 import simulator, watchdog
+from libbk8500.power_tool import run_test
+
+
+def open_loaded(latency=0.0005):
+    sim = simulator.Simulator()
+    device = lbk.Device(None, transport=simulator.SimulatedSerial(sim, latency=latency))
+    device.enable_remote(True)
+    device.enable_load(True)
+    return sim, device
+
+
+def test_trips_on_fault():
+    sim, device = open_loaded()
+    trips = []
+    guard = watchdog.Watchdog(device, interval=0.01, callback=trips.append).start()
+    time.sleep(0.05)
+    assert not guard.tripped.is_set() and sim.load_enabled
+    sim.faults.add(lbk.packet.Measure.DemandBits.OVER_TEMP)
+    assert guard.wait(1)
+    assert not sim.load_enabled and not sim.remote
+    assert trips == guard.trips and trips[0].reason == 'OVER_TEMP' and not trips[0].errors
+    # Loose bounds, a loaded machine can stretch any of these
+    assert 0 < trips[0].reaction < 1 and guard.polls >= 1
+    assert 'OVER_TEMP' in guard.report()
+
+
+def test_trips_on_exception_and_signal():
+    sim, device = open_loaded()
+    with pytest.raises(RuntimeError):
+        with watchdog.Watchdog(device, interval=0.01) as guard:
+            raise RuntimeError('sweep failed')
+    assert guard.trips[0].reason == 'RuntimeError: sweep failed' and not sim.load_enabled
+    device.enable_remote(True)
+    device.enable_load(True)
+    with pytest.raises(SystemExit):
+        with watchdog.Watchdog(device, interval=0.01) as guard:
+            os.kill(os.getpid(), signal.SIGTERM)
+            time.sleep(1)
+    assert guard.trips[0].reason == 'signal SIGTERM' and not sim.load_enabled and not sim.remote
+    assert signal.getsignal(signal.SIGTERM) == signal.SIG_DFL
+
+
+def test_stops_without_tripping():
+    sim, device = open_loaded()
+    with watchdog.Watchdog(device, interval=0.01) as guard:
+        time.sleep(0.03)
+    assert not guard.trips and sim.load_enabled and not guard.thread.is_alive()
+
+
+def test_signal_during_exchange_is_deferred():
+    sim, device = open_loaded()
+    write = device.ser.write
+    signalled = []
+
+    def write_then_signal(data):
+        # The signal arrives after the request went out and before the reply is read
+        written = write(data)
+        if threading.current_thread() is threading.main_thread() and not signalled:
+            signalled.append(True)
+            os.kill(os.getpid(), signal.SIGTERM)
+        return written
+
+    device.ser.write = write_then_signal
+    meas = None
+    with pytest.raises(SystemExit) as exit_info:
+        with watchdog.Watchdog(device, interval=0.01) as guard:
+            _, _, meas = device.request_timed(lbk.packet.Measure)
+            guard.check()
+    assert isinstance(meas, lbk.packet.Measure) and exit_info.value.code == 128 + signal.SIGTERM
+    assert guard.trips[0].reason == 'signal SIGTERM' and not sim.load_enabled
+
+
+def test_leaving_after_trip_raises():
+    sim, device = open_loaded()
+    with pytest.raises(watchdog.WatchdogException, match='OVER_TEMP'):
+        with watchdog.Watchdog(device, interval=0.01) as guard:
+            sim.faults.add(lbk.packet.Measure.DemandBits.OVER_TEMP)
+            assert guard.wait(1)
+    assert not sim.load_enabled
+
+
+def test_run_test_switches_load_off(tmp_path):
+    sim, device = open_loaded()
+    with open(tmp_path / 'sweep.csv', 'w') as out:
+        run_test(device, lbk.packet.LimitModeEnum.CC, 0.1, 0.3, 0.1, 0, out, False, False, False, None)
+    assert not sim.load_enabled
+    # A fault stops the sweep with an exception instead of ending it quietly
+    sim.faults.add(lbk.packet.Measure.DemandBits.OVER_TEMP)
+    with open(tmp_path / 'sweep.csv', 'w') as out, pytest.raises(watchdog.WatchdogException):
+        run_test(device, lbk.packet.LimitModeEnum.CC, 0.1, 30, 0.1, 0.01, out, False, False, False, None,
+                 watchdog=watchdog.Watchdog(device, interval=0.01))
+    assert not sim.load_enabled and not sim.remote